@@ -1,91 +1,79 @@
+import argparse
 import math
+import os
+import tempfile
 
-import pandas as pd
 from numpy import mean
 from sequence.components.optical_channel import QuantumChannel, ClassicalChannel
 from sequence.kernel.event import Event
 from sequence.kernel.process import Process
 from sequence.kernel.timeline import Timeline
 from sequence.qkd.BB84 import pair_bb84_protocols
+from sequence.runner.ensemble import ResultStore, make_grid, run_ensemble
 from sequence.topology.node import QKDNode
 
+
+def run_distance(config):
+    distance = config["distance"]
+    runtime = config["runtime"]
+
+    tl = Timeline(runtime)
+    tl.seed(config["seed"])
+    qc = QuantumChannel("qc", tl, distance=distance, polarization_fidelity=0.97, attenuation=0.0002)
+    cc = ClassicalChannel("cc", tl, distance=distance)
+    cc.delay += 10e9  # 10 ms
+
+    # Alice
+    ls_params = {"frequency": 80e6, "mean_photon_num": 0.1}
+    alice = QKDNode("alice", tl, stack_size=1)
+
+    for name, param in ls_params.items():
+        alice.update_lightsource_params(name, param)
+
+    # Bob
+    detector_params = [{"efficiency": 0.8, "dark_count": 10, "time_resolution": 10, "count_rate": 50e6},
+                       {"efficiency": 0.8, "dark_count": 10, "time_resolution": 10, "count_rate": 50e6}]
+    bob = QKDNode("bob", tl, stack_size=1)
+
+    for i in range(len(detector_params)):
+        for name, param in detector_params[i].items():
+            bob.update_detector_params(i, name, param)
+
+    qc.set_ends(alice, bob)
+    cc.set_ends(alice, bob)
+
+    # BB84 config
+    pair_bb84_protocols(alice.protocol_stack[0], bob.protocol_stack[0])
+
+    process = Process(alice.protocol_stack[0], "push", [256, math.inf, 6e12])
+    event = Event(0, process)
+    tl.schedule(event)
+
+    tl.init()
+    tl.run()
+
+    print("completed distance {}".format(distance))
+
+    # record metrics
+    bba = alice.protocol_stack[0]
+    return {"Throughput": mean(bba.throughputs), "Error_rate": mean(bba.error_rates), "Latency": bba.latency}
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache", help="file to cache results in, so that experiments are not rerun (default no cache)")
+    args = parser.parse_args()
+
     NUM_EXPERIMENTS = 11
     runtime = 6e12
 
-    # open file to store experiment results
-    # Path("results/sensitivity").mkdir(parents=True, exist_ok=True)
-    # filename = "results/sensitivity/distance_bb84.log"
-    # fh = open(filename,'w')
-
-    dist_list = []
-    tp_list = []
-    error_rate_list = []
-    latency_list = []
-
-    for i in range(NUM_EXPERIMENTS):
-        distance = max(1000, 10000 * int(i))
-
-        tl = Timeline(runtime)
-        tl.seed(1)
-        qc = QuantumChannel("qc", tl, distance=distance, polarization_fidelity=0.97, attenuation=0.0002)
-        cc = ClassicalChannel("cc", tl, distance=distance)
-        cc.delay += 10e9  # 10 ms
-
-        # Alice
-        ls_params = {"frequency": 80e6, "mean_photon_num": 0.1}
-        alice = QKDNode("alice", tl, stack_size=1)
-
-        for name, param in ls_params.items():
-            alice.update_lightsource_params(name, param)
-
-        # Bob
-        detector_params = [{"efficiency": 0.8, "dark_count": 10, "time_resolution": 10, "count_rate": 50e6},
-                           {"efficiency": 0.8, "dark_count": 10, "time_resolution": 10, "count_rate": 50e6}]
-        bob = QKDNode("bob", tl, stack_size=1)
-
-        for i in range(len(detector_params)):
-            for name, param in detector_params[i].items():
-                bob.update_detector_params(i, name, param)
-
-        qc.set_ends(alice, bob)
-        cc.set_ends(alice, bob)
-
-        # BB84 config
-        pair_bb84_protocols(alice.protocol_stack[0], bob.protocol_stack[0])
-
-        process = Process(alice.protocol_stack[0], "push", [256, math.inf, 6e12])
-        event = Event(0, process)
-        tl.schedule(event)
-
-        tl.init()
-        tl.run()
-
-        print("completed distance {}".format(distance))
-
-        # record metrics
-        bba = alice.protocol_stack[0]
-
-        dist_list.append(distance)
-        tp_list.append(mean(bba.throughputs))
-        error_rate_list.append(mean(bba.error_rates))
-        latency_list.append(bba.latency)
-
-        # fh.write(str(distance))
-        # fh.write(' ')
-        # if bba.throughputs:
-        #     fh.write(str(1e-6 * sum(bba.throughputs) / len(bba.throughputs)))
-        # else:
-        #     fh.write(str(None))
-        # fh.write(' ')
-        # if bba.error_rates:
-        #     fh.write(str(sum(bba.error_rates) / len(bba.error_rates)))
-        # else:
-        #     fh.write(str(None))
-        # fh.write(' ')
-        # fh.write(str(bba.latency))
-        # fh.write('\n')
-
-    log = {'Distance': dist_list, "Throughput": tp_list, 'Error_rate': error_rate_list, 'Latency': latency_list}
-    df = pd.DataFrame(log)
+    # experiments run in parallel; without a cache file, results are stored in a temporary directory
+    distances = [max(1000, 10000 * int(i)) for i in range(NUM_EXPERIMENTS)]
+    configs = make_grid({"distance": distances, "runtime": [runtime]}, seeds=[1])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ResultStore(args.cache or os.path.join(tmp_dir, "distance_bb84.jsonl"))
+        df = run_ensemble(run_distance, configs, store)
+
+    df = df.rename(columns={"distance": "Distance"})
+    df = df[["Distance", "Throughput", "Error_rate", "Latency"]]
     df.to_csv('distance_bb84.csv')
@@ -9,7 +9,7 @@ setup(
     # packages = find_packages('src'),
     packages=['sequence', 'sequence.app', 'sequence.kernel', 'sequence.components',
               'sequence.network_management', 'sequence.entanglement_management', 'sequence.qkd',
-              'sequence.resource_management', 'sequence.topology', 'sequence.utils'],
+              'sequence.resource_management', 'sequence.runner', 'sequence.topology', 'sequence.utils'],
     package_dir={'sequence': 'src'},
     install_requires=[
         'numpy',
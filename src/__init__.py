@@ -1,7 +1,7 @@
 __all__ = ['app', 'components', 'entanglement_management', 'kernel', 'network_management', 'qkd', 'resource_management',
-           'topology', 'utils']
+           'runner', 'topology', 'utils']
 
 
 def __dir__():
     return 'app', 'components', 'entanglement_management', 'kernel', 'network_management', 'qkd', \
-           'resource_management', 'topology', 'utils'
+           'resource_management', 'runner', 'topology', 'utils'
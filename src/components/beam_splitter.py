@@ -7,9 +7,10 @@ attached receivers (which can be any entity).
 
 from typing import TYPE_CHECKING
 
-from numpy.random import random_sample
+from numpy import absolute, asarray, einsum, int64
 
 if TYPE_CHECKING:
+    from numpy import ndarray
     from ..kernel.timeline import Timeline
 
 from .photon import Photon
@@ -31,6 +32,7 @@ class BeamSplitter(Entity):
         start_time (int): start time (in ps) of photon interaction.
         frequency (float): frequency with which to switch measurement bases.
         basis_list (List[int]): 0/1 indices of measurement bases over time.
+        rng (RandomStream): random number stream of beamsplitter.
     """
 
     def __init__(self, name: str, timeline: "Timeline", fidelity=1):
@@ -51,6 +53,7 @@ class BeamSplitter(Entity):
         self.start_time = 0
         self.frequency = 0
         self.basis_list = []
+        self.rng = timeline.get_random_stream(self.name)
 
     def init(self) -> None:
         """Implementation of Entity interface (see base class)."""
@@ -69,15 +72,39 @@ class BeamSplitter(Entity):
 
         assert photon.encoding_type["name"] == "polarization"
 
-        if random_sample() < self.fidelity:
+        if self.rng.random() < self.fidelity:
             index = int((self.timeline.now() - self.start_time) * self.frequency * 1e-12)
 
             if 0 > index or index >= len(self.basis_list):
                 return
 
-            res = Photon.measure(polarization["bases"][self.basis_list[index]], photon)
+            res = Photon.measure(polarization["bases"][self.basis_list[index]], photon, self.rng)
             self.receivers[res].get()
 
+    def get_batch(self, times: "ndarray", states: "ndarray") -> None:
+        """Method to receive a batch of photons for measurement, after their arrival.
+
+        Photons are measured at once in the bases given by their arrival times (as for `get`), without building photon objects.
+
+        Args:
+            times (numpy.ndarray): arrival times (in ps) of the photons, in increasing order.
+            states (numpy.ndarray): complex coefficients of the photon states (polarization encoded), with shape (n, 2).
+
+        Side Effects:
+            May call get_batch method of the receivers with the arrival times of the photons measured in their basis vector.
+        """
+
+        generator = self.rng.generator
+        indices = ((times - self.start_time) * self.frequency * 1e-12).astype(int64)
+        kept = (generator.random(len(times)) < self.fidelity) & (indices >= 0) & (indices < len(self.basis_list))
+        times, states, indices = times[kept], states[kept], indices[kept]
+
+        bases = asarray(polarization["bases"], dtype=complex)[asarray(self.basis_list, dtype=int64)[indices]]
+        prob_0 = absolute(einsum("ij,ij->i", bases[:, 0].conj(), states)) ** 2
+        results = generator.random(len(times)) >= prob_0
+        self.receivers[0].get_batch(times[~results])
+        self.receivers[1].get_batch(times[results])
+
     def set_basis_list(self, basis_list: "List[int]", start_time: int, frequency: int) -> None:
         """Sets the basis_list, start_time, and frequency attributes."""
 
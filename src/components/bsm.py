@@ -7,7 +7,6 @@ Also defined is a function to automatically construct a BSM of a specified type.
 from abc import abstractmethod
 from typing import Any, Dict
 
-from numpy import random
 
 from .detector import Detector
 from .photon import Photon
@@ -15,7 +14,6 @@ from ..kernel.entity import Entity
 from ..kernel.event import Event
 from ..kernel.process import Process
 from ..utils.encoding import *
-from ..utils.quantum_state import QuantumState
 
 
 def make_bsm(name, timeline, encoding_type='time_bin', phase_error=0, detectors=[]):
@@ -48,6 +46,7 @@ class BSM(Entity):
         phase_error (float): phase error applied to measurement.
         detectors (List[Detector]): list of attached photon detection devices.
         resolution (int): maximum time resolution achievable with attached detectors.
+        rng (RandomStream): random number stream of BSM.
     """
 
     def __init__(self, name, timeline, phase_error=0, detectors=[]):
@@ -64,11 +63,13 @@ class BSM(Entity):
         self.phase_error = phase_error
         self.photons = []
         self.photon_arrival_time = -1
+        self.rng = timeline.get_random_stream(self.name)
 
         self.detectors = []
-        for d in detectors:
+        for i, d in enumerate(detectors):
             if d is not None:
-                detector = Detector("", timeline, **d)
+                # detectors are named after the BSM, so that their random streams do not depend on the order of creation
+                detector = Detector("%s.detector%d" % (self.name, i), timeline, **d)
                 detector.attach(self)
             else:
                 detector = None
@@ -173,7 +174,7 @@ class PolarizationBSM(BSM):
         self.photons[0].entangle(self.photons[1])
 
         # measure in bell basis
-        res = Photon.measure_multiple(self.bell_basis, self.photons)
+        res = Photon.measure_multiple(self.bell_basis, self.photons, self.rng)
 
         # check if we've measured as Phi+ or Phi-; these cannot be measured by the BSM
         if res == 0 or res == 1:
@@ -182,14 +183,14 @@ class PolarizationBSM(BSM):
         # measured as Psi+
         # photon detected in corresponding detectors
         if res == 2:
-            detector_num = random.choice([0, 2])
+            detector_num = 2 * (self.rng.random() < 0.5)
             self.detectors[detector_num].get()
             self.detectors[detector_num + 1].get()
 
         # measured as Psi-
         # photon detected in opposite detectors
         elif res == 3:
-            detector_num = random.choice([0, 2])
+            detector_num = 2 * (self.rng.random() < 0.5)
             self.detectors[detector_num].get()
             self.detectors[3 - detector_num].get()
 
@@ -266,13 +267,13 @@ class TimeBinBSM(BSM):
         if len(self.photons) != 2:
             return
 
-        if random.random_sample() < self.phase_error:
+        if self.rng.random() < self.phase_error:
             self.photons[1].apply_phase_error()
         # entangle photons to measure
         self.photons[0].entangle(self.photons[1])
 
         # measure in bell basis
-        res = Photon.measure_multiple(self.bell_basis, self.photons)
+        res = Photon.measure_multiple(self.bell_basis, self.photons, self.rng)
 
         # check if we've measured as Phi+ or Phi-; these cannot be measured by the BSM
         if res == 0 or res == 1:
@@ -284,7 +285,7 @@ class TimeBinBSM(BSM):
         # measured as Psi+
         # send both photons to the same detector at the early and late time
         if res == 2:
-            detector_num = random.choice([0, 1])
+            detector_num = int(self.rng.random() < 0.5)
 
             process = Process(self.detectors[detector_num], "get", [])
             event = Event(int(round(early_time)), process)
@@ -296,7 +297,7 @@ class TimeBinBSM(BSM):
         # measured as Psi-
         # send photons to different detectors at the early and late time
         elif res == 3:
-            detector_num = random.choice([0, 1])
+            detector_num = int(self.rng.random() < 0.5)
 
             process = Process(self.detectors[detector_num], "get", [])
             event = Event(int(round(early_time)), process)
@@ -380,7 +381,7 @@ class SingleAtomBSM(BSM):
 
         # check if we're in first stage. If we are and not null, send photon to random detector
         if memory.previous_bsm == -1 and not photon.is_null:
-            detector_num = random.choice([0, 1])
+            detector_num = int(self.rng.random() < 0.5)
             memory.previous_bsm = detector_num
             self.detectors[detector_num].get()
 
@@ -400,14 +401,14 @@ class SingleAtomBSM(BSM):
                 else:
                     if memory_0.qstate not in memory_1.qstate.entangled_states:
                         memory_0.qstate.entangle(memory_1.qstate)
-                    res = QuantumState.measure_multiple(self.bell_basis, [memory_0.qstate, memory_1.qstate])
+                    res = type(memory_0.qstate).measure_multiple(self.bell_basis, [memory_0.qstate, memory_1.qstate], self.rng)
                     if res == 2:  # Psi+
                         detector_num = memory_0.previous_bsm
                     elif res == 3:  # Psi-
                         detector_num = 1 - memory_0.previous_bsm
                     else:
                         # Happens if the memory is expired during photon transmission; randomly select a detector
-                        detector_num = random.randint(2)
+                        detector_num = int(self.rng.random() < 0.5)
                     self.detectors[detector_num].get()
 
     def trigger(self, detector: Detector, info: Dict[str, Any]):
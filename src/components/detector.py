@@ -2,15 +2,17 @@
 
 This module models a single photon detector (SPD) for measurement of individual photons.
 It also defines a QSDetector class, which combines models of different hardware devices to measure photon states in different bases.
+Detection times are recorded in TimeBuffer arrays.
 QSDetector is defined as an abstract template and as implementaions for polarization and time bin qubits.
 """
 
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Any, Dict
 
-from numpy import random
+from numpy import cumsum, empty, int64, searchsorted
 
 if TYPE_CHECKING:
+    from numpy import ndarray
     from ..kernel.timeline import Timeline
     from ..components.photon import Photon
     from typing import List
@@ -19,8 +21,8 @@ from ..components.beam_splitter import BeamSplitter
 from ..components.switch import Switch
 from ..components.interferometer import Interferometer
 from ..kernel.entity import Entity
-from ..kernel.event import Event
 from ..kernel.process import Process
+from ..kernel.recurring import PoissonTimes, RecurringEvent
 from ..utils.encoding import time_bin
 
 
@@ -37,18 +39,27 @@ class Detector(Entity):
         dark_count (float): average number of false positive detections per second.
         count_rate (float): maximum detection rate; defines detector cooldown time.
         time_resolution (int): minimum resolving power of photon arrival time (in ps).
+        lazy_dark_count (bool): if dark counts are pre-sampled and processed when needed, rather than scheduled as events.
         photon_counter (int): counts number of detection events.
+        rng (RandomStream): random number stream of the detector.
     """
 
+    DARK_COUNT_CHUNK = 1024  # number of dark counts sampled at once with `lazy_dark_count`
+
     def __init__(self, name: str, timeline: "Timeline", efficiency=0.9, dark_count=0, count_rate=int(25e6),
-                 time_resolution=150):
+                 time_resolution=150, lazy_dark_count=False):
         Entity.__init__(self, name, timeline)  # Detector is part of the QSDetector, and does not have its own name
         self.efficiency = efficiency
         self.dark_count = dark_count  # measured in 1/s
         self.count_rate = count_rate  # measured in Hz
         self.time_resolution = time_resolution  # measured in ps
+        self.lazy_dark_count = lazy_dark_count
         self.next_detection_time = -1
         self.photon_counter = 0
+        self.rng = timeline.get_random_stream(self.name)
+        self._dark_times = None  # pre-sampled dark count times (with lazy_dark_count)
+        self._dark_index = 0
+        self._dark_clock = 0
 
     def init(self):
         """Implementation of Entity interface (see base class)."""
@@ -63,36 +74,94 @@ class Detector(Entity):
 
         Side Effects:
             May notify upper entities of a detection event.
+            With `lazy_dark_count`, will first process dark counts up to the current time.
         """
 
+        if self._dark_times is not None:
+            self.flush_dark_counts()
+        self._detect(self.timeline.now(), self.rng.random() < self.efficiency or dark_get)
+
+    def get_batch(self, times: "ndarray") -> None:
+        """Method to receive a batch of photons for measurement, after their arrival.
+
+        Photons are detected in order of arrival, processing pre-sampled dark counts up to each detection.
+
+        Args:
+            times (numpy.ndarray): arrival times (in ps) of the photons, in increasing order (no later than the current time).
+
+        Side Effects:
+            May notify upper entities of detection events, with the arrival times of the photons.
+        """
+
+        detected = times[self.rng.generator.random(len(times)) < self.efficiency]
+        self.photon_counter += len(times) - len(detected)
+        for time in detected.tolist():
+            if self._dark_times is not None:
+                self.flush_dark_counts(time)
+            self._detect(time, True)
+
+    def _detect(self, now: int, detected: bool) -> None:
         self.photon_counter += 1
-        now = self.timeline.now()
         time = round(now / self.time_resolution) * self.time_resolution
 
-        if (random.random_sample() < self.efficiency or dark_get) and now > self.next_detection_time:
+        if detected and now > self.next_detection_time:
             self.notify({'time': time})
             self.next_detection_time = now + (1e12 / self.count_rate)  # period in ps
 
     def add_dark_count(self) -> None:
         """Method to schedule false positive detection events.
 
-        Events are scheduled as a Poisson process.
+        Events are scheduled as a Poisson process, using a single recurring event calling the `get` method.
+        With `lazy_dark_count`, no events are scheduled: times between dark counts are sampled in chunks,
+        and dark counts are processed in order when a photon arrives or `flush_dark_counts` is called.
 
         Side Effects:
-            May schedule future `get` method calls.
-            May schedule future calls to self.
+            May schedule a recurring event on the timeline.
         """
 
+        self._dark_times = None
         if self.dark_count > 0:
-            time_to_next = int(random.exponential(1 / self.dark_count) * 1e12)  # time to next dark count
-            time = time_to_next + self.timeline.now()  # time of next dark count
+            if self.lazy_dark_count:
+                self._dark_clock = self.timeline.now()
+                self._dark_times = self._sample_dark_counts()
+                self._dark_index = 0
+            else:
+                times = PoissonTimes(self.timeline.now(), self.dark_count, rng=self.rng)
+                process = Process(self, "get", [True])
+                self.timeline.schedule(RecurringEvent(self.timeline, times, process))
+
+    def _sample_dark_counts(self) -> "ndarray":
+        # times between dark counts are rounded down to ps, as for PoissonTimes
+        gaps = (self.rng.generator.exponential(1 / self.dark_count, self.DARK_COUNT_CHUNK) * 1e12).astype(int64)
+        times = self._dark_clock + cumsum(gaps)
+        self._dark_clock = int(times[-1])
+        return times
+
+    def flush_dark_counts(self, time=None) -> None:
+        """Method to process pre-sampled dark counts (used with `lazy_dark_count`).
+
+        Args:
+            time (int): dark counts up to and including this time are processed (default None for the current time).
+
+        Side Effects:
+            May notify upper entities of detection events, with the times of the dark counts.
+        """
 
-            process1 = Process(self, "add_dark_count", [])  # schedule photon detection and dark count add in future
-            process2 = Process(self, "get", [True])
-            event1 = Event(time, process1)
-            event2 = Event(time, process2)
-            self.timeline.schedule(event1)
-            self.timeline.schedule(event2)
+        if self._dark_times is None:
+            return
+        if time is None:
+            time = self.timeline.now()
+
+        while True:
+            times = self._dark_times
+            end = int(searchsorted(times, time, side="right"))
+            for dark_time in times[self._dark_index:end].tolist():
+                self._detect(dark_time, True)
+            if end < len(times):
+                self._dark_index = end
+                return
+            self._dark_times = self._sample_dark_counts()
+            self._dark_index = 0
 
     def notify(self, info: Dict[str, Any]):
         """Custom notify function (calls `trigger` method)."""
@@ -100,6 +169,69 @@ class Detector(Entity):
             observer.trigger(self, info)
 
 
+class TimeBuffer():
+    """Class holding detection times in a growable int64 array.
+
+    Times are appended one at a time, and read as a numpy view of the underlying array (without copying).
+    With a `max_size`, only the latest times are kept, in an array of twice that size that is compacted when full.
+
+    Attributes:
+        max_size (int): maximum number of times kept (None for unbounded).
+    """
+
+    def __init__(self, max_size=None, capacity=1024):
+        """Constructor for the time buffer class.
+
+        Args:
+            max_size (int): maximum number of times kept, older times are dropped (default None for unbounded).
+            capacity (int): initial size of the array for unbounded buffers (default 1024).
+        """
+
+        self.max_size = max_size
+        self._times = empty(capacity if max_size is None else 2 * max_size, dtype=int64)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, key):
+        return self._times[self._start:self._end][key]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def append(self, time: int) -> None:
+        """Method to add a detection time."""
+
+        if self._end == len(self._times):
+            self._grow()
+        self._times[self._end] = time
+        self._end += 1
+        if self.max_size is not None and self._end - self._start > self.max_size:
+            self._start += 1
+
+    def _grow(self) -> None:
+        size = len(self)
+        if self.max_size is None:
+            times = empty(2 * len(self._times), dtype=int64)
+            times[:size] = self._times[self._start:self._end]
+            self._times = times
+        else:
+            self._times[:size] = self._times[self._start:self._end]
+        self._start = 0
+        self._end = size
+
+    def view(self) -> "ndarray":
+        """Method to get the detection times.
+
+        Returns:
+            numpy.ndarray: view of the times (valid until further times are appended).
+        """
+
+        return self._times[self._start:self._end]
+
+
 class QSDetector(Entity, ABC):
     """Abstract QSDetector parent class.
 
@@ -109,13 +241,20 @@ class QSDetector(Entity, ABC):
         name (str): label for QSDetector instance.
         timeline (Timeline): timeline for simulation.
         detectors (List[Detector]): list of attached detectors.
-        trigger_times (List[List[int]]): tracks simulation time of detection events for each detector.
+        trigger_times (List[TimeBuffer]): tracks simulation time of detection events for each detector.
+        max_trigger_times (int): maximum number of detection times kept for each detector (None for unbounded).
+
+    Dark counts of the detectors are recorded when photons arrive, or when the photon times are read (see `Detector.lazy_dark_count`).
     """
 
-    def __init__(self, name: str, timeline: "Timeline"):
+    def __init__(self, name: str, timeline: "Timeline", max_trigger_times=None):
         Entity.__init__(self, name, timeline)
         self.detectors = []
         self.trigger_times = []
+        self.max_trigger_times = max_trigger_times
+
+    def _new_trigger_times(self) -> "List[TimeBuffer]":
+        return [TimeBuffer(self.max_trigger_times) for _ in self.detectors]
 
     def update_detector_params(self, detector_id: int, arg_name: str, value: Any) -> None:
         self.detectors[detector_id].__setattr__(arg_name, value)
@@ -130,8 +269,20 @@ class QSDetector(Entity, ABC):
         detector_index = self.detectors.index(detector)
         self.trigger_times[detector_index].append(info['time'])
 
-    def get_photon_times(self):
-        return self.trigger_times
+    def get_photon_times(self) -> "List[ndarray]":
+        """Method to get the detection times of each detector.
+
+        Returns:
+            List[numpy.ndarray]: views of the detection times (valid until further detections).
+        """
+
+        self._flush_dark_counts()
+        return [times.view() for times in self.trigger_times]
+
+    def _flush_dark_counts(self) -> None:
+        # record dark counts of the detectors up to the current time
+        for detector in self.detectors:
+            detector.flush_dark_counts()
 
     @abstractmethod
     def set_basis_list(self, basis_list: "List", start_time: int, frequency: int) -> None:
@@ -148,19 +299,20 @@ class QSDetectorPolarization(QSDetector):
         name (str): label for QSDetector instance.
         timeline (Timeline): timeline for simulation.
         detectors (List[Detector]): list of attached detectors (length 2).
-        trigger_times (List[List[int]]): tracks simulation time of detection events for each detector.
+        trigger_times (List[TimeBuffer]): tracks simulation time of detection events for each detector.
+        max_trigger_times (int): maximum number of detection times kept for each detector (None for unbounded).
         splitter (BeamSplitter): internal beamsplitter object.
     """
 
-    def __init__(self, name: str, timeline: "Timeline"):
-        QSDetector.__init__(self, name, timeline)
-        self.detectors = [Detector(name + ".detector" + str(i), timeline) for i in range(2)]
+    def __init__(self, name: str, timeline: "Timeline", max_trigger_times=None):
+        QSDetector.__init__(self, name, timeline, max_trigger_times)
+        self.detectors = [Detector(name + ".detector" + str(i), timeline, lazy_dark_count=True) for i in range(2)]
         self.splitter = BeamSplitter(name + ".splitter", timeline)
         self.splitter.set_receiver(0, self.detectors[0])
         self.splitter.set_receiver(1, self.detectors[1])
         self.components = [self.splitter, self.detectors[0], self.detectors[1]]
         [component.attach(self) for component in self.components]
-        self.trigger_times = [[], []]
+        self.trigger_times = self._new_trigger_times()
 
     def init(self) -> None:
         """Implementation of Entity interface (see base class)."""
@@ -181,9 +333,31 @@ class QSDetectorPolarization(QSDetector):
 
         self.splitter.get(photon)
 
-    def get_photon_times(self):
-        times, self.trigger_times = self.trigger_times, [[], []]
-        return times
+    def get_batch(self, times: "ndarray", states: "ndarray") -> None:
+        """Method to receive a batch of photons for measurement, after their arrival.
+
+        Forwards the arrival times and states of the photons to the internal polarization beamsplitter.
+
+        Args:
+            times (numpy.ndarray): arrival times (in ps) of the photons, in increasing order (no later than the current time).
+            states (numpy.ndarray): complex coefficients of the photon states, with shape (n, 2).
+
+        Side Effects:
+            Will call `get_batch` method of attached beamsplitter.
+        """
+
+        self.splitter.get_batch(times, states)
+
+    def get_photon_times(self) -> "List[ndarray]":
+        """Method to get and clear the detection times of each detector.
+
+        Returns:
+            List[numpy.ndarray]: views of the detection times (later detections are recorded in new buffers).
+        """
+
+        self._flush_dark_counts()
+        times, self.trigger_times = self.trigger_times, self._new_trigger_times()
+        return [buffer.view() for buffer in times]
 
     def set_basis_list(self, basis_list: "List", start_time: int, frequency: int) -> None:
         self.splitter.set_basis_list(basis_list, start_time, frequency)
@@ -203,15 +377,16 @@ class QSDetectorTimeBin(QSDetector):
         name (str): label for QSDetector instance.
         timeline (Timeline): timeline for simulation.
         detectors (List[Detector]): list of attached detectors (length 3).
-        trigger_times (List[List[int]]): tracks simulation time of detection events for each detector.
+        trigger_times (List[TimeBuffer]): tracks simulation time of detection events for each detector.
+        max_trigger_times (int): maximum number of detection times kept for each detector (None for unbounded).
         switch (Switch): internal optical switch component.
         interferometer (Interferometer): internal interferometer component.
     """
 
-    def __init__(self, name: str, timeline: "Timeline"):
-        QSDetector.__init__(self, name, timeline)
+    def __init__(self, name: str, timeline: "Timeline", max_trigger_times=None):
+        QSDetector.__init__(self, name, timeline, max_trigger_times)
         self.switch = Switch(name + ".switch", timeline)
-        self.detectors = [Detector(name + ".detector" + str(i), timeline) for i in range(3)]
+        self.detectors = [Detector(name + ".detector" + str(i), timeline, lazy_dark_count=True) for i in range(3)]
         self.switch.set_detector(self.detectors[0])
         self.interferometer = Interferometer(name + ".interferometer", timeline, time_bin["bin_separation"])
         self.interferometer.set_receiver(0, self.detectors[1])
@@ -220,7 +395,7 @@ class QSDetectorTimeBin(QSDetector):
 
         self.components = [self.switch, self.interferometer] + self.detectors
         [component.attach(self) for component in self.components]
-        self.trigger_times = [[], [], []]
+        self.trigger_times = self._new_trigger_times()
 
     def init(self):
         """Implementation of Entity interface (see base class)."""
@@ -241,9 +416,16 @@ class QSDetectorTimeBin(QSDetector):
 
         self.switch.get(photon)
 
-    def get_photon_times(self):
-        times, self.trigger_times = self.trigger_times, [[], [], []]
-        return times
+    def get_photon_times(self) -> "List[ndarray]":
+        """Method to get and clear the detection times of each detector.
+
+        Returns:
+            List[numpy.ndarray]: views of the detection times (later detections are recorded in new buffers).
+        """
+
+        self._flush_dark_counts()
+        times, self.trigger_times = self.trigger_times, self._new_trigger_times()
+        return [buffer.view() for buffer in times]
 
     def set_basis_list(self, basis_list: "List", start_time: int, frequency: int) -> None:
         self.switch.set_basis_list(basis_list, start_time, frequency)
@@ -5,7 +5,6 @@ Interferometers are usually instantiated as part of a QSDetector object, defined
 """
 
 from math import sqrt
-from numpy import random
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from ..kernel.timeline import Timeline
@@ -28,6 +27,7 @@ class Interferometer(Entity):
         path_difference (int): difference (in ps) of photon transit time in interferometer branches
         phase_error (float): phase error applied to measurement
         receivers (List[Entities]): entities to receive transmitted photons
+        rng (RandomStream): random number stream of interferometer
     """
 
     def __init__(self, name: str, timeline: "Timeline", path_diff, phase_error=0):
@@ -44,6 +44,7 @@ class Interferometer(Entity):
         self.path_difference = path_diff  # time difference in ps
         self.phase_error = phase_error  # chance of measurement error in phase
         self.receivers = []
+        self.rng = timeline.get_random_stream(name)
 
     def init(self) -> None:
         """See base class."""
@@ -69,10 +70,10 @@ class Interferometer(Entity):
         Side Effects:
             May call get method of one attached receiver from the receivers attribute.
         """
-        detector_num = random.choice([0, 1])
+        detector_num = int(self.rng.random() < 0.5)
         quantum_state = photon.quantum_state
         time = 0
-        random_num = random.random_sample()
+        random_num = self.rng.random()
 
         if quantum_state.state == (complex(1), complex(0)):  # Early
             if random_num <= 0.5:
@@ -85,7 +86,7 @@ class Interferometer(Entity):
             else:
                 time = 2 * self.path_difference
 
-        if random.random_sample() < self.phase_error:
+        if self.rng.random() < self.phase_error:
             quantum_state.state = list(multiply([1, -1], quantum_state))
 
         if quantum_state.state == (complex(sqrt(1/2)), complex(sqrt(1/2))):  # Early + Late
@@ -4,12 +4,15 @@ This module defines the LightSource class to supply individual photons and the S
 These classes should be connected to one or two entities, respectively, that are capable of receiving photons.
 """
 
-from numpy import random, multiply
+from typing import Iterator
 
-from .photon import Photon
+from numpy import multiply, array, arange, repeat
+
+from .photon import Photon, PhotonBatch
 from ..kernel.entity import Entity
 from ..kernel.event import Event
 from ..kernel.process import Process
+from ..kernel.recurring import RecurringEvent
 from ..utils.encoding import polarization
 
 
@@ -28,6 +31,7 @@ class LightSource(Entity):
         encoding_type (Dict[str, Any]): encoding scheme of emitted photons (as defined in the encoding module).
         phase_error (float): phase error applied to qubits.
         photon_counter (int): counter for number of photons emitted.
+        rng (RandomStream): random number stream of light source.
     """
 
     def __init__(self, name, timeline, frequency=8e7, wavelength=1550, bandwidth=0, mean_photon_num=0.1,
@@ -53,6 +57,7 @@ class LightSource(Entity):
         self.encoding_type = encoding_type
         self.phase_error = phase_error
         self.photon_counter = 0
+        self.rng = timeline.get_random_stream(self.name)
         # for BB84
         # self.basis_lists = []
         # self.basis_list = []
@@ -72,33 +77,43 @@ class LightSource(Entity):
 
         Will emit photons for a length of time determined by the `state_list` parameter.
         The number of photons emitted per period is calculated as a poisson random variable.
+        Photon numbers, phase errors and wavelengths are drawn for all periods at once,
+        and the photons are sent to the destination as one PhotonBatch (see `QuantumChannel.transmit_batch`).
+        If the owner cannot send batches, photon objects are built and sent one at a time at their emission times.
 
         Arguments:
             state_list (List[List[complex]]): list of complex coefficient arrays to send as photon-encoded qubits.
             dst (str): name of destination node to receive photons.
         """
 
-        time = self.timeline.now()
+        batch = self._emit_batch(state_list)
+        self.photon_counter += len(batch)
+        if len(batch) == 0:
+            return
+        if hasattr(self.owner, "send_qubit_batch"):
+            self.owner.send_qubit_batch(dst, batch)
+        else:
+            # a single recurring event sends all photons in order
+            process = Process(self, "_send_photon", [dst, batch, iter(range(len(batch)))])
+            self.timeline.schedule(RecurringEvent(self.timeline, batch.times.tolist(), process))
+
+    def _emit_batch(self, state_list) -> PhotonBatch:
+        generator = self.rng.generator
+        num_pulses = len(state_list)
         period = int(round(1e12 / self.frequency))
 
-        for i, state in enumerate(state_list):
-            num_photons = random.poisson(self.mean_photon_num)
+        num_photons = generator.poisson(self.mean_photon_num, num_pulses)
+        states = array(state_list, dtype=complex).reshape(num_pulses, 2)
+        phase_errors = generator.random(num_pulses) < self.phase_error
+        states[phase_errors, 1] *= -1
 
-            if random.random_sample() < self.phase_error:
-                state = multiply([1, -1], state)
+        pulses = repeat(arange(num_pulses), num_photons)
+        times = self.timeline.now() + pulses * period
+        wavelengths = generator.normal(self.wavelength, self.linewidth, len(pulses))
+        return PhotonBatch(times, states[pulses], wavelengths, pulses, self.owner, self.encoding_type)
 
-            for _ in range(num_photons):
-                wavelength = self.linewidth * random.randn() + self.wavelength
-                new_photon = Photon(str(i),
-                                    wavelength=wavelength,
-                                    location=self.owner,
-                                    encoding_type=self.encoding_type,
-                                    quantum_state=state)
-                process = Process(self.owner, "send_qubit", [dst, new_photon])
-                event = Event(time, process)
-                self.owner.timeline.schedule(event)
-                self.photon_counter += 1
-            time += period
+    def _send_photon(self, dst: str, batch: PhotonBatch, indices: "Iterator[int]") -> None:
+        self.owner.send_qubit(dst, batch.get_photon(next(indices)))
 
 
 class SPDCSource(LightSource):
@@ -141,9 +156,9 @@ class SPDCSource(LightSource):
         time = self.timeline.now()
 
         for state in state_list:
-            num_photon_pairs = random.poisson(self.mean_photon_num)
+            num_photon_pairs = self.rng.poisson(self.mean_photon_num)
 
-            if random.random_sample() < self.phase_error:
+            if self.rng.random() < self.phase_error:
                 state = multiply([1, -1], state)
 
             for _ in range(num_photon_pairs):
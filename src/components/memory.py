@@ -8,8 +8,6 @@ Photons should be routed to a BSM device for entanglement generation, or through
 from math import sqrt, inf
 from typing import Any, TYPE_CHECKING, Dict
 
-from numpy import random
-
 if TYPE_CHECKING:
     from ..entanglement_management.entanglement_protocol import EntanglementProtocol
     from ..kernel.timeline import Timeline
@@ -19,8 +17,17 @@ from .photon import Photon
 from ..kernel.entity import Entity
 from ..kernel.event import Event
 from ..kernel.process import Process
+from ..utils.density_matrix import DensityState
 from ..utils.encoding import single_atom
 from ..utils.quantum_state import QuantumState
+from ..utils.stabilizer import StabilizerState
+
+# kets of the bell states, by name (see `Memory.bell_state`)
+# in the order of the bell state measurement basis: the state with X^x Z^z applied to the second qubit of |phi+> has index 2x + z
+BELL_STATES = {"phi+": (sqrt(1 / 2), 0, 0, sqrt(1 / 2)),
+               "phi-": (sqrt(1 / 2), 0, 0, -sqrt(1 / 2)),
+               "psi+": (0, sqrt(1 / 2), sqrt(1 / 2), 0),
+               "psi-": (0, sqrt(1 / 2), -sqrt(1 / 2), 0)}
 
 
 # array of single atom memories
@@ -36,7 +43,7 @@ class MemoryArray(Entity):
     """
 
     def __init__(self, name: str, timeline: "Timeline", num_memories=10,
-                 fidelity=0.85, frequency=80e6, efficiency=1, coherence_time=-1, wavelength=500):
+                 fidelity=0.85, frequency=80e6, efficiency=1, coherence_time=-1, wavelength=500, formalism="ket"):
         """Constructor for the Memory Array class.
 
         Args:
@@ -48,6 +55,7 @@ class MemoryArray(Entity):
             efficiency (float): efficiency of memories (default 1).
             coherence_time (float): average time (in s) that memory state is valid (default -1 -> inf).
             wavelength (int): wavelength (in nm) of photons emitted by memories (default 500).
+            formalism (str): representation of memory states, "ket", "density" or "stabilizer" (default "ket").
         """
 
         Entity.__init__(self, name, timeline)
@@ -56,7 +64,7 @@ class MemoryArray(Entity):
 
         for i in range(num_memories):
             memory = Memory(self.name + "[%d]" % i, timeline, fidelity, frequency, efficiency, coherence_time,
-                            wavelength)
+                            wavelength, formalism)
             memory.attach(self)
             self.memories.append(memory)
 
@@ -102,18 +110,21 @@ class Memory(Entity):
     Attributes:
         name (str): label for memory instance.
         timeline (Timeline): timeline for simulation.
-        fidelity (float): (current) fidelity of memory.
+        fidelity (float): (current) fidelity of memory (computed from the quantum state with the density formalism, see `get_bell_fidelity`).
         raw_fidelity (float): fidelity of memory in the RAW (unentangled) state.
+        bell_state (str): name of the heralded bell state of the memory and its entangled partner (see `BELL_STATES`), None if not entangled.
         frequency (float): maximum frequency at which memory can be excited.
         efficiency (float): probability of emitting a photon when excited.
         coherence_time (float): average usable lifetime of memory (in seconds).
         wavelength (float): wavelength (in nm) of emitted photons.
-        qstate (QuantumState): quantum state of memory.
+        formalism (str): representation of the memory state, "ket", "density" or "stabilizer".
+        qstate (Union[QuantumState, DensityState, StabilizerState]): quantum state of memory.
         entangled_memory (Dict[str, Any]): tracks entanglement state of memory.
+        rng (RandomStream): random number stream of memory.
     """
 
     def __init__(self, name: str, timeline: "Timeline", fidelity: float, frequency: float,
-                 efficiency: float, coherence_time: int, wavelength: int):
+                 efficiency: float, coherence_time: int, wavelength: int, formalism="ket"):
         """Constructor for the Memory class.
 
         Args:
@@ -124,6 +135,8 @@ class Memory(Entity):
             efficiency (float): efficiency of memories.
             coherence_time (float): average time (in s) that memory state is valid.
             wavelength (int): wavelength (in nm) of photons emitted by memories.
+            formalism (str): representation of the memory state, "ket" for QuantumState, "density" for DensityState
+                or "stabilizer" for StabilizerState (default "ket").
         """
 
         Entity.__init__(self, name, timeline)
@@ -131,12 +144,21 @@ class Memory(Entity):
         assert 0 <= efficiency <= 1
 
         self.fidelity = 0
+        self.bell_state = None
         self.raw_fidelity = fidelity
         self.frequency = frequency
         self.efficiency = efficiency
         self.coherence_time = coherence_time  # coherence time in seconds
         self.wavelength = wavelength
-        self.qstate = QuantumState()
+        self.formalism = formalism
+        if formalism == "ket":
+            self.qstate = QuantumState()
+        elif formalism == "density":
+            self.qstate = DensityState()
+        elif formalism == "stabilizer":
+            self.qstate = StabilizerState()
+        else:
+            raise Exception("invalid formalism {} given for memory {}".format(formalism, name))
 
         self.memory_array = None
 
@@ -154,10 +176,22 @@ class Memory(Entity):
         self.excited_photon = None
 
         self.next_excite_time = 0
+        self.rng = timeline.get_random_stream(self.name)
 
     def init(self):
         pass
 
+    @property
+    def fidelity(self) -> float:
+        # with the density formalism, the fidelity of a heralded pair is that of its state (see `get_bell_fidelity`)
+        if self.formalism == "density" and self.bell_state is not None and len(self.qstate.entangled_states) == 2:
+            return self.get_bell_fidelity()
+        return self._fidelity
+
+    @fidelity.setter
+    def fidelity(self, fidelity: float) -> None:
+        self._fidelity = fidelity
+
     def set_memory_array(self, memory_array: MemoryArray):
         self.memory_array = memory_array
 
@@ -178,7 +212,7 @@ class Memory(Entity):
         if self.timeline.now() < self.next_excite_time:
             return
 
-        state = self.qstate.measure(single_atom["bases"][0])
+        state = self.qstate.measure(single_atom["bases"][0], self.rng)
         # create photon and check if null
         photon = Photon("", wavelength=self.wavelength, location=self,
                         encoding_type=self.photon_encoding)
@@ -190,7 +224,7 @@ class Memory(Entity):
             self.next_excite_time = self.timeline.now() + period
 
         # send to direct receiver or node
-        if (state == 0) or (random.random_sample() < self.efficiency):
+        if (state == 0) or (self.rng.random() < self.efficiency):
             self.owner.send_qubit(dst, photon)
             self.excited_photon = photon
 
@@ -218,6 +252,10 @@ class Memory(Entity):
             will modify the quantum state of the memory.
         """
 
+        if self.formalism != "ket":
+            self.qstate.apply_gate(((0, 1), (1, 0)))
+            return
+
         assert len(self.qstate.state) == 2, "qstate length error in memory {}".format(self.name)
         new_state = (self.qstate.state[1], self.qstate.state[0])
         self.qstate.set_state_single(new_state)
@@ -232,8 +270,10 @@ class Memory(Entity):
         """
 
         self.fidelity = 0
-        if len(self.qstate.state) > 2:
-            self.qstate.measure(single_atom["bases"][0])  # to unentangle
+        self.bell_state = None
+        # other formalisms separate the memory from its entangled group in set_state_single
+        if self.formalism == "ket" and len(self.qstate.state) > 2:
+            self.qstate.measure(single_atom["bases"][0], self.rng)  # to unentangle
 
         state = (complex(1), complex(0))
         self.qstate.set_state_single(state)  # set to |0> state
@@ -253,11 +293,62 @@ class Memory(Entity):
         self.qstate.set_state_single(state)
         self.previous_bsm = -1
         self.entangled_memory = {'node_id': None, 'memo_id': None}
+        self.bell_state = None
 
         # schedule expiration
         if self.coherence_time > 0:
             self._schedule_expiration()
 
+    def apply_noise(self, channel: str, param: float) -> None:
+        """Method to apply a noise channel to the memory state.
+
+        Only available with the density formalism (see `DensityState.apply_channel`),
+        or with the stabilizer formalism for Pauli channels (see `StabilizerState.apply_channel`).
+        The stabilizer formalism samples a Pauli error, so the `fidelity` of the memory and of its entangled partner
+        is updated to the expected fidelity after the channel, assuming a Werner state.
+
+        Args:
+            channel (str): name of the channel, one of "depolarizing", "dephasing" or "amplitude_damping".
+            param (float): parameter of the channel.
+        """
+
+        if self.formalism == "density":
+            self.qstate.apply_channel(channel, param)
+        elif self.formalism == "stabilizer":
+            self.qstate.apply_channel(channel, param, self.rng)
+            if self.bell_state is not None:
+                fidelity = self.fidelity
+                if channel == "depolarizing":
+                    # one qubit of a pair depolarized with probability param is left maximally mixed
+                    fidelity = (1 - param) * fidelity + param / 4
+                else:
+                    # a Z error maps the heralded state to one of the other (equally weighted) bell states
+                    fidelity = (1 - param) * fidelity + param * (1 - fidelity) / 3
+                self.fidelity = fidelity
+                partner = self.timeline.entities.get(self.entangled_memory["memo_id"])
+                if partner is not None and partner.entangled_memory["memo_id"] == self.name:
+                    partner.fidelity = fidelity
+        else:
+            raise Exception("noise channels require the density or stabilizer formalism (memory {})".format(self.name))
+
+    def get_bell_fidelity(self) -> float:
+        """Method to compute the fidelity of the memory and its entangled partner from their quantum state.
+
+        The fidelity is computed against the heralded bell state of the pair (see `bell_state`).
+        Only available with the density and stabilizer formalisms.
+        The stabilizer formalism holds a state with sampled errors, so the fidelity is then 0 or 1 (or 1/2 for partly mixed pairs).
+
+        Returns:
+            float: fidelity with the heralded bell state (0 if there is none, or if the memory is not entangled with a single other memory).
+        """
+
+        if self.formalism == "ket":
+            raise Exception("state fidelity requires the density or stabilizer formalism (memory {})".format(self.name))
+        states = self.qstate.entangled_states
+        if self.bell_state is None or len(states) != 2:
+            return 0
+        return self.qstate.fidelity(BELL_STATES[self.bell_state], states)
+
     def _schedule_expiration(self) -> None:
         if self.expiration_event is not None:
             self.timeline.remove_event(self.expiration_event)
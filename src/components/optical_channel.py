@@ -2,18 +2,19 @@
 
 This module introduces the abstract OpticalChannel class for general optical fibers.
 It also defines the QuantumChannel class for transmission of qubits/photons and the ClassicalChannel class for transmission of classical control messages.
+Transmission windows of quantum channels are reserved with the SlotAllocator class.
 OpticalChannels must be attached to nodes on both ends.
 """
 
-import heapq as hq
-from typing import TYPE_CHECKING
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Any, Dict
 
-from numpy import random
+from numpy import count_nonzero, pi, cos, sin, stack
 
 if TYPE_CHECKING:
     from ..kernel.timeline import Timeline
     from ..topology.node import Node
-    from ..components.photon import Photon
+    from ..components.photon import Photon, PhotonBatch
     from ..message import Message
 
 from ..kernel.entity import Entity
@@ -61,6 +62,111 @@ class OpticalChannel(Entity):
         self.distance = distance
 
 
+class SlotAllocator():
+    """Class reserving integer time slots.
+
+    Reserved slots are held as a sorted list of disjoint runs [start, end), searched by bisection.
+    Consecutive reservations (the usual case for a busy channel) extend a single run.
+
+    Attributes:
+        reserved (int): number of slots currently reserved.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self.reserved = 0
+
+    def __len__(self) -> int:
+        return self.reserved
+
+    def __contains__(self, slot: int) -> bool:
+        i = bisect_right(self._starts, slot) - 1
+        return i >= 0 and slot < self._ends[i]
+
+    def first(self) -> int:
+        """Method to get the lowest reserved slot (None if no slot is reserved)."""
+
+        return self._starts[0] if self._starts else None
+
+    def allocate(self, slot: int) -> int:
+        """Method to reserve the earliest free slot.
+
+        Args:
+            slot (int): earliest acceptable slot.
+
+        Returns:
+            int: the reserved slot.
+        """
+
+        starts, ends = self._starts, self._ends
+        i = bisect_right(starts, slot) - 1
+        if i >= 0 and slot <= ends[i]:
+            # extend the run containing (or ending at) the slot
+            slot = ends[i]
+            ends[i] += 1
+        else:
+            i += 1
+            starts.insert(i, slot)
+            ends.insert(i, slot + 1)
+        # merge with the next run
+        if i + 1 < len(starts) and starts[i + 1] == ends[i]:
+            ends[i] = ends.pop(i + 1)
+            del starts[i + 1]
+        self.reserved += 1
+        return slot
+
+    def release(self, slot: int) -> bool:
+        """Method to free a reserved slot.
+
+        Args:
+            slot (int): slot to free.
+
+        Returns:
+            bool: if the slot was reserved.
+        """
+
+        starts, ends = self._starts, self._ends
+        i = bisect_right(starts, slot) - 1
+        if i < 0 or slot >= ends[i]:
+            return False
+        if starts[i] == slot:
+            starts[i] += 1
+        elif ends[i] == slot + 1:
+            ends[i] -= 1
+        else:
+            # split the run
+            starts.insert(i + 1, slot + 1)
+            ends.insert(i + 1, ends[i])
+            ends[i] = slot
+        if starts[i] == ends[i]:
+            del starts[i]
+            del ends[i]
+        self.reserved -= 1
+        return True
+
+    def release_before(self, slot: int) -> int:
+        """Method to free all slots lower than `slot`.
+
+        Args:
+            slot (int): lowest slot to keep.
+
+        Returns:
+            int: number of slots freed.
+        """
+
+        starts, ends = self._starts, self._ends
+        i = bisect_right(ends, slot)
+        freed = sum(ends[j] - starts[j] for j in range(i))
+        del starts[:i]
+        del ends[:i]
+        if starts and starts[0] < slot:
+            freed += slot - starts[0]
+            starts[0] = slot
+        self.reserved -= freed
+        return freed
+
+
 class QuantumChannel(OpticalChannel):
     """Optical channel for transmission of photons/qubits.
 
@@ -75,6 +181,10 @@ class QuantumChannel(OpticalChannel):
         loss (float): loss rate for transmitted photons (determined by attenuation).
         delay (int): delay (in ps) of photon transmission (determined by light speed, distance).
         frequency (float): maximum frequency of qubit transmission (in Hz).
+        slots (SlotAllocator): reserved transmission windows, counted in periods of `frequency`.
+        transmitted_slots (int): number of reserved windows used for transmission.
+        expired_slots (int): number of reserved windows passed without transmission.
+        rng (RandomStream): random number stream of channel.
     """
 
     def __init__(self, name: str, timeline: "Timeline", attenuation: float, distance: int, polarization_fidelity=1, light_speed=2e-4, frequency=8e7):
@@ -94,7 +204,10 @@ class QuantumChannel(OpticalChannel):
         self.delay = 0
         self.loss = 1
         self.frequency = frequency # maximum frequency for sending qubits (measured in Hz)
-        self.send_bins = []
+        self.slots = SlotAllocator()
+        self.transmitted_slots = 0
+        self.expired_slots = 0
+        self.rng = timeline.get_random_stream(self.name)
 
     def init(self) -> None:
         """Implementation of Entity interface (see base class)."""
@@ -121,16 +234,17 @@ class QuantumChannel(OpticalChannel):
 
         assert self.delay != 0 and self.loss != 1, "QuantumChannel init() function has not been run for {}".format(self.name)
 
-        # remove lowest time bin
-        if len(self.send_bins) > 0:
-            time = -1
-            while time < self.timeline.now():
-                time_bin = hq.heappop(self.send_bins)
-                time = int(time_bin * (1e12 / self.frequency))
-            assert time == self.timeline.now(), "qc {} transmit method called at invalid time".format(self.name)
+        # use the reserved time bin of the current time
+        if len(self.slots) > 0:
+            self._expire_slots()
+            time_bin = self.slots.first()
+            assert time_bin is not None and int(time_bin * (1e12 / self.frequency)) == self.timeline.now(), \
+                "qc {} transmit method called at invalid time".format(self.name)
+            self.slots.release(time_bin)
+            self.transmitted_slots += 1
 
         # check if photon kept
-        if (random.random_sample() > self.loss) or qubit.is_null:
+        if (self.rng.random() > self.loss) or qubit.is_null:
             if source not in self.ends:
                 raise Exception("no endpoint", source)
 
@@ -141,8 +255,8 @@ class QuantumChannel(OpticalChannel):
 
             # check if polarization encoding and apply necessary noise
             if (qubit.encoding_type["name"] == "polarization") and (
-                    random.random_sample() > self.polarization_fidelity):
-                qubit.random_noise()
+                    self.rng.random() > self.polarization_fidelity):
+                qubit.random_noise(self.rng)
 
             # schedule receiving node to receive photon at future time determined by light speed
             future_time = self.timeline.now() + self.delay
@@ -154,6 +268,42 @@ class QuantumChannel(OpticalChannel):
         else:
             pass
 
+    def transmit_batch(self, batch: "PhotonBatch", source: "Node") -> None:
+        """Method to transmit a batch of photon-encoded qubits.
+
+        Loss and polarization noise are applied to all photons at once, and the surviving photons arrive as one batch.
+        Unlike `transmit`, photons in a batch do not take the transmission windows given by `schedule_transmit`.
+
+        Args:
+            batch (PhotonBatch): photons to be transmitted, with their emission times (no earlier than the current time).
+            source (Node): source node sending the photons.
+
+        Side Effects:
+            End node that is NOT the source node may receive the surviving photons (via the `receive_qubit_batch` method).
+        """
+
+        assert self.delay != 0 and self.loss != 1, "QuantumChannel init() function has not been run for {}".format(self.name)
+        if source not in self.ends:
+            raise Exception("no endpoint", source)
+        receiver = self.ends[1] if self.ends[0] == source else self.ends[0]
+
+        # check if photons kept
+        generator = self.rng.generator
+        batch = batch.select(generator.random(len(batch)) > self.loss)
+
+        # check if polarization encoding and apply necessary noise
+        if batch.encoding_type["name"] == "polarization":
+            noisy = generator.random(len(batch)) > self.polarization_fidelity
+            angles = generator.random(count_nonzero(noisy)) * 2 * pi
+            batch.states[noisy] = stack((cos(angles), sin(angles)), axis=1)
+
+        # schedule receiving node to receive photons at future times determined by light speed
+        if len(batch) > 0:
+            batch.times += self.delay
+            process = Process(receiver, "receive_qubit_batch", [source.name, batch])
+            event = Event(int(batch.times[0]), process)
+            self.timeline.schedule(event)
+
     def schedule_transmit(self, min_time: int) -> int:
         """Method to schedule a time for photon transmission.
 
@@ -175,14 +325,36 @@ class QuantumChannel(OpticalChannel):
             time_bin = int(time_bin)
 
         # find earliest available time bin
-        while time_bin in self.send_bins:
-            time_bin += 1
-        hq.heappush(self.send_bins, time_bin)
+        self._expire_slots()
+        time_bin = self.slots.allocate(time_bin)
 
         # calculate time
         time = int(time_bin * (1e12 / self.frequency))
         return time
 
+    def _expire_slots(self) -> None:
+        # free reserved time bins earlier than the current time
+        now = self.timeline.now()
+        time_bin = int(now * (self.frequency / 1e12))
+        while int(time_bin * (1e12 / self.frequency)) < now:
+            time_bin += 1
+        self.expired_slots += self.slots.release_before(time_bin)
+
+    def get_slot_stats(self) -> Dict[str, Any]:
+        """Method to get the usage of transmission windows.
+
+        Returns:
+            Dict[str, Any]: mapping of statistic name to value, with keys "reserved" (windows currently reserved),
+                "transmitted", "expired" and "utilization" (fraction of the windows up to the current time used for transmission).
+        """
+
+        self._expire_slots()
+        elapsed = int(self.timeline.now() * (self.frequency / 1e12)) + 1
+        return {"reserved": len(self.slots),
+                "transmitted": self.transmitted_slots,
+                "expired": self.expired_slots,
+                "utilization": self.transmitted_slots / elapsed}
+
 
 class ClassicalChannel(OpticalChannel):
     """Optical channel for transmission of classical messages.
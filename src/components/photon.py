@@ -1,11 +1,12 @@
 """Model for single photon.
 
-This module defines the Photon class for tracking individual photons.
+This module defines the Photon class for tracking individual photons, and the PhotonBatch class for trains of photons held as arrays.
 Photons may be encoded directly with polarization or time bin schemes, or may herald the encoded state of single atom memories.
 """
 
 from ..utils.encoding import polarization
 from ..utils.quantum_state import QuantumState
+from ..utils.stabilizer import StabilizerState
 
 
 class Photon():
@@ -16,12 +17,12 @@ class Photon():
         wavelength (float): wavelength of photon (in nm).
         location (Entity): current location of photon.
         encoding_type (Dict[str, Any]): encoding type of photon (as defined in encoding module).
-        quantum_state (QuantumState): quantum state of photon.
+        quantum_state (Union[QuantumState, StabilizerState]): quantum state of photon.
         is_null (bool): defines whether photon is real or a "ghost" photon (not detectable but used in memory encoding).
     """
 
     def __init__(self, name, wavelength=0, location=None, encoding_type=polarization,
-                 quantum_state=(complex(1), complex(0))):
+                 quantum_state=(complex(1), complex(0)), formalism="ket"):
         """Constructor for the photon class.
 
         Args:
@@ -30,14 +31,21 @@ class Photon():
             location (Entity): location of the photon (default None).
             encoding_type (Dict[str, Any]): encoding type of photon (from encoding module) (default polarization).
             quantum_state (List[complex]): complex coefficients for photon's quantum state (default [1, 0]).
+            formalism (str): representation of the quantum state, "ket" for QuantumState or "stabilizer" for StabilizerState (default "ket").
         """
 
         self.name = name
         self.wavelength = wavelength
         self.location = location
         self.encoding_type = encoding_type
-        self.quantum_state = QuantumState()
-        self.quantum_state.state = quantum_state
+        if formalism == "ket":
+            self.quantum_state = QuantumState()
+            self.quantum_state.state = quantum_state
+        elif formalism == "stabilizer":
+            self.quantum_state = StabilizerState()
+            self.quantum_state.set_state_single(quantum_state)
+        else:
+            raise Exception("invalid formalism {} given for photon {}".format(formalism, name))
         self.is_null = False
 
     def entangle(self, photon):
@@ -45,38 +53,110 @@ class Photon():
 
         self.quantum_state.entangle(photon.quantum_state)
 
-    def random_noise(self):
-        """Method to add random noise to photon's state (see `QuantumState` module)."""
+    def random_noise(self, rng=None):
+        """Method to add random noise to photon's state (see `QuantumState` module).
 
-        self.quantum_state.random_noise()
+        Args:
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+        """
+
+        self.quantum_state.random_noise(rng)
 
     def set_state(self, state):
         self.quantum_state.set_state(state)
 
     @staticmethod
-    def measure(basis, photon):
+    def measure(basis, photon, rng=None):
         """Method to measure a photon (see `QuantumState` module).
 
         Args:
             basis (List[List[complex]]): basis (given as lists of complex coefficients) with which to measure the photon.
             photon (Photon): photon to measure.
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
 
         Returns:
             int: 0/1 value giving result of measurement in given basis.
         """
 
-        return photon.quantum_state.measure(basis)
+        return photon.quantum_state.measure(basis, rng)
 
     @staticmethod
-    def measure_multiple(basis, photons):
+    def measure_multiple(basis, photons, rng=None):
         """Method to measure 2 entangled photons (see `QuantumState` module).
 
         Args:
             basis (List[List[complex]]): basis (given as lists of complex coefficients) with which to measure the photons.
             photons (List[Photon]): list of 2 photons to measure.
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
 
         Returns:
             int: 0-3 value giving the result of measurement in given basis.
         """
 
-        return QuantumState.measure_multiple(basis, [photons[0].quantum_state, photons[1].quantum_state])
+        return type(photons[0].quantum_state).measure_multiple(basis, [photons[0].quantum_state, photons[1].quantum_state], rng)
+
+
+class PhotonBatch():
+    """Class for a train of unentangled photons, held as arrays.
+
+    Photon objects are only built on request (see `get_photon`), so that photons lost or discarded in bulk are never created.
+
+    Attributes:
+        times (numpy.ndarray): simulation times (in ps) of the photons, in increasing order.
+        states (numpy.ndarray): complex coefficients of the photon states, with shape (n, 2).
+        wavelengths (numpy.ndarray): wavelengths of the photons (in nm).
+        pulses (numpy.ndarray): index of the pulse emitting each photon (used as photon name).
+        location (Entity): current location of the photons.
+        encoding_type (Dict[str, Any]): encoding type of the photons (as defined in encoding module).
+    """
+
+    def __init__(self, times, states, wavelengths, pulses, location=None, encoding_type=polarization):
+        """Constructor for the photon batch class.
+
+        Args:
+            times (numpy.ndarray): simulation times (in ps) of the photons, in increasing order.
+            states (numpy.ndarray): complex coefficients of the photon states, with shape (n, 2).
+            wavelengths (numpy.ndarray): wavelengths of the photons (in nm).
+            pulses (numpy.ndarray): index of the pulse emitting each photon.
+            location (Entity): location of the photons (default None).
+            encoding_type (Dict[str, Any]): encoding type of the photons (default polarization).
+        """
+
+        self.times = times
+        self.states = states
+        self.wavelengths = wavelengths
+        self.pulses = pulses
+        self.location = location
+        self.encoding_type = encoding_type
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def get_photon(self, index: int) -> Photon:
+        """Method to build the photon object of one photon in the batch.
+
+        Args:
+            index (int): index of the photon in the batch.
+
+        Returns:
+            Photon: a new photon with the name, wavelength and state of the photon.
+        """
+
+        return Photon(str(self.pulses[index]),
+                      wavelength=float(self.wavelengths[index]),
+                      location=self.location,
+                      encoding_type=self.encoding_type,
+                      quantum_state=tuple(map(complex, self.states[index])))
+
+    def select(self, mask) -> "PhotonBatch":
+        """Method to get a batch of some of the photons.
+
+        Args:
+            mask (numpy.ndarray): boolean mask (or index array) of the photons to keep.
+
+        Returns:
+            PhotonBatch: a new batch holding copies of the selected photons.
+        """
+
+        return PhotonBatch(self.times[mask], self.states[mask], self.wavelengths[mask], self.pulses[mask],
+                           self.location, self.encoding_type)
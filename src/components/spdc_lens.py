@@ -5,8 +5,6 @@ This module defines the SPDCLens class for creation of entangled photons.
 
 from copy import deepcopy
 
-from numpy.random import random_sample
-
 from ..kernel.entity import Entity
 
 
@@ -18,6 +16,7 @@ class SPDCLens(Entity):
         timeline (Timeline): timeline for simulation.
         rate (float): probability of successful down conversion.
         direct_receiver (Entity): entity to receive entangled photons.
+        rng (RandomStream): random number stream of lens.
     """
 
     def __init__(self, name, timeline, rate=1, direct_receiver=None):
@@ -33,6 +32,7 @@ class SPDCLens(Entity):
         Entity.__init__(self, name, timeline)
         self.rate = rate
         self.direct_receiver = direct_receiver
+        self.rng = timeline.get_random_stream(self.name)
 
     def init(self):
         """Implementation of Entity interface (see base class)."""
@@ -51,7 +51,7 @@ class SPDCLens(Entity):
             May create two entangledd photons and send them to the direct_receiver.
         """
 
-        if random_sample() < self.rate:
+        if self.rng.random() < self.rate:
             state = photon.quantum_state
             photon.wavelength /= 2
             new_photon = deepcopy(photon)
@@ -111,8 +111,6 @@ class EntanglementGenerationA(EntanglementProtocol):
         self.ent_round = 0  # keep track of current stage of protocol
         self.bsm_res = [-1, -1]  # keep track of bsm measurements to distinguish Psi+ and Psi-
 
-        self.scheduled_events = []
-
         # misc
         self.primary = False  # one end node is the "primary" that initiates negotiation
         self.debug = False
@@ -191,7 +189,17 @@ class EntanglementGenerationA(EntanglementProtocol):
             log.logger.info(self.own.name + " successful entanglement of memory {}".format(self.memory))
             self.memory.entangled_memory["node_id"] = self.other
             self.memory.entangled_memory["memo_id"] = self.remote_memo_id
-            # TODO: notify of +/- state
+            if self.memory.formalism != "ket":
+                remote_memory = self.own.timeline.entities.get(self.remote_memo_id)
+                if remote_memory is None or remote_memory.bell_state is None:
+                    # the first end to succeed depolarizes its memory, leaving a Werner state with fidelity raw_fidelity
+                    # (the stabilizer formalism samples a Pauli error of the twirled channel instead),
+                    # so that both ends see the noisy state when they update their resource manager
+                    # (noise is applied before the bell state is set, as it is accounted for by raw_fidelity)
+                    self.memory.apply_noise("depolarizing", 4 * (1 - self.memory.raw_fidelity) / 3)
+            # the same detector in both rounds heralds |psi+>, different detectors |psi->
+            self.memory.bell_state = "psi+" if self.bsm_res[0] == self.bsm_res[1] else "psi-"
+            # with the density formalism, the fidelity is computed from the state instead (see `Memory.fidelity`)
             self.memory.fidelity = self.memory.raw_fidelity
             self.own.resource_manager.update(self, self.memory, "ENTANGLED")
 
@@ -255,7 +263,6 @@ class EntanglementGenerationA(EntanglementProtocol):
             process = Process(self, "emit_event", [])
             event = Event(emit_time, process)
             self.own.timeline.schedule(event)
-            self.scheduled_events.append(event)
 
             # send negotiate_ack
             another_emit_time = emit_time + self.qc_delay - another_delay
@@ -272,7 +279,6 @@ class EntanglementGenerationA(EntanglementProtocol):
                 process = Process(self, "update_memory", [])
             event = Event(future_start_time, process)
             self.own.timeline.schedule(event)
-            self.scheduled_events.append(event)
 
         elif msg_type is GenerationMsgType.NEGOTIATE_ACK:
             # configure params
@@ -288,7 +294,6 @@ class EntanglementGenerationA(EntanglementProtocol):
             process = Process(self, "emit_event", [])
             event = Event(msg.emit_time, process)
             self.own.timeline.schedule(event)
-            self.scheduled_events.append(event)
 
             # schedule start if memory_stage is 0, else schedule update_memory
             # TODO: base future start time on resolution
@@ -299,7 +304,6 @@ class EntanglementGenerationA(EntanglementProtocol):
                 process = Process(self, "update_memory", [])
             event = Event(future_start_time, process)
             self.own.timeline.schedule(event)
-            self.scheduled_events.append(event)
 
         elif msg_type is GenerationMsgType.MEAS_RES:
             res = msg.res
@@ -344,9 +348,7 @@ class EntanglementGenerationA(EntanglementProtocol):
 
         assert memory == self.memory
         self.update_resource_manager(memory, 'RAW')
-        for event in self.scheduled_events:
-            if event.time >= self.own.timeline.now():
-                self.own.timeline.remove_event(event)
+        self.own.timeline.cancel_all(self)
 
     def update_resource_manager(self, memory: "Memory", state: str) -> None:
         """Method to update attached memory to desired state.
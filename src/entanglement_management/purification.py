@@ -2,6 +2,7 @@
 
 This module defines code to support the BBPSSW protocol for entanglement purification.
 Success results are pre-determined based on network parameters.
+With the density and stabilizer formalisms, the protocol is applied to the quantum states of the memories instead.
 Also defined is the message type used by the BBPSSW code.
 """
 
@@ -9,12 +10,11 @@ from enum import Enum, auto
 from typing import List, TYPE_CHECKING
 from functools import lru_cache
 
-from numpy.random import random
-
 if TYPE_CHECKING:
     from ..components.memory import Memory
     from ..topology.node import Node
 
+from ..components.memory import BELL_STATES
 from ..message import Message
 from .entanglement_protocol import EntanglementProtocol
 from ..utils import log
@@ -107,21 +107,58 @@ class BBPSSW(EntanglementProtocol):
         assert self.another is not None, "another protocol is not setted; please use set_others function to set it."
         assert (self.kept_memo.entangled_memory["node_id"] ==
                 self.meas_memo.entangled_memory["node_id"])
-        assert self.kept_memo.fidelity == self.meas_memo.fidelity > 0.5
+        is_ket = self.kept_memo.formalism == "ket"
+        if is_ket:
+            assert self.kept_memo.fidelity == self.meas_memo.fidelity > 0.5
 
         if self.is_success is None:
-            if random() < self.success_probability(self.kept_memo.fidelity):
+            if not is_ket:
+                self.purify_states()
+            elif self.kept_memo.rng.random() < self.success_probability(self.kept_memo.fidelity):
                 self.is_success = self.another.is_success = True
             else:
                 self.is_success = self.another.is_success = False
 
         dst = self.kept_memo.entangled_memory["node_id"]
-        if self.is_success:
+        if self.is_success and is_ket:
             self.kept_memo.fidelity = self.improved_fidelity(self.kept_memo.fidelity)
 
         message = BBPSSWMessage(BBPSSWMsgType.PURIFICATION_RES, self.another.name)
         self.own.send_message(dst, message)
 
+    def purify_states(self) -> None:
+        """Method to purify the quantum states of the memories on both nodes (density and stabilizer formalisms).
+
+        Each node applies a CNOT from its kept memory to its measured memory and measures the latter in the Z basis.
+        Purification succeeds if the parity of the results is that of the heralded bell states of the pairs (see `BELL_STATES`).
+        With the stabilizer formalism, the fidelity of the kept memories is set to the expected fidelity after purification.
+
+        Side Effects:
+            Will set `is_success` of both protocol instances.
+            May update the heralded bell state and fidelity of the kept memories on both nodes.
+        """
+
+        memories = [self.kept_memo, self.meas_memo, self.another.kept_memo, self.another.meas_memo]
+        if any(memory.bell_state is None for memory in memories):
+            raise Exception("memories {} have no heralded bell state to purify".format([m.name for m in memories]))
+        names = list(BELL_STATES)
+        kept_index, meas_index = names.index(self.kept_memo.bell_state), names.index(self.meas_memo.bell_state)
+        fidelity = self.improved_fidelity(self.kept_memo.fidelity, self.meas_memo.fidelity)
+
+        results = []
+        for kept_memo, meas_memo in zip(memories[::2], memories[1::2]):
+            kept_memo.qstate.cnot(meas_memo.qstate)
+            results.append(meas_memo.qstate.measure(((1, 0), (0, 1)), meas_memo.rng))
+        self.is_success = self.another.is_success = (results[0] ^ results[1]) == (kept_index ^ meas_index) >> 1
+
+        if self.is_success:
+            # phase errors of the measured pair are copied to the kept pair
+            bell_state = names[kept_index ^ (meas_index & 1)]
+            for kept_memo in memories[::2]:
+                kept_memo.bell_state = bell_state
+                if kept_memo.formalism == "stabilizer":
+                    kept_memo.fidelity = fidelity
+
     def update_resource_manager(self, memory: "Memory", state: str) -> None:
         """Method to update memory parameters.
 
@@ -209,14 +246,17 @@ class BBPSSW(EntanglementProtocol):
 
     @staticmethod
     @lru_cache(maxsize=128)
-    def improved_fidelity(F: float) -> float:
+    def improved_fidelity(F: float, F2: float = None) -> float:
         """Method to calculate fidelity after purification.
         
         Formula comes from Dur and Briegel (2007) formula (18) page 14.
 
         Args:
             F (float): fidelity of entanglement.
+            F2 (float): fidelity of the measured pair (default None for `F`).
         """
 
-        return (F ** 2 + ((1 - F) / 3) ** 2) / (F ** 2 + 2 * F * (1 - F) / 3 + 5 * ((1 - F) / 3) ** 2)
+        if F2 is None:
+            F2 = F
+        return (F * F2 + (1 - F) * (1 - F2) / 9) / (F * F2 + (F * (1 - F2) + (1 - F) * F2) / 3 + 5 * (1 - F) * (1 - F2) / 9)
 
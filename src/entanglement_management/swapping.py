@@ -8,19 +8,20 @@ The entanglement swapping protocol is an asymmetric protocol:
 * The EntanglementSwappingB instance waits for the swapping result from EntanglementSwappingA.
 
 The swapping results decides the following operations of EntanglementSwappingB.
+With the density and stabilizer formalisms, the middle memories are measured in the bell basis,
+and the right end applies a Pauli correction so that the new pair is in the heralded bell state of the left pair.
 Also defined in this module is the message type used by these protocols.
 """
 
 from enum import Enum, auto
-from typing import TYPE_CHECKING
+from typing import Tuple, TYPE_CHECKING
 from functools import lru_cache
 
-from numpy.random import random
-
 if TYPE_CHECKING:
     from ..components.memory import Memory
     from ..topology.node import Node
 
+from ..components.memory import BELL_STATES
 from ..message import Message
 from .entanglement_protocol import EntanglementProtocol
 from ..utils import log
@@ -44,6 +45,8 @@ class EntanglementSwappingMessage(Message):
         remote_node (str): name of the distant node holding the entangled memory of the new pair.
         remote_memo (int): index of the entangled memory on the remote node.
         expire_time (int): expiration time of the new memory pair.
+        bell_state (str): heralded bell state of the new memory pair (None with the ket formalism).
+        correction (int): index of the Pauli correction X^x Z^z to apply to the receiving memory, as 2x + z (see `BELL_STATES`).
     """
 
     def __init__(self, msg_type: str, receiver: str, **kwargs):
@@ -53,6 +56,8 @@ class EntanglementSwappingMessage(Message):
             self.remote_node = kwargs.get("remote_node")
             self.remote_memo = kwargs.get("remote_memo")
             self.expire_time = kwargs.get("expire_time")
+            self.bell_state = kwargs.get("bell_state")
+            self.correction = kwargs.get("correction", 0)
         else:
             raise Exception("Entanglement swapping protocol create unkown type of message: %s" % str(msg_type))
 
@@ -143,26 +148,69 @@ class EntanglementSwappingA(EntanglementProtocol):
         assert self.right_memo.entangled_memory["node_id"] == self.right_protocol.own.name
 
         fidelity = 0
-        if random() < self.success_probability():
-            fidelity = self.updated_fidelity(self.left_memo.fidelity, self.right_memo.fidelity)
+        bell_state = None
+        correction = 0
+        if self.left_memo.rng.random() < self.success_probability():
+            if self.left_memo.formalism == "ket":
+                fidelity = self.updated_fidelity(self.left_memo.fidelity, self.right_memo.fidelity)
+            else:
+                fidelity, bell_state, correction = self.swap_states()
             self.is_success = True
         expire_time = min(self.left_memo.get_expire_time(), self.right_memo.get_expire_time())
         msg = EntanglementSwappingMessage(SwappingMsgType.SWAP_RES, self.left_protocol.name,
                                           fidelity=fidelity,
                                           remote_node=self.right_memo.entangled_memory["node_id"],
                                           remote_memo=self.right_memo.entangled_memory["memo_id"],
-                                          expire_time=expire_time)
+                                          expire_time=expire_time,
+                                          bell_state=bell_state)
         self.own.send_message(self.left_protocol.own.name, msg)
         msg = EntanglementSwappingMessage(SwappingMsgType.SWAP_RES, self.right_protocol.name,
                                           fidelity=fidelity,
                                           remote_node=self.left_memo.entangled_memory["node_id"],
                                           remote_memo=self.left_memo.entangled_memory["memo_id"],
-                                          expire_time=expire_time)
+                                          expire_time=expire_time,
+                                          bell_state=bell_state,
+                                          correction=correction)
         self.own.send_message(self.right_protocol.own.name, msg)
 
         self.update_resource_manager(self.left_memo, "RAW")
         self.update_resource_manager(self.right_memo, "RAW")
 
+    def swap_states(self) -> Tuple[float, str, int]:
+        """Method to swap entanglement on the quantum states of the memories (density and stabilizer formalisms).
+
+        The degradation is modeled as a depolarizing channel on the left memory (with probability 1 - degradation).
+        The middle memories are then measured in the bell basis, which leaves the end memories in the bell state
+        whose index (see `BELL_STATES`) is the XOR of the indices of both pairs and of the measurement result.
+
+        Returns:
+            Tuple[float, str, int]: fidelity of the new pair, heralded bell state of the new pair (that of the left pair)
+                and index of the Pauli correction that the right end should apply.
+        """
+
+        if self.left_memo.bell_state is None or self.right_memo.bell_state is None:
+            raise Exception("memories {} and {} have no heralded bell state to swap".format(self.left_memo.name,
+                                                                                            self.right_memo.name))
+        self.left_memo.apply_noise("depolarizing", 1 - self.degradation)
+        f1, f2 = self.left_memo.fidelity, self.right_memo.fidelity
+
+        left_state, right_state = self.left_memo.qstate, self.right_memo.qstate
+        if right_state not in left_state.entangled_states:
+            left_state.entangle(right_state)
+        result = left_state.measure_multiple(list(BELL_STATES.values()), [left_state, right_state], self.left_memo.rng)
+
+        names = list(BELL_STATES)
+        bell_state = self.left_memo.bell_state
+        index = names.index(bell_state) ^ names.index(self.right_memo.bell_state) ^ result
+        if self.left_memo.formalism == "density":
+            left_end = self.own.timeline.entities.get(self.left_remote_memo)
+            right_end = self.own.timeline.entities.get(self.right_remote_memo)
+            fidelity = left_end.qstate.fidelity(BELL_STATES[names[index]], [left_end.qstate, right_end.qstate])
+        else:
+            # expected fidelity of swapped werner states
+            fidelity = f1 * f2 + (1 - f1) * (1 - f2) / 3
+        return fidelity, bell_state, index ^ names.index(bell_state)
+
     def update_resource_manager(self, memory: "Memory", state: str) -> None:
         """Method to update attached memory to desired state.
 
@@ -292,6 +340,12 @@ class EntanglementSwappingB(EntanglementProtocol):
         assert src == self.another.own.name
 
         if msg.fidelity > 0 and self.own.timeline.now() < msg.expire_time:
+            if msg.bell_state is not None:
+                if msg.correction & 1:
+                    self.memory.qstate.apply_gate(((1, 0), (0, -1)))
+                if msg.correction & 2:
+                    self.memory.qstate.apply_gate(((0, 1), (1, 0)))
+                self.memory.bell_state = msg.bell_state
             self.memory.fidelity = msg.fidelity
             self.memory.entangled_memory["node_id"] = msg.remote_node
             self.memory.entangled_memory["memo_id"] = msg.remote_memo
@@ -10,20 +10,30 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .process import Process
 
+# epoch of events not scheduled through a timeline (never ended)
+_NO_EPOCH = [False]
+
 
 class Event:
     """Class of events for simulation.
 
     Events are sorted by their time and priority. Events with lower times come before events with higher times.
     Events with the same time are sorted by their priority from low to high.
+    Events are also invalid once the epoch of their process owner has ended (see `Timeline.cancel_all`).
 
     Attributes:
         time (int): the execution time of the event.
         process (Process): the process encapsulated in the event.
         priority (int): the priority of the event, lower value denotes a higher priority.
         _is_removed (bool): the flag to denotes if it's a valid event
+        _index (int): the position of the event in its event queue (-1 if not in a queue).
+        _entry (list): the [time, priority, sequence number, event] entry of the event in the event list heap.
+        _func (Callable): the bound method of the process, resolved when the event is scheduled.
+        _epoch (List[bool]): epoch of the process owner when the event was scheduled, a list shared by the events of the owner holding True once ended.
     """
 
+    __slots__ = ("time", "priority", "process", "_is_removed", "_index", "_entry", "_func", "_epoch")
+
     def __init__(self, time: int, process: "Process", priority=inf):
         """Constructor for event class.
         
@@ -37,6 +47,10 @@ class Event:
         self.priority = priority
         self.process = process
         self._is_removed = False
+        self._index = -1
+        self._entry = None
+        self._func = None
+        self._epoch = _NO_EPOCH
 
     def __eq__(self, another):
         return (self.time == another.time) and (self.priority == another.priority)
@@ -54,4 +68,4 @@ class Event:
         self._is_removed = True
 
     def is_invalid(self):
-        return self._is_removed
+        return self._is_removed or self._epoch[0]
@@ -1,77 +1,680 @@
-"""Definition of EventList class.
+"""Definition of EventList class and alternative event queues.
 
 This module defines the EventList class, used by the timeline to order and execute events.
 EventList is implemented as a min heap ordered by simulation time.
+Also defined are the CalendarQueue and LadderQueue classes, which provide O(1) amortized alternatives for event mixes with regular spacing.
+All event queues implement the EventQueue interface and may be constructed by name with the `make_event_queue` function.
 """
 
-from typing import TYPE_CHECKING
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from heapq import heapify, heappop, heappush
+from math import inf
+from typing import TYPE_CHECKING, Iterator, List
 
 if TYPE_CHECKING:
     from .event import Event
 
-from heapq import heappush, heappop
 
+def make_event_queue(queue_type="heap", compaction_ratio=0.5) -> "EventQueue":
+    """Function to construct event queue of specified type.
 
-class EventList:
-    """Class of event list.
+    Args:
+        queue_type (str): type of queue to generate, one of "heap", "calendar" or "ladder" (default "heap").
+        compaction_ratio (float): ratio of invalid events at which the queue is rebuilt (default 0.5).
+    """
+
+    if queue_type == "heap":
+        return EventList(compaction_ratio)
+    elif queue_type == "calendar":
+        return CalendarQueue(compaction_ratio=compaction_ratio)
+    elif queue_type == "ladder":
+        return LadderQueue(compaction_ratio=compaction_ratio)
+    else:
+        raise Exception("invalid event queue type {}".format(queue_type))
+
+
+class EventQueue(ABC):
+    """Abstract event queue interface used by the timeline.
 
-    This class is implemented as a min-heap. The event with the lowest time and priority is placed at the top of heap.
+    Event queues must pop events in order of (time, priority).
+    Events record whether they are stored in a queue in the `Event._index` field (-1 if not stored, otherwise a position used by the queue).
+
+    Removed events are only marked as invalid and stay in the queue until they are popped.
+    The queue counts these invalid events and rebuilds itself without them once they make up `compaction_ratio` of the queue.
 
     Attributes:
-        data (List[Event]): heap storing events.
+        compaction_ratio (float): ratio of invalid events at which the queue is compacted.
+        invalid_count (int): number of invalid events stored in the queue.
+        compactions (int): number of times the queue has been compacted.
     """
 
-    def __init__(self):
-        self.data = []
+    _MIN_COMPACTION = 1024  # minimum number of invalid events before compaction
 
-    def __len__(self):
-        return len(self.data)
+    def __init__(self, compaction_ratio=0.5):
+        self.compaction_ratio = compaction_ratio
+        self.invalid_count = 0
+        self.compactions = 0
 
-    def __iter__(self):
-        for data in self.data:
-            yield data
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
 
-    def push(self, event: "Event") -> "None":
-        heappush(self.data, event)
+    @abstractmethod
+    def __iter__(self) -> Iterator["Event"]:
+        pass
+
+    @abstractmethod
+    def push(self, event: "Event") -> None:
+        """Method to add an event to the queue."""
 
+        pass
+
+    @abstractmethod
     def pop(self) -> "Event":
-        return heappop(self.data)
+        """Method to remove and return the event with the lowest time and priority."""
+
+        pass
+
+    @abstractmethod
+    def unpop(self, event: "Event") -> None:
+        """Method to return the last popped event to the front of the queue.
+
+        Unlike `push`, the event is placed before events with equal time and priority,
+        so that popping it again gives the same order as if it had not been popped.
+        """
+
+        pass
 
     def isempty(self) -> bool:
-        return len(self.data) == 0
+        return len(self) == 0
+
+    @property
+    def stale_count(self) -> int:
+        """Number of superseded entries left in the queue by `update_event_time` (not counted by `len`)."""
+
+        return 0
 
     def remove(self, event: "Event") -> None:
-        """Method to remove events from heap.
+        """Method to remove events from queue.
 
-        The event is set as the invalid state to save the time of removing event from heap.
+        The event is set as the invalid state to save the time of removing event from the queue.
+        May compact the queue if the ratio of invalid events is reached.
         """
 
+        if event.is_invalid():
+            return
+
         event.set_invalid()
+        if event._index >= 0:
+            self.invalid_count += 1
+            if self.invalid_count >= max(self._MIN_COMPACTION, self.compaction_ratio * len(self)):
+                self.compact()
+
+    def compact(self) -> None:
+        """Method to rebuild the queue without invalid events."""
+
+        events = []
+        for event in self:
+            if event.is_invalid():
+                event._index = -1
+            else:
+                events.append(event)
+
+        self._rebuild(events)
+        self.invalid_count = 0
+        self.compactions += 1
+
+    @abstractmethod
+    def _rebuild(self, events: "List[Event]") -> None:
+        """Method to replace the contents of the queue with `events`."""
+
+        pass
+
+    @abstractmethod
+    def update_event_time(self, event: "Event", time: int) -> None:
+        """Method to update the timestamp of event and maintain the queue order."""
+
+        pass
+
+
+class EventList(EventQueue):
+    """Class of event list.
+
+    This class is implemented as a min-heap (using `heapq`). The event with the lowest time and priority is placed at the top of heap.
+    The heap stores entries [time, priority, sequence number, event], so that comparisons are performed on lists of numbers
+    and events with equal time and priority are popped in the order they were pushed.
+    Each event stores its own entry (`Event._entry`), so that rescheduling an event does not require a search:
+    the old entry is marked as stale (event set to None) and a new entry is pushed.
+
+    Attributes:
+        compaction_ratio (float): ratio of invalid events at which the heap is compacted.
+        invalid_count (int): number of invalid events stored in the heap.
+        compactions (int): number of times the heap has been compacted.
+    """
+
+    def __init__(self, compaction_ratio=0.5):
+        super().__init__(compaction_ratio)
+        self._heap = []
+        self._seq = 0
+        self._unpop_seq = 0
+        self._stale = 0
+
+    def __len__(self):
+        return len(self._heap) - self._stale
+
+    @property
+    def stale_count(self) -> int:
+        return self._stale
+
+    def __iter__(self):
+        for entry in self._heap:
+            if entry[3] is not None:
+                yield entry[3]
+
+    @property
+    def data(self) -> "List[Event]":
+        """List of events in heap order (the first event is the next to pop)."""
+
+        heap = self._heap
+        while heap and heap[0][3] is None:
+            heappop(heap)
+            self._stale -= 1
+        return list(self)
+
+    def push(self, event: "Event") -> "None":
+        entry = [event.time, event.priority, self._seq, event]
+        self._seq += 1
+        event._entry = entry
+        event._index = 0
+        heappush(self._heap, entry)
+
+    def pop(self) -> "Event":
+        heap = self._heap
+        event = heappop(heap)[3]
+        while event is None:
+            self._stale -= 1
+            event = heappop(heap)[3]
+        event._index = -1
+        # popped events drop their entry, so that executed events do not form reference cycles with it
+        event._entry = None
+        if event._is_removed:
+            self.invalid_count -= 1
+        return event
+
+    def unpop(self, event: "Event") -> None:
+        # the popped event was first among events of equal time and priority, so a decreasing sequence number keeps it first
+        self._unpop_seq -= 1
+        entry = [event.time, event.priority, self._unpop_seq, event]
+        event._entry = entry
+        event._index = 0
+        heappush(self._heap, entry)
+
+    def isempty(self) -> bool:
+        return len(self._heap) == self._stale
+
+    def _rebuild(self, events: "List[Event]") -> None:
+        self._heap = [event._entry for event in events]
+        heapify(self._heap)
+        self._stale = 0
 
     def update_event_time(self, event: "Event", time: int):
         """Method to update the timestamp of event and maintain the min-heap structure.
+
+        The entry of the event is read from the event itself, so the update takes O(log n) time.
+        Events that are not stored in the heap are left unchanged.
         """
+
         if time == event.time:
             return
 
-        def _pop_updated_event(heap: "List", index: int):
-            parent_i = (index - 1) // 2
-            while index > 0 and event < self.data[parent_i]:
-                heap[index], heap[parent_i] = heap[parent_i], heap[index]
-                index = parent_i
-                parent_i = (parent_i - 1) // 2
-
-        for i, e in enumerate(self.data):
-            if id(e) == id(event):
-                if event.time > time:
-                    event.time = time
-                    _pop_updated_event(self.data, i)
-
-                elif event.time < time:
-                    event.time = -1
-                    _pop_updated_event(self.data, i)
-                    self.pop()
-                    event.time = time
-                    self.push(event)
-
-                break
+        entry = event._entry
+        if event._index < 0 or entry is None or entry[3] is not event:
+            return
+
+        entry[3] = None
+        self._stale += 1
+        event.time = time
+        self.push(event)
+
+        if self._stale >= max(self._MIN_COMPACTION, len(self._heap) // 2):
+            self.compact()
+
+
+class CalendarQueue(EventQueue):
+    """Class of calendar event queue.
+
+    This class implements the calendar queue of R. Brown (1988).
+    Events are hashed by time into an array of buckets ("days") that together span one "year".
+    Each bucket is kept sorted, and events are dequeued by sweeping the buckets in order.
+    The number of buckets and the bucket width are adapted as the queue grows and shrinks.
+    Events scheduled at infinite time are kept in a separate sorted list.
+
+    Attributes:
+        num_buckets (int): current number of buckets.
+        bucket_width (float): width (in ps) of the time range covered by one bucket.
+    """
+
+    _SAMPLE_SIZE = 25
+
+    def __init__(self, num_buckets=2, bucket_width=1, compaction_ratio=0.5):
+        """Constructor for calendar queue class.
+
+        Args:
+            num_buckets (int): initial number of buckets (default 2).
+            bucket_width (float): initial width (in ps) of buckets (default 1).
+            compaction_ratio (float): ratio of invalid events at which the queue is compacted (default 0.5).
+        """
+
+        super().__init__(compaction_ratio)
+        self._buckets = [[] for _ in range(num_buckets)]
+        self.bucket_width = bucket_width
+        self._size = 0
+        self._current = 0  # virtual bucket (time // bucket_width) currently dequeued
+        self._infinite = []  # sorted events with infinite time
+
+    @property
+    def num_buckets(self) -> int:
+        return len(self._buckets)
+
+    def __len__(self):
+        return self._size + len(self._infinite)
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            for event in bucket:
+                yield event
+        for event in self._infinite:
+            yield event
+
+    def push(self, event: "Event") -> None:
+        if event.time == inf:
+            insort(self._infinite, event)
+            event._index = 0
+            return
+
+        self._insert(event)
+        self._size += 1
+        if self._size > 2 * len(self._buckets):
+            self._resize(2 * len(self._buckets))
+
+    def pop(self) -> "Event":
+        if self._size == 0:
+            if self._infinite:
+                return self._pop_infinite()
+            raise IndexError("pop from empty calendar queue")
+
+        buckets = self._buckets
+        num_buckets = len(buckets)
+        width = self.bucket_width
+        current = self._current
+
+        for _ in range(num_buckets):
+            bucket = buckets[current % num_buckets]
+            if bucket and bucket[0].time // width <= current:
+                return self._take(current)
+            current += 1
+
+        # no event within one year, search all buckets directly
+        i = min((j for j in range(num_buckets) if buckets[j]), key=lambda j: buckets[j][0])
+        return self._take(int(buckets[i][0].time // width))
+
+    def unpop(self, event: "Event") -> None:
+        if event.time == inf:
+            self._infinite.insert(0, event)
+            event._index = 0
+            return
+
+        virtual_bucket = int(event.time // self.bucket_width)
+        index = virtual_bucket % len(self._buckets)
+        self._buckets[index].insert(0, event)
+        event._index = index
+        self._current = virtual_bucket
+        self._size += 1
+
+    def update_event_time(self, event: "Event", time: int) -> None:
+        """Method to update the timestamp of event and maintain the queue order.
+
+        The event is removed from its bucket and inserted again with the new time.
+        Events that are not stored in the queue are left unchanged.
+        """
+
+        if time == event.time or event._index < 0:
+            return
+
+        if event.time == inf:
+            bucket = self._infinite
+        else:
+            bucket = self._buckets[int(event.time // self.bucket_width) % len(self._buckets)]
+        if not _remove_sorted(bucket, event):
+            return
+
+        if bucket is not self._infinite:
+            self._size -= 1
+        event.time = time
+        self.push(event)
+
+    def _insert(self, event: "Event") -> None:
+        time = event.time
+        virtual_bucket = int(time // self.bucket_width)
+        index = virtual_bucket % len(self._buckets)
+        insort(self._buckets[index], event)
+        event._index = index
+
+        # move the dequeue position back if the event is earlier than the current bucket
+        if virtual_bucket < self._current:
+            self._current = virtual_bucket
+
+    def _take(self, virtual_bucket: int) -> "Event":
+        event = self._buckets[virtual_bucket % len(self._buckets)].pop(0)
+        event._index = -1
+        if event._is_removed:
+            self.invalid_count -= 1
+        self._size -= 1
+        self._current = virtual_bucket
+        if 2 < len(self._buckets) and self._size < len(self._buckets) // 2:
+            self._resize(len(self._buckets) // 2)
+        return event
+
+    def _pop_infinite(self) -> "Event":
+        event = self._infinite.pop(0)
+        event._index = -1
+        if event._is_removed:
+            self.invalid_count -= 1
+        return event
+
+    def _rebuild(self, events: "List[Event]") -> None:
+        self._buckets = [[] for _ in range(len(self._buckets))]
+        self._infinite = []
+        self._size = 0
+        self._current = 0
+        for event in events:
+            if event.time == inf:
+                self._infinite.append(event)
+                event._index = 0
+            else:
+                self._buckets[0].append(event)
+                self._size += 1
+        self._resize(len(self._buckets))
+
+    def _resize(self, num_buckets: int) -> None:
+        """Method to rebuild the calendar with a new number of buckets and an estimated bucket width."""
+
+        events = sorted(event for bucket in self._buckets for event in bucket)
+
+        # estimate bucket width from the average separation of the earliest events
+        # the width is bounded below so that one year spans all events (avoids direct searches)
+        sample = events[:self._SAMPLE_SIZE]
+        if len(sample) > 1:
+            separations = [b.time - a.time for a, b in zip(sample, sample[1:])]
+            average = sum(separations) / len(separations)
+            small = [s for s in separations if s <= 2 * average]
+            width = max(3 * sum(small) / len(small), (events[-1].time - events[0].time) / num_buckets)
+            if width > 0:
+                self.bucket_width = width
+
+        self._buckets = [[] for _ in range(num_buckets)]
+        for event in events:
+            index = int(event.time // self.bucket_width) % num_buckets
+            self._buckets[index].append(event)
+            event._index = index
+
+        if events:
+            self._current = int(events[0].time // self.bucket_width)
+
+
+class _Rung():
+    """Class for one rung of a ladder queue.
+
+    Attributes:
+        start (float): time (in ps) at the start of the first bucket.
+        width (float): width (in ps) of each bucket.
+        buckets (List[List[Event]]): unsorted buckets of events.
+        current (int): index of the next bucket to dequeue.
+    """
+
+    def __init__(self, start: float, width: float, num_buckets: int):
+        self.start = start
+        self.width = width
+        self.buckets = [[] for _ in range(num_buckets)]
+        self.current = 0
+
+
+class LadderQueue(EventQueue):
+    """Class of ladder event queue.
+
+    This class implements the ladder queue of W. T. Tang, R. S. M. Goh and I. L.-J. Thng (2005).
+    The queue is split into three tiers:
+
+    * Top: an unsorted list of events far in the future.
+    * Ladder: rungs of unsorted buckets; crowded buckets are split into finer rungs.
+    * Bottom: a short sorted list of the events to be dequeued next.
+
+    Only the bottom is sorted, and only once its events are close to being dequeued.
+    Events scheduled at infinite time are kept in a separate sorted list.
+
+    Attributes:
+        threshold (int): maximum number of events in a bucket before it is sorted into the bottom without splitting.
+        max_rungs (int): maximum number of rungs in the ladder.
+    """
+
+    def __init__(self, threshold=50, max_rungs=8, compaction_ratio=0.5):
+        """Constructor for ladder queue class.
+
+        Args:
+            threshold (int): bucket size above which buckets are split into a new rung (default 50).
+            max_rungs (int): maximum number of rungs (default 8).
+            compaction_ratio (float): ratio of invalid events at which the queue is compacted (default 0.5).
+        """
+
+        super().__init__(compaction_ratio)
+        self.threshold = threshold
+        self.max_rungs = max_rungs
+        self._top = []
+        self._top_start = float("-inf")  # events after this time are stored in top
+        self._rungs = []
+        self._bottom = []
+        self._infinite = []  # sorted events with infinite time
+        self._size = 0
+
+    def __len__(self):
+        return self._size + len(self._infinite)
+
+    def __iter__(self):
+        for event in self._top:
+            yield event
+        for rung in self._rungs:
+            for bucket in rung.buckets:
+                for event in bucket:
+                    yield event
+        for event in self._bottom:
+            yield event
+        for event in self._infinite:
+            yield event
+
+    def push(self, event: "Event") -> None:
+        if event.time == inf:
+            insort(self._infinite, event)
+            event._index = 0
+            return
+
+        self._insert(event)
+        self._size += 1
+
+    def pop(self) -> "Event":
+        if self._size == 0:
+            if self._infinite:
+                return self._pop_infinite()
+            raise IndexError("pop from empty ladder queue")
+
+        if not self._bottom:
+            self._refill_bottom()
+        event = self._bottom.pop(0)
+        event._index = -1
+        if event._is_removed:
+            self.invalid_count -= 1
+        self._size -= 1
+        if self._size == 0:
+            self._top_start = float("-inf")
+        return event
+
+    def unpop(self, event: "Event") -> None:
+        if event.time == inf:
+            self._infinite.insert(0, event)
+            event._index = 0
+        elif self._size == 0:
+            self.push(event)
+        else:
+            self._bottom.insert(0, event)
+            event._index = 0
+            self._size += 1
+
+    def update_event_time(self, event: "Event", time: int) -> None:
+        """Method to update the timestamp of event and maintain the queue order.
+
+        The event is removed from its tier and inserted again with the new time.
+        Events that are not stored in the queue are left unchanged.
+        """
+
+        if time == event.time or event._index < 0:
+            return
+
+        if event.time == inf:
+            if _remove_sorted(self._infinite, event):
+                event.time = time
+                self.push(event)
+        elif self._remove_from_top(event) or self._remove_from_rungs(event) or _remove_sorted(self._bottom, event):
+            self._size -= 1
+            event.time = time
+            self.push(event)
+
+    def _rebuild(self, events: "List[Event]") -> None:
+        self._top = []
+        self._top_start = float("-inf")
+        self._rungs = []
+        self._bottom = []
+        self._infinite = []
+        self._size = 0
+        for event in events:
+            self.push(event)
+
+    def _insert(self, event: "Event") -> None:
+        time = event.time
+        if time > self._top_start:
+            event._index = len(self._top)
+            self._top.append(event)
+            return
+
+        event._index = 0
+        for rung in self._rungs:
+            index = int((time - rung.start) // rung.width)
+            if index >= rung.current:
+                rung.buckets[min(index, len(rung.buckets) - 1)].append(event)
+                return
+
+        insort(self._bottom, event)
+
+    def _pop_infinite(self) -> "Event":
+        event = self._infinite.pop(0)
+        event._index = -1
+        if event._is_removed:
+            self.invalid_count -= 1
+        return event
+
+    def _refill_bottom(self) -> None:
+        """Method to move the next bucket of events into the (empty) bottom."""
+
+        while True:
+            if not self._rungs:
+                self._top_to_ladder()
+                if self._bottom:
+                    return
+                continue
+
+            rung = self._rungs[-1]
+            while rung.current < len(rung.buckets) and not rung.buckets[rung.current]:
+                rung.current += 1
+            if rung.current == len(rung.buckets):
+                self._rungs.pop()
+                continue
+
+            bucket = rung.buckets[rung.current]
+            bucket_start = rung.start + rung.current * rung.width
+            rung.buckets[rung.current] = []
+            rung.current += 1
+
+            if len(bucket) > self.threshold and len(self._rungs) < self.max_rungs and \
+                    any(event.time != bucket[0].time for event in bucket):
+                new_rung = _Rung(bucket_start, rung.width / len(bucket), len(bucket))
+                self._rungs.append(new_rung)
+                for event in bucket:
+                    index = int((event.time - new_rung.start) // new_rung.width)
+                    new_rung.buckets[min(max(index, 0), len(bucket) - 1)].append(event)
+                continue
+
+            bucket.sort()
+            self._bottom = bucket
+            return
+
+    def _top_to_ladder(self) -> None:
+        """Method to move all events in top into a new first rung."""
+
+        top = self._top
+        self._top = []
+        for event in top:
+            event._index = 0
+
+        min_time = min(event.time for event in top)
+        max_time = max(event.time for event in top)
+        if len(top) <= self.threshold or min_time == max_time:
+            top.sort()
+            self._bottom = top
+            self._top_start = max_time
+            return
+
+        num_buckets = len(top) + 1
+        rung = _Rung(min_time, (max_time - min_time) / len(top), num_buckets)
+        self._rungs.append(rung)
+        self._top_start = min_time + num_buckets * rung.width
+        for event in top:
+            index = int((event.time - rung.start) // rung.width)
+            rung.buckets[min(index, num_buckets - 1)].append(event)
+
+    def _remove_from_top(self, event: "Event") -> bool:
+        index = event._index
+        top = self._top
+        if index >= len(top) or top[index] is not event:
+            return False
+        last = top.pop()
+        if last is not event:
+            top[index] = last
+            last._index = index
+        return True
+
+    def _remove_from_rungs(self, event: "Event") -> bool:
+        for rung in self._rungs:
+            index = int((event.time - rung.start) // rung.width)
+            if index >= rung.current:
+                bucket = rung.buckets[min(index, len(rung.buckets) - 1)]
+                for i, e in enumerate(bucket):
+                    if e is event:
+                        del bucket[i]
+                        return True
+                return False
+        return False
+
+
+def _remove_sorted(events: "List[Event]", event: "Event") -> bool:
+    """Function to remove an event from a sorted list of events.
+
+    Returns:
+        bool: if the event was found and removed.
+    """
+
+    i = bisect_left(events, event)
+    while i < len(events) and events[i] is not event:
+        i += 1
+    if i == len(events):
+        return False
+    del events[i]
+    return True
@@ -0,0 +1,106 @@
+"""Definition of the Profiler class.
+
+This module defines the Profiler class, which records the execution time of events by activation.
+A profiler is attached to a timeline with `Timeline(profile=True)`.
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+
+class Profiler:
+    """Class recording execution statistics of events.
+
+    Events are grouped by the class name of the process owner and the name of the activation method.
+    For each group, the number of executed events and the total and maximum wall time (in ns) are recorded.
+
+    Attributes:
+        stats (Dict[Tuple[str, str], List[int]]): mapping of (owner class, activation) to [count, total time, max time].
+    """
+
+    COLUMNS = ["owner", "activation", "count", "total_time", "max_time", "mean_time"]
+
+    def __init__(self):
+        self.stats = {}
+
+    def record(self, key: Tuple[str, str], elapsed: int) -> None:
+        """Method to record the execution of an event.
+
+        Args:
+            key (Tuple[str, str]): (owner class name, activation method name) of the event.
+            elapsed (int): wall time (in ns) of the execution.
+        """
+
+        stat = self.stats.get(key)
+        if stat is None:
+            self.stats[key] = [1, elapsed, elapsed]
+        else:
+            stat[0] += 1
+            stat[1] += elapsed
+            if elapsed > stat[2]:
+                stat[2] = elapsed
+
+    def reset(self) -> None:
+        """Method to clear all recorded statistics."""
+
+        self.stats = {}
+
+    def get_report(self, sort_by="total_time") -> List[Dict]:
+        """Method to get recorded statistics.
+
+        Args:
+            sort_by (str): column to sort by in descending order, one of `Profiler.COLUMNS` (default "total_time").
+
+        Returns:
+            List[Dict]: one record per (owner class, activation), with keys given by `Profiler.COLUMNS` (times in ns).
+        """
+
+        if sort_by not in self.COLUMNS:
+            raise Exception("invalid column {}".format(sort_by))
+
+        report = []
+        for (owner, activation), (count, total, maximum) in self.stats.items():
+            report.append({"owner": owner, "activation": activation, "count": count, "total_time": total,
+                           "max_time": maximum, "mean_time": total / count})
+        report.sort(key=lambda record: record[sort_by], reverse=True)
+        return report
+
+    def to_table(self, sort_by="total_time") -> str:
+        """Method to format recorded statistics as a text table.
+
+        Args:
+            sort_by (str): column to sort by in descending order (default "total_time").
+
+        Returns:
+            str: table with one row per (owner class, activation), times in ms.
+        """
+
+        rows = [["owner.activation", "count", "total (ms)", "max (ms)", "mean (ms)"]]
+        for record in self.get_report(sort_by):
+            rows.append(["{}.{}".format(record["owner"], record["activation"]), str(record["count"]),
+                         "%.3f" % (record["total_time"] / 1e6), "%.3f" % (record["max_time"] / 1e6),
+                         "%.3f" % (record["mean_time"] / 1e6)])
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = []
+        for row in rows:
+            cells = [row[0].ljust(widths[0])] + [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+            lines.append("  ".join(cells))
+        return "\n".join(lines)
+
+    def to_json(self, filename=None, sort_by="total_time") -> str:
+        """Method to export recorded statistics as JSON.
+
+        Args:
+            filename (str): file to write to (default None).
+            sort_by (str): column to sort by in descending order (default "total_time").
+
+        Returns:
+            str: JSON list of records (see `get_report`).
+        """
+
+        output = json.dumps(self.get_report(sort_by), indent=2)
+        if filename is not None:
+            with open(filename, "w") as fh:
+                fh.write(output)
+        return output
@@ -0,0 +1,181 @@
+"""Definition of buffered random number streams.
+
+This module defines the RandomStream class, which serves random numbers to a single entity from pre-drawn blocks,
+and the RandomStreams class, used by the timeline to create and seed the streams of all entities.
+Each stream has its own numpy `Generator`, seeded from the timeline seed and the name of the entity,
+so that the numbers drawn by an entity do not depend on the draws of other entities.
+"""
+
+from functools import partial
+from hashlib import sha1
+from typing import Callable, Tuple
+
+import numpy as np
+
+
+class _Buffer:
+    """Class holding a block of pre-drawn random numbers.
+
+    Blocks start small and double in size on each refill up to the maximum size, so that rarely used streams stay small.
+    """
+
+    __slots__ = ("draw", "max_size", "values", "index")
+
+    MIN_SIZE = 64
+
+    def __init__(self, draw: Callable[[int], np.ndarray], max_size: int):
+        self.draw = draw
+        self.max_size = max_size
+        self.values = []
+        self.index = 0
+
+    def next(self):
+        index = self.index
+        values = self.values
+        if index == len(values):
+            size = min(max(2 * len(values), self.MIN_SIZE), self.max_size)
+            values = self.values = self.draw(size).tolist()
+            index = 0
+        self.index = index + 1
+        return values[index]
+
+
+class RandomStream:
+    """Class serving buffered random numbers from a numpy generator.
+
+    Values of each distribution are drawn from the generator in blocks and served one at a time.
+    Numbers not served from a buffer may be drawn from the `generator` attribute directly.
+
+    Attributes:
+        generator (numpy.random.Generator): the underlying random number generator.
+        block_size (int): maximum number of values drawn at once for each distribution.
+    """
+
+    MAX_POISSON_BUFFERS = 16
+
+    def __init__(self, seed_sequence: np.random.SeedSequence, block_size=4096):
+        """Constructor for random stream class.
+
+        Args:
+            seed_sequence (numpy.random.SeedSequence): seed of the stream.
+            block_size (int): maximum number of values drawn at once for each distribution (default 4096).
+        """
+
+        self.block_size = block_size
+        self.seed(seed_sequence)
+
+    def seed(self, seed_sequence: np.random.SeedSequence) -> None:
+        """Method to reseed the stream.
+
+        Buffered values are discarded.
+
+        Args:
+            seed_sequence (numpy.random.SeedSequence): new seed of the stream.
+        """
+
+        self.generator = np.random.Generator(np.random.PCG64(seed_sequence))
+        self._uniform = _Buffer(self.generator.random, self.block_size)
+        self._normal = _Buffer(self.generator.standard_normal, self.block_size)
+        self._exponential = _Buffer(self.generator.standard_exponential, self.block_size)
+        self._poisson = {}
+
+    def random(self) -> float:
+        """Method to draw a float uniformly from [0, 1)."""
+
+        return self._uniform.next()
+
+    def normal(self, loc=0.0, scale=1.0) -> float:
+        """Method to draw a float from a normal distribution.
+
+        Args:
+            loc (float): mean of the distribution (default 0).
+            scale (float): standard deviation of the distribution (default 1).
+        """
+
+        return loc + scale * self._normal.next()
+
+    def exponential(self, scale=1.0) -> float:
+        """Method to draw a float from an exponential distribution.
+
+        Args:
+            scale (float): mean of the distribution (default 1).
+        """
+
+        return scale * self._exponential.next()
+
+    def poisson(self, lam=1.0) -> int:
+        """Method to draw an integer from a Poisson distribution.
+
+        Values are buffered separately for each value of `lam`, for the first `MAX_POISSON_BUFFERS` values used.
+        Values for other means are drawn from the generator one at a time.
+
+        Args:
+            lam (float): mean of the distribution (default 1).
+        """
+
+        buffer = self._poisson.get(lam)
+        if buffer is None:
+            if len(self._poisson) >= self.MAX_POISSON_BUFFERS:
+                return int(self.generator.poisson(lam))
+            buffer = self._poisson[lam] = _Buffer(partial(self.generator.poisson, lam), self.block_size)
+        return buffer.next()
+
+
+class RandomStreams:
+    """Class creating and seeding the random streams of a timeline.
+
+    Streams are identified by the name of their entity and, for repeated names, the order in which they are requested.
+    The seed of a stream is derived from the timeline entropy and this key,
+    so that streams are reproducible as long as entities with the same name are created in the same order.
+
+    Attributes:
+        entropy (int): entropy used to seed all streams.
+        block_size (int): block size of streams (see `RandomStream`).
+        streams (Dict[Tuple[str, int], RandomStream]): mapping of stream keys to streams.
+    """
+
+    def __init__(self, entropy: int, block_size=4096):
+        """Constructor for random streams class.
+
+        Args:
+            entropy (int): entropy used to seed all streams.
+            block_size (int): block size of streams (default 4096).
+        """
+
+        self.entropy = entropy
+        self.block_size = block_size
+        self.streams = {}
+        self._counts = {}
+
+    def get(self, name: str) -> "RandomStream":
+        """Method to create a new stream.
+
+        Args:
+            name (str): name of the entity using the stream.
+
+        Returns:
+            RandomStream: a new stream, independent of other streams.
+        """
+
+        count = self._counts.get(name, 0)
+        self._counts[name] = count + 1
+        key = (name, count)
+        stream = RandomStream(self._seed_sequence(key), self.block_size)
+        self.streams[key] = stream
+        return stream
+
+    def seed(self, entropy: int) -> None:
+        """Method to reseed all streams.
+
+        Args:
+            entropy (int): new entropy used to seed all streams.
+        """
+
+        self.entropy = entropy
+        for key, stream in self.streams.items():
+            stream.seed(self._seed_sequence(key))
+
+    def _seed_sequence(self, key: Tuple[str, int]) -> np.random.SeedSequence:
+        digest = sha1(key[0].encode()).digest()
+        spawn_key = tuple(int.from_bytes(digest[i:i + 4], "little") for i in range(0, len(digest), 4)) + (key[1],)
+        return np.random.SeedSequence(self.entropy, spawn_key=spawn_key)
@@ -0,0 +1,134 @@
+"""Definition of the RealTimePacer class.
+
+This module defines the RealTimePacer class, which slows the execution of a timeline down to a multiple of real (wall clock) time.
+A pacer is attached to a timeline by setting the `Timeline.pacer` attribute.
+"""
+
+from math import inf
+from time import perf_counter, sleep
+
+
+class RealTimePacer:
+    """Class pacing event execution against the wall clock.
+
+    Each event is due at a wall time proportional to its simulation time, counted from the start of the current `Timeline.run` call.
+    Before an event is executed, the pacer sleeps (and then busy-waits for the last `spin` seconds, for precision) until the event is due.
+    Asynchronous runs (see `Timeline.run_async`) instead get the delay of the event, and yield to the event loop until it is due, without busy-waiting.
+    Events executed later than their due time are executed immediately, so that a simulation that falls behind runs as fast as possible.
+    Events later than `tolerance` are counted as late.
+    If the lag exceeds `max_lag`, the pacer resynchronizes (the late event becomes the new reference), rather than running fast to catch up.
+
+    Attributes:
+        time_scale (float): wall time per simulated time (1 for real time, 1000 for a 1000x slowdown).
+        tolerance (float): lag (in s) above which events are counted as late.
+        max_lag (float): lag (in s) above which the pacer resynchronizes.
+        spin (float): time (in s) before due time spent busy-waiting instead of sleeping.
+        paced_events (int): number of events paced.
+        late_events (int): number of events executed later than `tolerance`.
+        max_observed_lag (float): largest lag (in s) observed.
+        total_lag (float): sum of the lags (in s) of late events.
+        resyncs (int): number of resynchronizations.
+    """
+
+    def __init__(self, time_scale=1.0, tolerance=1e-3, max_lag=inf, spin=2e-4):
+        """Constructor for real time pacer class.
+
+        Args:
+            time_scale (float): wall time per simulated time (default 1 for real time).
+            tolerance (float): lag (in s) above which events are counted as late (default 1e-3).
+            max_lag (float): lag (in s) above which the pacer resynchronizes (default inf).
+            spin (float): time (in s) before due time spent busy-waiting instead of sleeping (default 2e-4).
+        """
+
+        if time_scale <= 0:
+            raise Exception("time scale must be positive")
+        self.time_scale = time_scale
+        self.tolerance = tolerance
+        self.max_lag = max_lag
+        self.spin = spin
+        self._seconds_per_ps = time_scale * 1e-12
+        self._origin_time = 0
+        self._origin_wall = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Method to clear recorded statistics."""
+
+        self.paced_events = 0
+        self.late_events = 0
+        self.max_observed_lag = 0.0
+        self.total_lag = 0.0
+        self.resyncs = 0
+
+    def start(self, time: int) -> None:
+        """Method to set the reference point of pacing (called by the timeline at the start of a run).
+
+        Args:
+            time (int): current simulation time (in ps).
+        """
+
+        self._origin_time = time
+        self._origin_wall = perf_counter()
+
+    def get_delay(self, time: int) -> float:
+        """Method to get the wall time left until an event is due.
+
+        Events that are due are counted as paced (and as late, if later than `tolerance`), and may resynchronize the pacer.
+        Events that are not yet due are not counted, so that the method may be called again once the delay has passed.
+
+        Args:
+            time (int): simulation time (in ps) of the event.
+
+        Returns:
+            float: time (in s) until the event is due (0 if the event is due).
+        """
+
+        now = perf_counter()
+        delay = self._origin_wall + (time - self._origin_time) * self._seconds_per_ps - now
+        if delay > 0:
+            return delay
+
+        self.paced_events += 1
+        lag = -delay
+        if lag > self.max_observed_lag:
+            self.max_observed_lag = lag
+        if lag > self.tolerance:
+            self.late_events += 1
+            self.total_lag += lag
+            if lag > self.max_lag:
+                self._origin_time = time
+                self._origin_wall = now
+                self.resyncs += 1
+        return 0.0
+
+    def wait(self, time: int) -> None:
+        """Method to block until an event is due (used by `Timeline.run`).
+
+        The pacer sleeps, and then busy-waits for the last `spin` seconds.
+
+        Args:
+            time (int): simulation time (in ps) of the event.
+        """
+
+        delay = self.get_delay(time)
+        if delay > 0:
+            due = perf_counter() + delay
+            if delay > self.spin:
+                sleep(delay - self.spin)
+            while perf_counter() < due:
+                pass
+            self.paced_events += 1
+
+    def get_report(self) -> dict:
+        """Method to get pacing statistics.
+
+        Returns:
+            Dict[str, Any]: mapping of statistic name to value, with keys "paced_events", "late_events",
+                "max_observed_lag", "mean_late_lag" (in s, 0 if no late events) and "resyncs".
+        """
+
+        return {"paced_events": self.paced_events,
+                "late_events": self.late_events,
+                "max_observed_lag": self.max_observed_lag,
+                "mean_late_lag": self.total_lag / self.late_events if self.late_events else 0.0,
+                "resyncs": self.resyncs}
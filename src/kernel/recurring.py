@@ -0,0 +1,139 @@
+"""Definition of recurring events.
+
+This module defines the RecurringEvent class, a single event standing for a stream of executions of the same process.
+Fire times are given by an iterator of simulation times; the PeriodicTimes and PoissonTimes classes provide regular and Poisson streams.
+Fire time iterators are objects (rather than generators) so that scheduled recurring events may be pickled (see `Timeline.snapshot`).
+"""
+
+from math import inf
+from typing import TYPE_CHECKING, Iterable
+
+from numpy import random
+
+if TYPE_CHECKING:
+    from .process import Process
+    from .timeline import Timeline
+
+from .event import Event
+
+
+class RecurringEvent(Event):
+    """Class of events executed repeatedly.
+
+    The event is scheduled once on the timeline at the first fire time.
+    Each time it is executed, the event schedules itself again at the next fire time and then runs its process.
+    The stream ends when the fire times are exhausted, or when the event is removed from the timeline.
+
+    Attributes:
+        time (int): the next execution time of the event.
+        process (Process): the process executed at each fire time.
+        priority (int): the priority of the event.
+        timeline (Timeline): the timeline the event is scheduled on.
+    """
+
+    __slots__ = ("timeline", "_times", "_target")
+
+    def __init__(self, timeline: "Timeline", times: Iterable[int], process: "Process", priority=inf):
+        """Constructor for recurring event class.
+
+        Args:
+            timeline (Timeline): the timeline to schedule the event on.
+            times (Iterable[int]): increasing simulation times (in ps) to execute the process.
+            process (Process): the process to execute.
+            priority (int): the priority of the event, lower value denotes a higher priority (default inf).
+        """
+
+        self._times = iter(times)
+        time = next(self._times, None)
+        if time is None:
+            raise Exception("recurring event requires at least one fire time")
+
+        Event.__init__(self, time, process, priority)
+        self.timeline = timeline
+        self._target = getattr(process.owner, process.activation)
+        self._func = self._fire
+
+    def _fire(self, *args) -> None:
+        # reschedule before running the process, so that the process may remove the event to end the stream
+        time = next(self._times, None)
+        if time is not None:
+            self.time = time
+            self.timeline.schedule(self)
+        self._target(*args)
+
+
+class PeriodicTimes:
+    """Iterator of regularly spaced fire times.
+
+    Attributes:
+        time (int): the last generated time.
+        period (int): time between fire times (in ps).
+        remaining (int): number of fire times left (None if unbounded).
+    """
+
+    def __init__(self, start: int, period: int, count=None):
+        """Constructor for periodic fire times.
+
+        Args:
+            start (int): first fire time (in ps).
+            period (int): time between fire times (in ps).
+            count (int): number of fire times (default None for unbounded).
+        """
+
+        if period <= 0:
+            raise Exception("period must be positive")
+        self.time = start - period
+        self.period = period
+        self.remaining = count
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                raise StopIteration
+            self.remaining -= 1
+        self.time += self.period
+        return self.time
+
+
+class PoissonTimes:
+    """Iterator of fire times of a Poisson process.
+
+    Times between fire times are drawn from an exponential distribution and rounded down to ps.
+
+    Attributes:
+        time (int): the last generated time.
+        rate (float): average number of fire times per second.
+        stop_time (int): fire times are generated before this time (default inf).
+        rng (RandomStream): random number stream to draw from (None for the numpy global random state).
+    """
+
+    def __init__(self, start: int, rate: float, stop_time=inf, rng=None):
+        """Constructor for Poisson fire times.
+
+        Args:
+            start (int): time (in ps) the process starts from, the first fire time is drawn after it.
+            rate (float): average number of fire times per second.
+            stop_time (int): fire times are generated before this time (default inf).
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+        """
+
+        if rate <= 0:
+            raise Exception("rate must be positive")
+        self.time = start
+        self.rate = rate
+        self.stop_time = stop_time
+        self.rng = rng
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        rng = random if self.rng is None else self.rng
+        time = self.time + int(rng.exponential(1 / self.rate) * 1e12)
+        if time >= self.stop_time:
+            raise StopIteration
+        self.time = time
+        return time
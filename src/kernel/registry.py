@@ -0,0 +1,176 @@
+"""Definition of the EntityRegistry class.
+
+This module defines the EntityRegistry class, used by the timeline to hold its entities.
+Entities are indexed by name and by type, and may be added and removed in O(1) time.
+Entities may be held through weak references, so that entities no longer used elsewhere are garbage collected.
+"""
+
+import weakref
+from typing import TYPE_CHECKING, Dict, Iterator, List, Union
+
+if TYPE_CHECKING:
+    from .entity import Entity
+
+
+class EntityRegistry:
+    """Class of entity registries.
+
+    The registry keeps entities in the order they were added (this is the order of `Timeline.init`).
+    Entities are indexed by their name and type when added; names need not be unique.
+    Weakly held entities are removed automatically once garbage collected.
+
+    Attributes:
+        weak (bool): if entities are held through weak references by default.
+    """
+
+    def __init__(self, weak=False):
+        """Constructor for entity registry class.
+
+        Args:
+            weak (bool): hold entities through weak references by default (default False).
+        """
+
+        self.weak = weak
+        self._entities = {}  # id -> entity or weak reference to entity
+        self._keys = {}  # id -> (name, type) at registration
+        self._by_name = {}  # name -> {id: None}
+        self._by_type = {}  # type -> {id: None}
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __iter__(self) -> Iterator["Entity"]:
+        # iterate over a copy, so that entities may be added or removed during iteration
+        for ref in list(self._entities.values()):
+            entity = self._deref(ref)
+            if entity is not None:
+                yield entity
+
+    def __contains__(self, entity: "Entity") -> bool:
+        ref = self._entities.get(id(entity))
+        return ref is not None and self._deref(ref) is entity
+
+    def __getstate__(self):
+        entities = []
+        for key, ref in self._entities.items():
+            entity = self._deref(ref)
+            if entity is not None:
+                entities.append((entity, isinstance(ref, weakref.ref), self._keys[key][0]))
+        return {"weak": self.weak, "entities": entities}
+
+    def __setstate__(self, state):
+        # entities may not be fully unpickled yet, so names are restored from the state
+        self.__init__(state["weak"])
+        for entity, weak, name in state["entities"]:
+            self._add(entity, weak, name)
+
+    def add(self, entity: "Entity", weak=None) -> None:
+        """Method to add an entity.
+
+        Args:
+            entity (Entity): entity to add.
+            weak (bool): hold the entity through a weak reference (default None to use `self.weak`).
+        """
+
+        if id(entity) in self._entities:
+            raise Exception("entity {} already in registry".format(entity.name))
+        self._add(entity, self.weak if weak is None else weak, entity.name)
+
+    # for compatibility with code using a list of entities
+    append = add
+
+    def remove(self, entity: "Entity") -> None:
+        """Method to remove an entity.
+
+        Args:
+            entity (Entity): entity to remove.
+
+        Raises:
+            ValueError: if the entity is not in the registry.
+        """
+
+        if entity not in self:
+            raise ValueError("entity {} not in registry".format(entity.name))
+        self._discard(id(entity))
+
+    def get(self, name: str) -> "Entity":
+        """Method to get an entity by name.
+
+        Args:
+            name (str): name of the entity.
+
+        Returns:
+            Entity: first added entity with the name (None if not found).
+        """
+
+        for key in self._by_name.get(name, ()):
+            entity = self._deref(self._entities[key])
+            if entity is not None:
+                return entity
+        return None
+
+    def get_by_name(self, name: str) -> List["Entity"]:
+        """Method to get all entities with a name.
+
+        Args:
+            name (str): name of the entities.
+
+        Returns:
+            List[Entity]: entities with the name, in the order they were added.
+        """
+
+        return self._get(self._by_name.get(name, ()))
+
+    def get_by_type(self, entity_type: Union[type, str]) -> List["Entity"]:
+        """Method to get all entities of a type.
+
+        Args:
+            entity_type (Union[type, str]): class of the entities (including subclasses), or exact class name.
+
+        Returns:
+            List[Entity]: entities of the type, in the order they were added.
+        """
+
+        if isinstance(entity_type, str):
+            types = [t for t in self._by_type if t.__name__ == entity_type]
+        else:
+            types = [t for t in self._by_type if issubclass(t, entity_type)]
+
+        if len(types) == 1:
+            return self._get(self._by_type[types[0]])
+        keys = set()
+        for t in types:
+            keys.update(self._by_type[t])
+        return self._get(key for key in self._entities if key in keys)
+
+    def _add(self, entity: "Entity", weak: bool, name: str) -> None:
+        key = id(entity)
+        if weak:
+            self._entities[key] = weakref.ref(entity, lambda _: self._discard(key))
+        else:
+            self._entities[key] = entity
+        self._keys[key] = (name, type(entity))
+        self._by_name.setdefault(name, {})[key] = None
+        self._by_type.setdefault(type(entity), {})[key] = None
+
+    def _get(self, keys) -> List["Entity"]:
+        entities = [self._deref(self._entities[key]) for key in keys]
+        return [entity for entity in entities if entity is not None]
+
+    def _discard(self, key: int) -> None:
+        if self._entities.pop(key, None) is None:
+            return
+        name, entity_type = self._keys.pop(key)
+        self._unindex(self._by_name, name, key)
+        self._unindex(self._by_type, entity_type, key)
+
+    @staticmethod
+    def _unindex(index: Dict, value, key: int) -> None:
+        keys = index[value]
+        del keys[key]
+        if not keys:
+            del index[value]
+
+    @staticmethod
+    def _deref(ref) -> "Entity":
+        return ref() if isinstance(ref, weakref.ref) else ref
@@ -4,16 +4,25 @@ This module defines the Timeline class, which provides an interface for the simu
 All entities are required to have an attached timeline for simulation.
 """
 
+import asyncio
+import os
+import pickle
+import weakref
 from _thread import start_new_thread
 from math import inf
 from sys import stdout
-from time import time_ns, sleep
-from typing import TYPE_CHECKING
+from time import perf_counter, perf_counter_ns, time_ns, sleep
+from typing import TYPE_CHECKING, Any, Callable, List, Tuple, Union
 
 if TYPE_CHECKING:
-    from .event import Event
-
-from .eventlist import EventList
+    from .process import Process
+    from .random_stream import RandomStream
+
+from .event import Event
+from .eventlist import make_event_queue
+from .profiler import Profiler
+from .random_stream import RandomStreams
+from .registry import EntityRegistry
 from ..utils import log
 
 class Timeline:
@@ -30,31 +39,70 @@ class Timeline:
 
     To monitor the progress of simulation, the Timeline.show_progress attribute can be modified to show/hide a progress bar.
 
+    The event queue implementation may be chosen with the `event_queue` argument (see the `eventlist` module).
+    Removed events stay in the queue as invalid events until the queue is compacted (see `compaction_ratio`).
+
+    If the timeline is created with `profile=True`, the execution time of events is recorded by a `Profiler` (see the `profiler` module).
+
+    Execution may be slowed down to a multiple of real time by setting the `pacer` attribute to a `RealTimePacer` (see the `realtime` module).
+
+    Entities may draw random numbers from their own buffered stream, obtained with `get_random_stream` (see the `random_stream` module).
+    Streams are seeded from the timeline seed (or, if `seed` is not called, from fresh entropy drawn when the timeline is created).
+
     Attributes:
-        events (EventList): the event list of timeline.
-        entities (List[Entity]): the entity list of timeline used for initialization.
+        events (EventQueue): the event list of timeline.
+        entities (EntityRegistry): the entities of timeline, used for initialization and lookup by name or type.
         time (int): current simulation time (picoseconds).
         stop_time (int): the stop (simulation) time of the simulation.
         schedule_counter (int): the counter of scheduled events
         run_counter (int): the counter of executed events
         is_running (bool): records if the simulation has stopped executing events.
         show_progress (bool): show/hide the progress bar of simulation.
+        profiler (Profiler): profiler recording event execution times (None if profiling is disabled).
+        pacer (RealTimePacer): pacer of event execution against the wall clock (None to run as fast as possible).
+        random_streams (RandomStreams): random number streams of entities.
     """
 
-    def __init__(self, stop_time=inf):
+    def __init__(self, stop_time=inf, event_queue="heap", compaction_ratio=0.5, profile=False, weak_entities=False,
+                 global_entropy=False):
         """Constructor for timeline.
 
         Args:
             stop_time (int): stop time (in ps) of simulation (default inf).
+            event_queue (str): type of event queue, one of "heap", "calendar" or "ladder" (default "heap").
+            compaction_ratio (float): ratio of removed events in the event queue at which the queue is compacted (default 0.5).
+            profile (bool): record execution time of events by owner class and activation (default False).
+            weak_entities (bool): hold entities through weak references, so that unused entities are garbage collected (default False).
+            global_entropy (bool): draw the entropy of random streams from the numpy global random state,
+                so that `numpy.random.seed` makes unseeded runs reproducible (default False to use fresh entropy from the OS).
         """
-        self.events = EventList()
-        self.entities = []
+        self.events = make_event_queue(event_queue, compaction_ratio)
+        self.entities = EntityRegistry(weak_entities)
         self.time = 0
         self.stop_time = stop_time
         self.schedule_counter = 0
         self.run_counter = 0
         self.is_running = False
         self.show_progress = False
+        self.profiler = Profiler() if profile else None
+        self.pacer = None
+        self._epochs = {}  # id of process owner -> (weak reference to owner, current epoch) (see `cancel_all`)
+        from numpy import random
+        if global_entropy:
+            self.random_streams = RandomStreams(int(random.randint(2 ** 31)))
+        else:
+            self.random_streams = RandomStreams(random.SeedSequence().entropy)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_epochs"] = [(ref(), epoch) for ref, epoch in self._epochs.values() if ref() is not None]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._epochs = {}
+        for owner, epoch in state["_epochs"]:
+            self._add_epoch(owner, epoch)
 
     def now(self) -> int:
         """Returns current simulation time."""
@@ -62,11 +110,27 @@ class Timeline:
         return self.time
 
     def schedule(self, event: "Event") -> None:
-        """Method to schedule an event."""
+        """Method to schedule an event.
+
+        The process of the event is resolved to a bound method at this time, so that running the event does not look up the method by name.
+        The event also records the current epoch of the process owner (see `cancel_all`).
+        """
 
         self.schedule_counter += 1
+        owner = event.process.owner
+        if event._func is None:
+            event._func = getattr(owner, event.process.activation)
+        entry = self._epochs.get(id(owner))
+        event._epoch = self._add_epoch(owner, [False]) if entry is None else entry[1]
         return self.events.push(event)
 
+    def _add_epoch(self, owner: Any, epoch: List[bool]) -> List[bool]:
+        # epochs are keyed by id for fast lookup, and removed when the owner is garbage collected
+        key = id(owner)
+        epochs = self._epochs
+        epochs[key] = (weakref.ref(owner, lambda _: epochs.pop(key, None)), epoch)
+        return epoch
+
     def init(self) -> None:
         """Method to initialize all simulated entities."""
         log.logger.info("Timeline initial network")
@@ -74,43 +138,215 @@ class Timeline:
         for entity in self.entities:
             entity.init()
 
-    def run(self) -> None:
+    def run(self, until_time=inf, max_events=inf, stop_when=None, check_every=1) -> int:
         """Main simulation method.
 
         The `run` method begins simulation of events.
         Events are continuously popped and executed, until the simulation time limit is reached or events are exhausted.
+        The run may also be limited to a slice of the simulation with the `until_time`, `max_events` and `stop_when` arguments.
+        Simulation may be resumed by calling `run` again; the next event is kept in the event list.
         A progress bar may also be displayed, if the `show_progress` flag is set.
+
+        Args:
+            until_time (int): stop before executing events at or after this time (in ps), without changing `stop_time` (default inf).
+            max_events (int): maximum number of events to execute (default inf).
+            stop_when (Callable[[], bool]): stop once this function returns True, checked after executed events (default None).
+            check_every (int): number of executed events between calls of `stop_when` (default 1).
+
+        Returns:
+            int: number of events executed.
         """
         log.logger.info("Timeline start simulation")
         tick = time_ns()
         self.is_running = True
+        run_counter = self.run_counter
 
         if self.show_progress:
             self.progress_bar()
 
-        # log = {}
-        while len(self.events) > 0:
-            event = self.events.pop()
-            if event.time >= self.stop_time:
-                self.schedule(event)
-                break
-            assert self.time <= event.time, "invalid event time for process scheduled on " + str(event.process.owner)
-            if event.is_invalid():
-                continue
-            self.time = event.time
-            # if not event.process.activation in log:
-            #     log[event.process.activation] = 0
-            # log[event.process.activation]+=1
-            event.process.run()
-            self.run_counter += 1
+        if self.pacer is not None:
+            self.pacer.start(self.time)
 
-        # print('number of event', self.event_counter)
-        # print('log:',log)
+        if max_events == inf and stop_when is None and self.profiler is None and self.pacer is None:
+            self._run_events(until_time)
+        else:
+            if check_every < 1:
+                raise Exception("check_every must be positive")
+            self._run_events_checked(until_time, max_events, stop_when, check_every)
 
         self.is_running = False
         elapse = time_ns() - tick
         log.logger.info("Timeline end simulation. Execution Time: %d ns; Scheduled Event: %d; Executed Event: %d" %
                         (elapse, self.schedule_counter, self.run_counter))
+        return self.run_counter - run_counter
+
+    def _run_events(self, until_time) -> None:
+        events = self.events
+        pop = events.pop
+        executed = 0
+        try:
+            while True:
+                try:
+                    event = pop()
+                except IndexError:  # no events left
+                    break
+                if event._is_removed or event._epoch[0]:
+                    continue
+                time = event.time
+                if time >= self.stop_time or time >= until_time:
+                    events.unpop(event)
+                    break
+                assert self.time <= time, "invalid event time for process scheduled on " + str(event.process.owner)
+                self.time = time
+                event._func(*event.process.act_params)
+                executed += 1
+        finally:
+            # counted locally, as no entity reads the counter while events run
+            self.run_counter += executed
+
+    def _run_events_checked(self, until_time, max_events, stop_when, check_every, yield_early=False) -> float:
+        """Same as `_run_events`, but also limits the number of events, checks `stop_when`,
+        paces events if a pacer is set, and records the execution time of each event if the profiler is enabled.
+
+        If `yield_early` is set, the pacer does not block: events are executed until the next event is not yet due,
+        and the wall time (in s) left until it is due is returned (0 otherwise)."""
+
+        events = self.events
+        record = None if self.profiler is None else self.profiler.record
+        wait = None
+        if self.pacer is not None:
+            wait = self.pacer.get_delay if yield_early else self.pacer.wait
+        executed = 0
+        next_check = check_every if stop_when is not None else inf
+        while executed < max_events:
+            try:
+                event = events.pop()
+            except IndexError:  # no events left
+                break
+            if event._is_removed or event._epoch[0]:
+                continue
+            if event.time >= self.stop_time or event.time >= until_time:
+                events.unpop(event)
+                break
+            assert self.time <= event.time, "invalid event time for process scheduled on " + str(event.process.owner)
+            if wait is not None:
+                delay = wait(event.time)
+                if delay:
+                    events.unpop(event)
+                    return delay
+            self.time = event.time
+            process = event.process
+            if record is None:
+                event._func(*process.act_params)
+            else:
+                start = perf_counter_ns()
+                event._func(*process.act_params)
+                record((type(process.owner).__name__, process.activation), perf_counter_ns() - start)
+            self.run_counter += 1
+            executed += 1
+            if executed >= next_check:
+                if stop_when():
+                    break
+                next_check += check_every
+        return 0.0
+
+    async def run_async(self, inbox=None, max_events=1000, max_wall_time=0.01, until_time=inf, wait=False) -> int:
+        """Simulation method for use with asyncio.
+
+        Events are executed in slices (see `run`), yielding to the event loop between slices.
+        A slice ends after `max_events` events or `max_wall_time` seconds, whichever comes first.
+        Other coroutines (such as an external controller) may thus run while the simulation progresses, and inject events through `inbox`.
+
+        Items of `inbox` may be events, which are scheduled at their time (or at the current time, if earlier),
+        or processes, which are scheduled at the current time.
+        A `None` item ends the simulation once the current slice has finished.
+        Injected items are scheduled between slices, in the order they were put in the queue.
+        If a pacer is set, a slice also ends at the first event that is not yet due, and the method sleeps asynchronously until it is due.
+
+        Args:
+            inbox (asyncio.Queue): queue of events and processes to inject into the simulation (default None).
+            max_events (int): maximum number of events executed between yields (default 1000).
+            max_wall_time (float): maximum wall time (in s) between yields (default 0.01).
+            until_time (int): stop before executing events at or after this time (in ps) (default inf).
+            wait (bool): if no events are left (or the stop time is reached), wait for injected items instead of returning (default False).
+
+        Returns:
+            int: number of events executed.
+        """
+
+        log.logger.info("Timeline start asynchronous simulation")
+        self.is_running = True
+        run_counter = self.run_counter
+        if self.pacer is not None:
+            self.pacer.start(self.time)
+        stop_when = None
+        check_every = max_events
+        if max_wall_time != inf:
+            check_every = min(max_events, 64)
+
+        try:
+            while True:
+                if inbox is not None and self._inject(inbox):
+                    break
+
+                if max_wall_time != inf:
+                    deadline = perf_counter() + max_wall_time
+                    stop_when = lambda: perf_counter() >= deadline
+                delay = self._run_events_checked(until_time, max_events, stop_when, check_every, True)
+
+                next_time = self._get_next_time()
+                if next_time >= self.stop_time or next_time >= until_time:
+                    if inbox is None or not wait:
+                        break
+                    # idle until an item is injected
+                    item = await inbox.get()
+                    if item is None:
+                        break
+                    self._schedule_injected(item)
+                    if self.pacer is not None:
+                        self.pacer.start(self.time)
+                else:
+                    # wait for the next paced event without blocking the event loop (checking the inbox at least every `max_wall_time`)
+                    await asyncio.sleep(min(delay, max_wall_time))
+        finally:
+            self.is_running = False
+
+        log.logger.info("Timeline end asynchronous simulation. Scheduled Event: %d; Executed Event: %d" %
+                        (self.schedule_counter, self.run_counter))
+        return self.run_counter - run_counter
+
+    def _inject(self, inbox: "asyncio.Queue") -> bool:
+        """Method to schedule all items in an inbox, returns True if a `None` item was found."""
+
+        while True:
+            try:
+                item = inbox.get_nowait()
+            except asyncio.QueueEmpty:
+                return False
+            if item is None:
+                return True
+            self._schedule_injected(item)
+
+    def _schedule_injected(self, item: Union["Event", "Process"]) -> None:
+        if isinstance(item, Event):
+            if item.time < self.time:
+                item.time = self.time
+            self.schedule(item)
+        else:
+            self.schedule(Event(self.time, item))
+
+    def _get_next_time(self) -> int:
+        """Method to get the time of the next valid event (inf if none), leaving it in the event list."""
+
+        events = self.events
+        while True:
+            try:
+                event = events.pop()
+            except IndexError:
+                return inf
+            if not event.is_invalid():
+                events.unpop(event)
+                return event.time
 
     def stop(self) -> None:
         """Method to stop simulation."""
@@ -120,6 +356,23 @@ class Timeline:
     def remove_event(self, event: "Event") -> None:
         self.events.remove(event)
 
+    def cancel_all(self, owner: Any) -> None:
+        """Method to cancel all scheduled events of an owner.
+
+        Ends the current epoch of the owner in O(1) time: events scheduled with the owner as process owner before this call
+        become invalid, and are dropped when popped (or when the event queue is compacted) without being executed.
+        Events scheduled after this call are not affected.
+        Cancelled events are not counted as invalid events in `get_event_stats` until they are dropped.
+        Epochs are held by the timeline in a dictionary keyed by owner id, with weak references to owners (which must thus be weakly referenceable).
+
+        Args:
+            owner (Any): process owner of events to cancel (e.g. an entity or protocol).
+        """
+
+        entry = self._epochs.pop(id(owner), None)
+        if entry is not None:
+            entry[1][0] = True
+
     def update_event_time(self, event: "Event", time: int) -> None:
         """Method to change execution time of an event.
 
@@ -130,11 +383,142 @@ class Timeline:
 
         self.events.update_event_time(event, time)
 
+    def get_event_stats(self) -> dict:
+        """Method to get statistics of the event queue.
+
+        Returns:
+            Dict[str, int]: mapping of statistic name to value, with keys:
+                "queue_size": number of entries stored in the queue (including removed events and stale entries).
+                "live_events": number of valid events in the queue.
+                "invalid_events": number of removed events and stale entries (left by rescheduled events) still stored in the queue.
+                "compactions": number of times the queue has been compacted.
+        """
+
+        invalid = self.events.invalid_count + self.events.stale_count
+        size = len(self.events) + self.events.stale_count
+        return {"queue_size": size,
+                "live_events": size - invalid,
+                "invalid_events": invalid,
+                "compactions": self.events.compactions}
+
+    def snapshot(self, filename=None, extra=None) -> bytes:
+        """Method to save the state of the simulation.
+
+        The snapshot contains the timeline with its event queue and entities (and everything they reference),
+        as well as the state of the numpy random number generator.
+        Random streams of entities are saved with the timeline.
+        Entities must be picklable.
+
+        Args:
+            filename (str): file to write the snapshot to (default None).
+            extra (Any): additional objects to save with the timeline, such as a `Topology` (default None).
+
+        Returns:
+            bytes: the snapshot, to be loaded with `Timeline.restore`.
+        """
+
+        from numpy import random
+        data = pickle.dumps((self, extra, random.get_state()), pickle.HIGHEST_PROTOCOL)
+        if filename is not None:
+            with open(filename, "wb") as fh:
+                fh.write(data)
+        return data
+
+    @staticmethod
+    def restore(snapshot: Union[bytes, str]) -> Tuple["Timeline", Any]:
+        """Method to load a simulation saved by `Timeline.snapshot`.
+
+        The state of the numpy random number generator is also restored.
+
+        Args:
+            snapshot (Union[bytes, str]): snapshot, or name of file containing snapshot.
+
+        Returns:
+            Tuple[Timeline, Any]: the restored timeline and the `extra` objects saved with it.
+        """
+
+        if isinstance(snapshot, str):
+            with open(snapshot, "rb") as fh:
+                snapshot = fh.read()
+
+        from numpy import random
+        timeline, extra, rng_state = pickle.loads(snapshot)
+        random.set_state(rng_state)
+        return timeline, extra
+
+    def fork(self, num_branches: int, branch: Callable[["Timeline", int], Any]) -> List[Any]:
+        """Method to continue the simulation in multiple branches.
+
+        Each branch runs `branch(timeline, index)` in a child process created with `os.fork`,
+        so that branches share the current state of the simulation (copy-on-write) without copying it.
+        Branches may change parameters and run the timeline independently; the state of the calling process is not changed.
+
+        Args:
+            num_branches (int): number of branches.
+            branch (Callable[[Timeline, int], Any]): function to run in each branch; the returned value must be picklable.
+
+        Returns:
+            List[Any]: values returned by `branch` for each branch index.
+        """
+
+        if not hasattr(os, "fork"):
+            raise Exception("fork is not supported on this platform")
+
+        children = []
+        for index in range(num_branches):
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                status = 0
+                try:
+                    result = (True, branch(self, index))
+                except BaseException as err:
+                    result = (False, err)
+                    status = 1
+                try:
+                    with os.fdopen(write_fd, "wb") as fh:
+                        pickle.dump(result, fh, pickle.HIGHEST_PROTOCOL)
+                finally:
+                    os._exit(status)
+
+            os.close(write_fd)
+            children.append((pid, read_fd))
+
+        results = []
+        for pid, read_fd in children:
+            with os.fdopen(read_fd, "rb") as fh:
+                data = fh.read()
+            os.waitpid(pid, 0)
+            if not data:
+                raise Exception("branch process {} exited without result".format(pid))
+            success, value = pickle.loads(data)
+            if not success:
+                raise value
+            results.append(value)
+        return results
+
+    def get_random_stream(self, name: str) -> "RandomStream":
+        """Method to get a new random number stream for an entity.
+
+        Args:
+            name (str): name of the entity.
+
+        Returns:
+            RandomStream: buffered random number stream, seeded from the timeline seed and `name`.
+        """
+
+        return self.random_streams.get(name)
+
     def seed(self, seed: int) -> None:
-        """Sets random seed for simulation."""
+        """Sets random seed for simulation.
+
+        Seeds the numpy global random state and reseeds all random streams of the timeline.
+        """
 
         from numpy import random
         random.seed(seed)
+        self.random_streams.seed(seed)
 
     def progress_bar(self):
         """Method to draw progress bar.
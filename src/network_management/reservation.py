@@ -6,6 +6,7 @@ Also included is the definition of the message type used by the reservation prot
 """
 
 from enum import Enum, auto
+from functools import partial
 from typing import List, TYPE_CHECKING
 if TYPE_CHECKING:
     from ..topology.node import QuantumRouter
@@ -220,156 +221,47 @@ class ResourceReservationProtocol(StackProtocol):
         # create rules for entanglement generation
         index = path.index(self.own.name)
         if index > 0:
-            def eg_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                if memory_info.state == "RAW" and memory_info.index in memory_indices[:reservation.memory_size]:
-                    return [memory_info]
-                else:
-                    return []
-
-            def eg_rule_action(memories_info: List["MemoryInfo"]):
-                memories = [info.memory for info in memories_info]
-                memory = memories[0]
-                mid = self.own.map_to_middle_node[path[index - 1]]
-                protocol = EntanglementGenerationA(None, "EGA." + memory.name, mid, path[index - 1], memory)
-                return [protocol, [None], [None]]
-
-            rule = Rule(10, eg_rule_action, eg_rule_condition)
+            condition = partial(eg_rule_condition, memory_indices=memory_indices[:reservation.memory_size])
+            action = partial(eg_rule_action1, node=self.own, other=path[index - 1])
+            rule = Rule(10, action, condition)
             rules.append(rule)
 
         if index < len(path) - 1:
             if index == 0:
-                def eg_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                    if memory_info.state == "RAW" and memory_info.index in memory_indices:
-                        return [memory_info]
-                    else:
-                        return []
+                condition = partial(eg_rule_condition, memory_indices=memory_indices)
             else:
-                def eg_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                    if memory_info.state == "RAW" and memory_info.index in memory_indices[reservation.memory_size:]:
-                        return [memory_info]
-                    else:
-                        return []
-
-            def eg_rule_action(memories_info: List["MemoryInfo"]):
-                def req_func(protocols):
-                    for protocol in protocols:
-                        if isinstance(protocol,
-                                      EntanglementGenerationA) and protocol.other == self.own.name and protocol.rule.get_reservation() == reservation:
-                            return protocol
-
-                memories = [info.memory for info in memories_info]
-                memory = memories[0]
-                mid = self.own.map_to_middle_node[path[index + 1]]
-                protocol = EntanglementGenerationA(None, "EGA." + memory.name, mid, path[index + 1], memory)
-                return [protocol, [path[index + 1]], [req_func]]
-
-            rule = Rule(10, eg_rule_action, eg_rule_condition)
+                condition = partial(eg_rule_condition, memory_indices=memory_indices[reservation.memory_size:])
+            action = partial(eg_rule_action2, node=self.own, other=path[index + 1], reservation=reservation)
+            rule = Rule(10, action, condition)
             rules.append(rule)
 
         # create rules for entanglement purification
         if index > 0:
-            def ep_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                if (memory_info.index in memory_indices[:reservation.memory_size]
-                        and memory_info.state == "ENTANGLED" and memory_info.fidelity < reservation.fidelity):
-                    for info in manager:
-                        if (info != memory_info and info.index in memory_indices[:reservation.memory_size]
-                                and info.state == "ENTANGLED" and info.remote_node == memory_info.remote_node
-                                and info.fidelity == memory_info.fidelity):
-                            assert memory_info.remote_memo != info.remote_memo
-                            return [memory_info, info]
-                return []
-
-            def ep_rule_action(memories_info: List["MemoryInfo"]):
-                memories = [info.memory for info in memories_info]
-
-                def req_func(protocols):
-                    _protocols = []
-                    for protocol in protocols:
-                        if not isinstance(protocol, BBPSSW):
-                            continue
-
-                        if protocol.kept_memo.name == memories_info[0].remote_memo:
-                            _protocols.insert(0, protocol)
-                        if protocol.kept_memo.name == memories_info[1].remote_memo:
-                            _protocols.insert(1, protocol)
-
-                    if len(_protocols) != 2:
-                        return None
-
-                    protocols.remove(_protocols[1])
-                    _protocols[1].rule.protocols.remove(_protocols[1])
-                    _protocols[1].kept_memo.detach(_protocols[1])
-                    _protocols[0].meas_memo = _protocols[1].kept_memo
-                    _protocols[0].memories = [_protocols[0].kept_memo, _protocols[0].meas_memo]
-                    _protocols[0].name = _protocols[0].name + "." + _protocols[0].meas_memo.name
-                    _protocols[0].meas_memo.attach(_protocols[0])
-                    _protocols[0].t0 = _protocols[0].kept_memo.timeline.now()
-
-                    return _protocols[0]
-
-                name = "EP.%s.%s" % (memories[0].name, memories[1].name)
-                protocol = BBPSSW(None, name, memories[0], memories[1])
-                dsts = [memories_info[0].remote_node]
-                req_funcs = [req_func]
-                return protocol, dsts, req_funcs
-
-            rule = Rule(10, ep_rule_action, ep_rule_condition)
+            condition = partial(ep_rule_condition1, memory_indices=memory_indices[:reservation.memory_size],
+                                reservation=reservation)
+            rule = Rule(10, ep_rule_action1, condition)
             rules.append(rule)
 
         if index < len(path) - 1:
             if index == 0:
-                def ep_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                    if (memory_info.index in memory_indices
-                            and memory_info.state == "ENTANGLED" and memory_info.fidelity < reservation.fidelity):
-                        return [memory_info]
-                    return []
+                condition = partial(ep_rule_condition2, memory_indices=memory_indices, reservation=reservation)
             else:
-                def ep_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                    if (memory_info.index in memory_indices[reservation.memory_size:]
-                            and memory_info.state == "ENTANGLED" and memory_info.fidelity < reservation.fidelity):
-                        return [memory_info]
-                    return []
-
-            def ep_rule_action(memories_info: List["MemoryInfo"]):
-                memories = [info.memory for info in memories_info]
-                name = "EP.%s" % (memories[0].name)
-                protocol = BBPSSW(None, name, memories[0], None)
-                return protocol, [None], [None]
-
-            rule = Rule(10, ep_rule_action, ep_rule_condition)
+                condition = partial(ep_rule_condition2, memory_indices=memory_indices[reservation.memory_size:],
+                                    reservation=reservation)
+            rule = Rule(10, ep_rule_action2, condition)
             rules.append(rule)
 
         # create rules for entanglement swapping
-        def es_rule_actionB(memories_info: List["MemoryInfo"]):
-            memories = [info.memory for info in memories_info]
-            memory = memories[0]
-            protocol = EntanglementSwappingB(None, "ESB." + memory.name, memory)
-            return [protocol, [None], [None]]
-
         if index == 0:
-            def es_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                if (memory_info.state == "ENTANGLED"
-                        and memory_info.index in memory_indices
-                        and memory_info.remote_node != path[-1]
-                        and memory_info.fidelity >= reservation.fidelity):
-                    return [memory_info]
-                else:
-                    return []
-
-            rule = Rule(10, es_rule_actionB, es_rule_condition)
+            condition = partial(es_rule_conditionB, memory_indices=memory_indices, excluded=[path[-1]],
+                                reservation=reservation)
+            rule = Rule(10, es_rule_actionB, condition)
             rules.append(rule)
 
         elif index == len(path) - 1:
-            def es_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                if (memory_info.state == "ENTANGLED"
-                        and memory_info.index in memory_indices
-                        and memory_info.remote_node != path[0]
-                        and memory_info.fidelity >= reservation.fidelity):
-                    return [memory_info]
-                else:
-                    return []
-
-            rule = Rule(10, es_rule_actionB, es_rule_condition)
+            condition = partial(es_rule_conditionB, memory_indices=memory_indices, excluded=[path[0]],
+                                reservation=reservation)
+            rule = Rule(10, es_rule_actionB, condition)
             rules.append(rule)
 
         else:
@@ -383,64 +275,15 @@ class ResourceReservationProtocol(StackProtocol):
             _index = _path.index(self.own.name)
             left, right = _path[_index - 1], _path[_index + 1]
 
-            def es_rule_conditionA(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                if (memory_info.state == "ENTANGLED"
-                        and memory_info.index in memory_indices
-                        and memory_info.remote_node == left
-                        and memory_info.fidelity >= reservation.fidelity):
-                    for info in manager:
-                        if (info.state == "ENTANGLED"
-                                and info.index in memory_indices
-                                and info.remote_node == right
-                                and info.fidelity >= reservation.fidelity):
-                            return [memory_info, info]
-                elif (memory_info.state == "ENTANGLED"
-                      and memory_info.index in memory_indices
-                      and memory_info.remote_node == right
-                      and memory_info.fidelity >= reservation.fidelity):
-                    for info in manager:
-                        if (info.state == "ENTANGLED"
-                                and info.index in memory_indices
-                                and info.remote_node == left
-                                and info.fidelity >= reservation.fidelity):
-                            return [memory_info, info]
-                return []
-
-            def es_rule_actionA(memories_info: List["MemoryInfo"]):
-                memories = [info.memory for info in memories_info]
-
-                def req_func1(protocols):
-                    for protocol in protocols:
-                        if (isinstance(protocol, EntanglementSwappingB)
-                                and protocol.memory.name == memories_info[0].remote_memo):
-                            return protocol
-
-                def req_func2(protocols):
-                    for protocol in protocols:
-                        if (isinstance(protocol, EntanglementSwappingB)
-                                and protocol.memory.name == memories_info[1].remote_memo):
-                            return protocol
-
-                protocol = EntanglementSwappingA(None, "ESA.%s.%s" % (memories[0].name, memories[1].name),
-                                                 memories[0], memories[1],
-                                                 success_prob=self.es_succ_prob, degradation=self.es_degradation)
-                dsts = [info.remote_node for info in memories_info]
-                req_funcs = [req_func1, req_func2]
-                return protocol, dsts, req_funcs
-
-            rule = Rule(10, es_rule_actionA, es_rule_conditionA)
+            condition = partial(es_rule_conditionA, memory_indices=memory_indices, left=left, right=right,
+                                reservation=reservation)
+            action = partial(es_rule_actionA, rsvp=self)
+            rule = Rule(10, action, condition)
             rules.append(rule)
 
-            def es_rule_conditionB(memory_info: "MemoryInfo", manager: "MemoryManager") -> List["MemoryInfo"]:
-                if (memory_info.state == "ENTANGLED"
-                        and memory_info.index in memory_indices
-                        and memory_info.remote_node not in [left, right]
-                        and memory_info.fidelity >= reservation.fidelity):
-                    return [memory_info]
-                else:
-                    return []
-
-            rule = Rule(10, es_rule_actionB, es_rule_conditionB)
+            condition = partial(es_rule_conditionB, memory_indices=memory_indices, excluded=[left, right],
+                                reservation=reservation)
+            rule = Rule(10, es_rule_actionB, condition)
             rules.append(rule)
 
         for rule in rules:
@@ -488,6 +331,163 @@ class ResourceReservationProtocol(StackProtocol):
         self.es_degradation = degradation
 
 
+# Rule conditions, actions and request functions used by `ResourceReservationProtocol.create_rules`.
+# These are module-level functions (bound to their parameters with `functools.partial`) so that rules can be pickled.
+
+def eg_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager", memory_indices: List[int]):
+    if memory_info.state == "RAW" and memory_info.index in memory_indices:
+        return [memory_info]
+    else:
+        return []
+
+
+def eg_rule_action1(memories_info: List["MemoryInfo"], node: "QuantumRouter", other: str):
+    memories = [info.memory for info in memories_info]
+    memory = memories[0]
+    mid = node.map_to_middle_node[other]
+    protocol = EntanglementGenerationA(None, "EGA." + memory.name, mid, other, memory)
+    return [protocol, [None], [None]]
+
+
+def eg_rule_action2(memories_info: List["MemoryInfo"], node: "QuantumRouter", other: str, reservation: "Reservation"):
+    memories = [info.memory for info in memories_info]
+    memory = memories[0]
+    mid = node.map_to_middle_node[other]
+    protocol = EntanglementGenerationA(None, "EGA." + memory.name, mid, other, memory)
+    req_func = partial(eg_req_func, name=node.name, reservation=reservation)
+    return [protocol, [other], [req_func]]
+
+
+def eg_req_func(protocols, name: str, reservation: "Reservation"):
+    for protocol in protocols:
+        if isinstance(protocol, EntanglementGenerationA) and protocol.other == name \
+                and protocol.rule.get_reservation() == reservation:
+            return protocol
+
+
+def ep_rule_condition1(memory_info: "MemoryInfo", manager: "MemoryManager", memory_indices: List[int],
+                       reservation: "Reservation"):
+    if (memory_info.index in memory_indices
+            and memory_info.state == "ENTANGLED" and memory_info.fidelity < reservation.fidelity):
+        for info in manager:
+            if (info != memory_info and info.index in memory_indices
+                    and info.state == "ENTANGLED" and info.remote_node == memory_info.remote_node
+                    and info.fidelity == memory_info.fidelity):
+                assert memory_info.remote_memo != info.remote_memo
+                return [memory_info, info]
+    return []
+
+
+def ep_rule_action1(memories_info: List["MemoryInfo"]):
+    memories = [info.memory for info in memories_info]
+    name = "EP.%s.%s" % (memories[0].name, memories[1].name)
+    protocol = BBPSSW(None, name, memories[0], memories[1])
+    dsts = [memories_info[0].remote_node]
+    req_funcs = [partial(ep_req_func, memories_info=memories_info)]
+    return protocol, dsts, req_funcs
+
+
+def ep_req_func(protocols, memories_info: List["MemoryInfo"]):
+    _protocols = []
+    for protocol in protocols:
+        if not isinstance(protocol, BBPSSW):
+            continue
+
+        if protocol.kept_memo.name == memories_info[0].remote_memo:
+            _protocols.insert(0, protocol)
+        if protocol.kept_memo.name == memories_info[1].remote_memo:
+            _protocols.insert(1, protocol)
+
+    if len(_protocols) != 2:
+        return None
+
+    protocols.remove(_protocols[1])
+    _protocols[1].rule.protocols.remove(_protocols[1])
+    _protocols[1].kept_memo.detach(_protocols[1])
+    _protocols[0].meas_memo = _protocols[1].kept_memo
+    _protocols[0].memories = [_protocols[0].kept_memo, _protocols[0].meas_memo]
+    _protocols[0].name = _protocols[0].name + "." + _protocols[0].meas_memo.name
+    _protocols[0].meas_memo.attach(_protocols[0])
+    _protocols[0].t0 = _protocols[0].kept_memo.timeline.now()
+
+    return _protocols[0]
+
+
+def ep_rule_condition2(memory_info: "MemoryInfo", manager: "MemoryManager", memory_indices: List[int],
+                       reservation: "Reservation"):
+    if (memory_info.index in memory_indices
+            and memory_info.state == "ENTANGLED" and memory_info.fidelity < reservation.fidelity):
+        return [memory_info]
+    return []
+
+
+def ep_rule_action2(memories_info: List["MemoryInfo"]):
+    memories = [info.memory for info in memories_info]
+    name = "EP.%s" % (memories[0].name)
+    protocol = BBPSSW(None, name, memories[0], None)
+    return protocol, [None], [None]
+
+
+def es_rule_actionB(memories_info: List["MemoryInfo"]):
+    memories = [info.memory for info in memories_info]
+    memory = memories[0]
+    protocol = EntanglementSwappingB(None, "ESB." + memory.name, memory)
+    return [protocol, [None], [None]]
+
+
+def es_rule_conditionB(memory_info: "MemoryInfo", manager: "MemoryManager", memory_indices: List[int],
+                       excluded: List[str], reservation: "Reservation"):
+    if (memory_info.state == "ENTANGLED"
+            and memory_info.index in memory_indices
+            and memory_info.remote_node not in excluded
+            and memory_info.fidelity >= reservation.fidelity):
+        return [memory_info]
+    else:
+        return []
+
+
+def es_rule_conditionA(memory_info: "MemoryInfo", manager: "MemoryManager", memory_indices: List[int],
+                       left: str, right: str, reservation: "Reservation"):
+    if (memory_info.state == "ENTANGLED"
+            and memory_info.index in memory_indices
+            and memory_info.remote_node == left
+            and memory_info.fidelity >= reservation.fidelity):
+        for info in manager:
+            if (info.state == "ENTANGLED"
+                    and info.index in memory_indices
+                    and info.remote_node == right
+                    and info.fidelity >= reservation.fidelity):
+                return [memory_info, info]
+    elif (memory_info.state == "ENTANGLED"
+          and memory_info.index in memory_indices
+          and memory_info.remote_node == right
+          and memory_info.fidelity >= reservation.fidelity):
+        for info in manager:
+            if (info.state == "ENTANGLED"
+                    and info.index in memory_indices
+                    and info.remote_node == left
+                    and info.fidelity >= reservation.fidelity):
+                return [memory_info, info]
+    return []
+
+
+def es_rule_actionA(memories_info: List["MemoryInfo"], rsvp: "ResourceReservationProtocol"):
+    memories = [info.memory for info in memories_info]
+    protocol = EntanglementSwappingA(None, "ESA.%s.%s" % (memories[0].name, memories[1].name),
+                                     memories[0], memories[1],
+                                     success_prob=rsvp.es_succ_prob, degradation=rsvp.es_degradation)
+    dsts = [info.remote_node for info in memories_info]
+    req_funcs = [partial(es_req_func, memory_info=info) for info in memories_info]
+    return protocol, dsts, req_funcs
+
+
+def es_req_func(protocols, memory_info: "MemoryInfo"):
+    for protocol in protocols:
+        if (isinstance(protocol, EntanglementSwappingB)
+                and protocol.memory.name == memory_info.remote_memo):
+            return protocol
+
+
 class Reservation():
     """Tracking of reservation parameters for the network manager.
 
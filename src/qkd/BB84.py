@@ -8,8 +8,6 @@ Also included in this module are a function to pair protocol instances (required
 import math
 from enum import Enum, auto
 
-import numpy
-
 from ..message import Message
 from ..protocol import StackProtocol
 from ..kernel.event import Event
@@ -97,6 +95,7 @@ class BB84(StackProtocol):
         key_lenghts (List[int]): list of desired key lengths.
         self.keys_left_list (List[int]): list of desired number of keys.
         self.end_run_times (List[int]): simulation time for end of each request.
+        rng (RandomStream): random number stream of protocol instance.
     """
 
     def __init__(self, own: "QKDNode", name: str, role=-1):
@@ -129,6 +128,7 @@ class BB84(StackProtocol):
         self.key_lengths = []  # desired key lengths (from parent)
         self.keys_left_list = []
         self.end_run_times = []
+        self.rng = own.timeline.get_random_stream(name)
 
         # metrics
         self.latency = 0  # measured in seconds
@@ -234,8 +234,8 @@ class BB84(StackProtocol):
         if self.working and self.own.timeline.now() < self.end_run_times[0]:
             # generate basis/bit list
             num_pulses = round(self.light_time * self.ls_freq)
-            basis_list = numpy.random.choice([0, 1], num_pulses)
-            bit_list = numpy.random.choice([0, 1], num_pulses)
+            basis_list = self.rng.generator.integers(2, size=num_pulses)
+            bit_list = self.rng.generator.integers(2, size=num_pulses)
 
             # control hardware
             lightsource = self.own.lightsource
@@ -276,7 +276,7 @@ class BB84(StackProtocol):
         log.logger.debug(self.name + " setting measurement basis")
 
         num_pulses = int(self.light_time * self.ls_freq)
-        basis_list = numpy.random.choice([0, 1], num_pulses)
+        basis_list = self.rng.generator.integers(2, size=num_pulses)
         self.basis_lists.append(basis_list)
         self.own.qsdetector.set_basis_list(basis_list, self.start_time, self.ls_freq)
 
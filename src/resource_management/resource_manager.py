@@ -122,7 +122,8 @@ class ResourceManager():
         """Method to remove expired rule.
 
         Will update rule in rule manager.
-        Will also update and modify protocols connected to the rule (if they have already been created).
+        Will also update and modify protocols connected to the rule (if they have already been created),
+        and cancel the scheduled events of these protocols.
 
         Args:
             rule (Rule): rule to remove.
@@ -140,6 +141,7 @@ class ResourceManager():
             else:
                 raise Exception("Unknown place of protocol")
 
+            self.owner.timeline.cancel_all(protocol)
             for memory in protocol.memories:
                 self.update(protocol, memory, "RAW")
 
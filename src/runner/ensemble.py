@@ -0,0 +1,208 @@
+"""Tools for running ensembles of independent simulations.
+
+This module provides the `run_ensemble` function, which runs a scenario function for every configuration in a parameter grid on a pool of processes.
+Results are streamed to a `ResultStore` as each simulation finishes, so that an interrupted ensemble can be resumed.
+Configurations are identified by a hash of their parameters; configurations already present in the store are not run again.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import product
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+HASH_KEY = "config_hash"
+
+
+def make_grid(params: Dict[str, List[Any]], seeds=None) -> List[Dict[str, Any]]:
+    """Function to generate all combinations of parameter values.
+
+    Args:
+        params (Dict[str, List[Any]]): mapping of parameter names to lists of values.
+        seeds (List[int]): list of random seeds, each combination is repeated for each seed under the "seed" key (default None).
+
+    Returns:
+        List[Dict[str, Any]]: list of configurations.
+    """
+
+    if seeds is not None:
+        params = dict(params, seed=seeds)
+    names = list(params.keys())
+    return [dict(zip(names, values)) for values in product(*params.values())]
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Function to compute a hash identifying a configuration.
+
+    The hash does not depend on the order of keys.
+    Values are converted to JSON (numpy scalars as python numbers).
+
+    Raises:
+        TypeError: if the configuration has values that cannot be converted to JSON.
+
+    Args:
+        config (Dict[str, Any]): configuration to hash.
+
+    Returns:
+        str: hexadecimal hash string.
+    """
+
+    encoded = json.dumps(config, sort_keys=True, default=_to_json)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+class ResultStore():
+    """Class storing ensemble results in a file.
+
+    Results are stored as JSON lines (one record per line), appended and flushed as they are added.
+    Records hold the configuration hash, the configuration parameters and the result values.
+    A line left incomplete by an interrupted process is ignored when the store is loaded.
+
+    Attributes:
+        filename (str): path of the result file.
+        records (Dict[str, Dict[str, Any]]): mapping of configuration hashes to records.
+    """
+
+    def __init__(self, filename: str):
+        """Constructor for result store class.
+
+        Existing results in the file are loaded.
+
+        Args:
+            filename (str): path of the result file.
+        """
+
+        self.filename = filename
+        self.records = {}
+        if os.path.exists(filename):
+            with open(filename) as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.records[record[HASH_KEY]] = record
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, config: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        """Method to add the result of a configuration.
+
+        Result values override configuration parameters with the same name.
+
+        Args:
+            config (Dict[str, Any]): configuration of the simulation.
+            result (Dict[str, Any]): result values of the simulation.
+
+        Returns:
+            Dict[str, Any]: the stored record.
+
+        Raises:
+            TypeError: if the configuration or result has values that cannot be converted to JSON.
+        """
+
+        record = {HASH_KEY: config_hash(config)}
+        record.update(config)
+        record.update(result)
+        with open(self.filename, "a") as fh:
+            # start a new line if the last write was interrupted
+            if fh.tell() > 0 and not self._ends_with_newline():
+                fh.write("\n")
+            fh.write(json.dumps(record, default=_to_json) + "\n")
+            fh.flush()
+        self.records[record[HASH_KEY]] = record
+        return record
+
+    def to_dataframe(self, configs=None) -> "pd.DataFrame":
+        """Method to get stored results as a pandas DataFrame.
+
+        Args:
+            configs (List[Dict[str, Any]]): if given, only results of these configurations are returned (in the same order).
+
+        Returns:
+            DataFrame: one row per record.
+        """
+
+        if configs is None:
+            records = list(self.records.values())
+        else:
+            hashes = [config_hash(config) for config in configs]
+            records = [self.records[h] for h in hashes if h in self.records]
+        return pd.DataFrame(records)
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.filename, "rb") as fh:
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) == b"\n"
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    # values such as objects would be converted by address, which is not deterministic
+    raise TypeError("value {!r} of type {} cannot be converted to JSON".format(value, type(value).__name__))
+
+
+def run_ensemble(scenario: Callable[[Dict[str, Any]], Dict[str, Any]], configs: List[Dict[str, Any]], store: "ResultStore",
+                 max_workers=None, max_pending=None) -> "pd.DataFrame":
+    """Function to run a scenario for many configurations on a process pool.
+
+    Configurations already in the store (by hash) are skipped, so that running the same ensemble again resumes it.
+    Each result is added to the store as soon as it finishes.
+    The scenario and configurations must be picklable (e.g. the scenario is a module-level function).
+
+    Args:
+        scenario (Callable[[Dict[str, Any]], Dict[str, Any]]): function building and running one simulation, returning its results.
+        configs (List[Dict[str, Any]]): configurations to run (see `make_grid`).
+        store (ResultStore): store for results.
+        max_workers (int): maximum number of worker processes (default number of CPUs).
+        max_pending (int): maximum number of submitted configurations waiting for results (default 2 * max_workers).
+
+    Returns:
+        DataFrame: results of all configurations in `configs`.
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * max_workers
+
+    todo = []
+    hashes = set()
+    for config in configs:
+        key = config_hash(config)
+        if key not in store and key not in hashes:
+            hashes.add(key)
+            todo.append(config)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        todo.reverse()
+        while todo or pending:
+            while todo and len(pending) < max_pending:
+                config = todo.pop()
+                pending[executor.submit(scenario, config)] = config
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            error = None
+            for future in done:
+                config = pending.pop(future)
+                if future.exception() is not None:
+                    error = future.exception()
+                else:
+                    store.add(config, future.result())
+
+            # finished results are kept in the store, so the ensemble can be resumed
+            if error is not None:
+                for future in pending:
+                    future.cancel()
+                raise error
+
+    return store.to_dataframe(configs)
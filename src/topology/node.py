@@ -7,9 +7,12 @@ Node types can be used to collect all the necessary hardware and software for a
 
 from math import inf
 from time import monotonic_ns
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Iterator, Tuple
+
+from numpy import asarray, int64, rint
 
 if TYPE_CHECKING:
+    from numpy import ndarray
     from ..kernel.timeline import Timeline
     from ..message import Message
     from ..protocol import StackProtocol
@@ -17,9 +20,13 @@ if TYPE_CHECKING:
     from ..network_management.reservation import Reservation
     from ..components.optical_channel import QuantumChannel, ClassicalChannel
     from ..components.memory import Memory
+    from ..components.photon import PhotonBatch
     from ..app.random_request import RandomRequestApp
 
 from ..kernel.entity import Entity
+from ..kernel.event import Event
+from ..kernel.process import Process
+from ..kernel.recurring import RecurringEvent
 from ..components.memory import MemoryArray
 from ..components.bsm import SingleAtomBSM
 from ..components.light_source import LightSource
@@ -132,6 +139,33 @@ class Node(Entity):
 
         pass
 
+    def send_qubit_batch(self, dst: str, batch: "PhotonBatch") -> None:
+        """Interface for quantum channel `transmit_batch` method."""
+
+        self.qchannels[dst].transmit_batch(batch, self)
+
+    def receive_qubit_batch(self, src: str, batch: "PhotonBatch") -> None:
+        """Method to receive a batch of photons from quantum channel.
+
+        Called at the arrival time of the first photon.
+        Photon objects are built and passed to `receive_qubit` one at a time, at their arrival times,
+        by a single recurring event (which still fires once per photon).
+        Nodes with hardware able to process a whole batch may override this method to handle it in one call.
+
+        Args:
+            src (str): name of node where the photons were sent from.
+            batch (PhotonBatch): transmitted photons, with their arrival times.
+        """
+
+        indices = iter(range(len(batch)))
+        if len(batch) > 1:
+            process = Process(self, "_receive_batch_photon", [src, batch, indices])
+            self.timeline.schedule(RecurringEvent(self.timeline, batch.times[1:].tolist(), process))
+        self._receive_batch_photon(src, batch, indices)
+
+    def _receive_batch_photon(self, src: str, batch: "PhotonBatch", indices: "Iterator[int]") -> None:
+        self.receive_qubit(src, batch.get_photon(next(indices)))
+
 
 class BSMNode(Node):
     """Bell state measurement node.
@@ -413,61 +447,58 @@ class QKDNode(Node):
 
         # compute received bits based on encoding scheme
         encoding = self.encoding["name"]
-        bits = [-1] * int(round(light_time * frequency))  # -1 used for invalid bits
+        num_bits = int(round(light_time * frequency))
+        bits = [-1] * num_bits  # -1 used for invalid bits
 
         if encoding == "polarization":
             detection_times = self.qsdetector.get_photon_times()
 
             # determine indices from detection times and record bits
-            for time in detection_times[0]:  # detection times for |0> detector
-                index = round((time - start_time) * frequency * 1e-12)
-                if 0 <= index < len(bits):
-                    bits[index] = 0
+            indices, _, _ = _get_bit_times(detection_times[0], start_time, frequency, num_bits)
+            for index in indices.tolist():  # detection times for |0> detector
+                bits[index] = 0
 
-            for time in detection_times[1]:  # detection times for |1> detector
-                index = round((time - start_time) * frequency * 1e-12)
-                if 0 <= index < len(bits):
-                    if bits[index] == 0:
-                        bits[index] = -1
-                    else:
-                        bits[index] = 1
+            indices, _, _ = _get_bit_times(detection_times[1], start_time, frequency, num_bits)
+            for index in indices.tolist():  # detection times for |1> detector
+                if bits[index] == 0:
+                    bits[index] = -1
+                else:
+                    bits[index] = 1
 
         elif encoding == "time_bin":
             detection_times = self.qsdetector.get_photon_times()
             bin_separation = self.encoding["bin_separation"]
-        
+
             # single detector (for early, late basis) times
-            for time in detection_times[0]:
-                index = int(round((time - start_time) * frequency * 1e-12))
-                if 0 <= index < len(bits):
-                    if abs(((index * 1e12 / frequency) + start_time) - time) < bin_separation / 2:
-                        bits[index] = 0
-                    elif abs(((index * 1e12 / frequency) + start_time) - (time - bin_separation)) < bin_separation / 2:
-                        bits[index] = 1
-        
+            indices, bit_times, times = _get_bit_times(detection_times[0], start_time, frequency, num_bits)
+            early = abs(bit_times - times) < bin_separation / 2
+            late = abs(bit_times - (times - bin_separation)) < bin_separation / 2
+            for index, is_early, is_late in zip(indices.tolist(), early.tolist(), late.tolist()):
+                if is_early:
+                    bits[index] = 0
+                elif is_late:
+                    bits[index] = 1
+
             # interferometer detector 0 times
-            for time in detection_times[1]:
-                time -= bin_separation
-                index = int(round((time - start_time) * frequency * 1e-12))
-                # check if index is in range and is in correct time bin
-                if 0 <= index < len(bits) and \
-                        abs(((index * 1e12 / frequency) + start_time) - time) < bin_separation / 2:
-                    if bits[index] == -1:
-                        bits[index] = 0
-                    else:
-                        bits[index] = -1
+            indices, bit_times, times = _get_bit_times(detection_times[1], start_time, frequency, num_bits,
+                                                       bin_separation)
+            # check if index is in correct time bin
+            in_bin = abs(bit_times - times) < bin_separation / 2
+            for index in indices[in_bin].tolist():
+                if bits[index] == -1:
+                    bits[index] = 0
+                else:
+                    bits[index] = -1
 
             # interferometer detector 1 times
-            for time in detection_times[2]:
-                time -= bin_separation
-                index = int(round((time - start_time) * frequency * 1e-12))
-                # check if index is in range and is in correct time bin
-                if 0 <= index < len(bits) and \
-                        abs(((index * 1e12 / frequency) + start_time) - time) < bin_separation / 2:
-                    if bits[index] == -1:
-                        bits[index] = 1
-                    else:
-                        bits[index] = -1
+            indices, bit_times, times = _get_bit_times(detection_times[2], start_time, frequency, num_bits,
+                                                       bin_separation)
+            in_bin = abs(bit_times - times) < bin_separation / 2
+            for index in indices[in_bin].tolist():
+                if bits[index] == -1:
+                    bits[index] = 1
+                else:
+                    bits[index] = -1
 
         else:
             raise Exception("QKD node {} has illegal encoding type {}".format(self.name, encoding))
@@ -519,3 +550,49 @@ class QKDNode(Node):
 
     def receive_qubit(self, src: str, qubit) -> None:
         self.qsdetector.get(qubit)
+
+    def receive_qubit_batch(self, src: str, batch: "PhotonBatch") -> None:
+        """Method to receive a batch of photons from quantum channel.
+
+        Polarization encoded photons are measured by the QSDetector as arrays, in a single event at the arrival time of the last photon
+        (so that detections are recorded in order with the dark counts of the detectors).
+        Other encodings are received one photon at a time (see `Node.receive_qubit_batch`).
+
+        Args:
+            src (str): name of node where the photons were sent from.
+            batch (PhotonBatch): transmitted photons, with their arrival times.
+        """
+
+        if batch.encoding_type["name"] != "polarization":
+            Node.receive_qubit_batch(self, src, batch)
+            return
+        last_time = int(batch.times[-1])
+        if last_time > self.timeline.now():
+            process = Process(self.qsdetector, "get_batch", [batch.times, batch.states])
+            self.timeline.schedule(Event(last_time, process))
+        else:
+            self.qsdetector.get_batch(batch.times, batch.states)
+
+
+def _get_bit_times(times: "ndarray", start_time: int, frequency: float, num_bits: int, delay=0) -> Tuple[
+        "ndarray", "ndarray", "ndarray"]:
+    """Function to find the bits sent nearest to detection times.
+
+    Args:
+        times (numpy.ndarray): detection times (in ps).
+        start_time (int): time at which the first bit was received.
+        frequency (float): frequency of bit transmission.
+        num_bits (int): number of bits sent.
+        delay (int): delay (in ps) subtracted from detection times (default 0).
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: for detection times within the sent bits,
+            the index of the nearest bit, the time of the bit and the (delayed) detection time.
+    """
+
+    times = asarray(times, dtype=int64) - delay
+    indices = rint((times - start_time) * frequency * 1e-12).astype(int64)
+    in_range = (indices >= 0) & (indices < num_bits)
+    indices, times = indices[in_range], times[in_range]
+    bit_times = (indices * 1e12 / frequency) + start_time
+    return indices, bit_times, times
@@ -0,0 +1,345 @@
+"""Parallel simulation of partitioned networks.
+
+This module provides the `run_parallel` function, which simulates a network split into partitions (see `Topology.partition`) on multiple processes.
+Each process builds the full network on its own timeline, but only executes the events of the nodes in its partition.
+Classical messages sent on channels between partitions are pickled and exchanged through the parent process.
+References in messages to named entities, protocols and the timeline are pickled by name,
+and resolved in the receiving process to its own copy of the entity (this is why each process builds the full network).
+Protocols of nodes in other partitions are replaced by stand-ins holding a copy of their simple attributes (see `RemoteProtocol`).
+
+Synchronization is conservative and windowed: a message from another partition arrives at least one lookahead
+(the minimum delay of the classical channels between partitions) after it is sent.
+All partitions may thus execute the events of one window, from the earliest pending event to one lookahead later, independently.
+"""
+
+import io
+import itertools
+import multiprocessing
+import pickle
+import traceback
+import weakref
+from functools import partial
+from math import inf
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from ..components.optical_channel import ClassicalChannel
+    from ..message import Message
+    from .topology import Topology
+
+from ..components.optical_channel import OpticalChannel
+from ..kernel.entity import Entity
+from ..kernel.event import Event
+from ..kernel.process import Process
+from ..kernel.timeline import Timeline
+from ..protocol import Protocol
+from .node import Node
+
+
+def run_parallel(builder: Callable[["Timeline"], "Topology"], collect: Callable[["Node"], Any], stop_time: int,
+                 num_partitions: int, seed=None) -> Dict[str, Any]:
+    """Function to simulate a network on multiple processes.
+
+    The `builder` function is called once in the calling process to partition the network, and once in each worker process.
+    It must build the same network each time, and the `builder` and `collect` functions must be picklable (e.g. module-level functions).
+    Messages sent between partitions must be picklable once entities and protocols are replaced by their names.
+    Quantum connections are never cut (see `Topology.partition`), so that only networks with several groups of nodes joined by quantum connections can be run in parallel.
+    Results match a sequential run with the same seed as long as entities only draw from their own random streams (see `Timeline.get_random_stream`),
+    and not from generators shared with other partitions (such as the global numpy generator),
+    and messages between partitions do not arrive with the same time and priority as other events.
+    Calls to `Timeline.stop` only end the current window.
+
+    Args:
+        builder (Callable[[Timeline], Topology]): function to build the network on a timeline.
+        collect (Callable[[Node], Any]): function to collect the (picklable) results of a node at the end of simulation.
+        stop_time (int): stop time (in ps) of simulation.
+        num_partitions (int): maximum number of processes to use.
+        seed (int): random seed set on each timeline before calling `builder` (default None).
+
+    Returns:
+        Dict[str, Any]: mapping of node names to collected results.
+
+    Raises:
+        Exception: if the network cannot be split while `num_partitions` is greater than 1, or if a worker process fails (the message holds the traceback of the worker).
+    """
+
+    timeline = Timeline(stop_time)
+    if seed is not None:
+        timeline.seed(seed)
+    topology = builder(timeline)
+    partitions = topology.partition(num_partitions)
+    if num_partitions > 1 and len(partitions) == 1:
+        raise Exception("network cannot be split, as all nodes are joined by quantum connections (use num_partitions=1 to run sequentially)")
+    home = {name: i for i, partition in enumerate(partitions) for name in partition}
+
+    lookahead = inf
+    for cchannel in topology.cchannels:
+        end1, end2 = cchannel.ends
+        if home[end1.name] != home[end2.name]:
+            lookahead = min(lookahead, int(cchannel.delay))
+    if lookahead <= 0:
+        raise Exception("classical channels between partitions must have positive delay")
+
+    if len(partitions) == 1:
+        timeline.init()
+        timeline.run()
+        return {name: collect(node) for name, node in topology.nodes.items()}
+
+    # unseeded workers share the entropy of random streams with this timeline
+    entropy = timeline.random_streams.entropy
+    connections = []
+    workers = []
+    for i in range(len(partitions)):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        worker = multiprocessing.Process(target=_run_partition,
+                                         args=(builder, collect, stop_time, seed, entropy, partitions, i, child_conn))
+        worker.start()
+        # close the child end here, so that receiving from a stopped worker raises EOFError instead of blocking
+        child_conn.close()
+        connections.append(parent_conn)
+        workers.append(worker)
+
+    results = {}
+    try:
+        while True:
+            # gather next event times and messages between partitions
+            inboxes = [[] for _ in partitions]
+            next_time = inf
+            for conn in connections:
+                worker_time, outbox = _receive(conn)
+                next_time = min(next_time, worker_time)
+                for message in outbox:
+                    next_time = min(next_time, message[1])
+                    inboxes[home[message[0]]].append(message)
+
+            if next_time >= stop_time:
+                window_end = None
+            else:
+                window_end = min(next_time + lookahead, stop_time)
+            for conn, inbox in zip(connections, inboxes):
+                conn.send((window_end, inbox))
+            if window_end is None:
+                break
+
+        for conn in connections:
+            results.update(_receive(conn))
+    except BaseException:
+        # other workers may be waiting for the next window
+        for worker in workers:
+            worker.terminate()
+        raise
+    finally:
+        for conn, worker in zip(connections, workers):
+            conn.close()
+            worker.join()
+
+    return results
+
+
+def _receive(conn) -> Any:
+    """Function to receive data from a worker process, raising an exception if the worker failed."""
+
+    try:
+        failed, data = conn.recv()
+    except EOFError:
+        raise Exception("worker process stopped unexpectedly")
+    if failed:
+        raise Exception("worker process failed:\n" + data)
+    return data
+
+
+def _run_partition(builder, collect, stop_time, seed, entropy, partitions, index, conn) -> None:
+    """Function to simulate one partition in a worker process (see `run_parallel`).
+
+    Data is sent to the parent process as (failed, data) tuples, where `data` is the traceback if the worker failed.
+    """
+
+    try:
+        _simulate_partition(builder, collect, stop_time, seed, entropy, partitions, index, conn)
+    except Exception:
+        conn.send((True, traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _simulate_partition(builder, collect, stop_time, seed, entropy, partitions, index, conn) -> None:
+    timeline = Timeline(stop_time)
+    if seed is not None:
+        timeline.seed(seed)
+    else:
+        timeline.random_streams.seed(entropy)
+    topology = builder(timeline)
+    local = set(partitions[index])
+    references = _ReferenceTable(timeline)
+
+    # messages to other partitions are recorded as (receiver, time, priority, source, pickled message)
+    outbox = []
+    for cchannel in topology.cchannels:
+        end1, end2 = cchannel.ends
+        if (end1.name in local) != (end2.name in local):
+            cchannel.transmit = partial(_transmit_remote, cchannel, outbox, references)
+
+    # channels are handled by the partitions of their ends, other entities and events not belonging to a node by the first partition
+    def is_local(entity):
+        name = _get_home_node(entity)
+        if name is not None:
+            return name in local
+        if isinstance(entity, OpticalChannel) and entity.ends:
+            return any(end.name in local for end in entity.ends)
+        return index == 0
+
+    for event in list(timeline.events):
+        if not is_local(event.process.owner):
+            timeline.remove_event(event)
+    for entity in timeline.entities:
+        if is_local(entity):
+            entity.init()
+
+    conn.send((False, (_get_next_time(timeline), outbox[:])))
+    outbox.clear()
+    while True:
+        window_end, inbox = conn.recv()
+        for receiver, time, priority, source, data in sorted(inbox, key=lambda m: (m[1], m[2])):
+            message = references.loads(data)
+            process = Process(topology.nodes[receiver], "receive_message", [source, message])
+            timeline.schedule(Event(time, process, priority))
+        if window_end is None:
+            break
+
+        timeline.stop_time = window_end
+        timeline.run()
+        conn.send((False, (_get_next_time(timeline), outbox[:])))
+        outbox.clear()
+
+    timeline.stop_time = stop_time
+    conn.send((False, {name: collect(topology.nodes[name]) for name in partitions[index]}))
+
+
+def _transmit_remote(cchannel: "ClassicalChannel", outbox: List, references: "_ReferenceTable", message: "Message",
+                     source: "Node", priority: int) -> None:
+    """Function replacing `ClassicalChannel.transmit` for channels between partitions."""
+
+    receiver = cchannel.ends[1] if cchannel.ends[0] == source else cchannel.ends[0]
+    future_time = round(cchannel.timeline.now() + int(cchannel.delay))
+    outbox.append((receiver.name, future_time, priority, source.name, references.dumps(message)))
+
+
+class RemoteProtocol(Protocol):
+    """Class standing in for a protocol of a node simulated by another process.
+
+    Stand-ins are created when a message from another partition refers to a protocol of a node outside the local partition.
+    They hold a copy of the simple attributes of the protocol (such as `name`, `own`, `memories` and `fidelity`)
+    at the time the latest message referring to it was sent.
+
+    Attributes:
+        key (Tuple[str, int]): key of the protocol in the process simulating its node.
+    """
+
+    def __init__(self, key: Tuple[str, int]):
+        self.key = key
+
+    def received_message(self, src: str, msg: "Message"):
+        raise Exception("protocol {} is simulated by another process".format(getattr(self, "name", self.key)))
+
+
+class _ReferenceTable:
+    """Class to pickle messages between partitions, keeping track of the protocols they refer to.
+
+    Named entities (the first entity registered in the timeline with their name) and the timeline are pickled by name.
+    Protocols are pickled by a key of (node name, counter) assigned by the process sending them,
+    together with a copy of their simple attributes the first time they appear in a message.
+    """
+
+    def __init__(self, timeline: "Timeline"):
+        self.timeline = timeline
+        self.counter = itertools.count()
+        self.keys = weakref.WeakKeyDictionary()  # local protocol -> key
+        self.protocols = weakref.WeakValueDictionary()  # key -> local protocol or stand-in
+
+    def dumps(self, message: "Message") -> bytes:
+        file = io.BytesIO()
+        pickler = pickle.Pickler(file, pickle.HIGHEST_PROTOCOL)
+        saved = set()
+
+        def persistent_id(obj):
+            if obj is self.timeline:
+                return ("timeline",)
+            if isinstance(obj, Entity) and self.timeline.entities.get(obj.name) is obj:
+                return ("entity", obj.name)
+            if isinstance(obj, RemoteProtocol):
+                return ("protocol", obj.key, None)
+            if isinstance(obj, Protocol):
+                key = self.keys.get(obj)
+                if key is None:
+                    key = (_get_home_node(obj), next(self.counter))
+                    self.keys[obj] = key
+                    self.protocols[key] = obj
+                if id(obj) in saved:
+                    return ("protocol", key, None)
+                saved.add(id(obj))
+                attributes = {name: value for name, value in vars(obj).items() if _is_simple(value)}
+                return ("protocol", key, attributes)
+            return None
+
+        pickler.persistent_id = persistent_id
+        pickler.dump(message)
+        return file.getvalue()
+
+    def loads(self, data: bytes) -> "Message":
+        unpickler = pickle.Unpickler(io.BytesIO(data))
+
+        def persistent_load(pid):
+            if pid[0] == "timeline":
+                return self.timeline
+            if pid[0] == "entity":
+                return self.timeline.entities.get(pid[1])
+            _, key, attributes = pid
+            protocol = self.protocols.get(key)
+            if protocol is None:
+                protocol = RemoteProtocol(key)
+                self.protocols[key] = protocol
+            if attributes is not None and isinstance(protocol, RemoteProtocol):
+                vars(protocol).update(attributes)
+            return protocol
+
+        unpickler.persistent_load = persistent_load
+        return unpickler.load()
+
+
+def _is_simple(value: Any) -> bool:
+    """Function to check if a protocol attribute is copied to stand-ins (see `RemoteProtocol`)."""
+
+    if value is None or isinstance(value, (bool, int, float, str, Entity, Protocol)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_simple(item) for item in value)
+    return False
+
+
+def _get_next_time(timeline: "Timeline") -> int:
+    """Function to get the time of the next valid event on a timeline (inf if none)."""
+
+    events = timeline.events
+    while True:
+        try:
+            event = events.pop()
+        except IndexError:
+            return inf
+        if not event.is_invalid():
+            events.unpop(event)
+            return event.time
+
+
+def _get_home_node(entity: Any) -> str:
+    """Function to find the name of the node an entity belongs to (None if not found).
+
+    Follows the `owner` attribute of hardware, the `own` attribute of protocols and the `node` attribute of applications.
+    """
+
+    for _ in range(16):
+        if isinstance(entity, Node):
+            return entity.name
+        entity = getattr(entity, "owner", None) or getattr(entity, "own", None) or getattr(entity, "node", None)
+        if entity is None:
+            return None
+    return None
@@ -4,7 +4,8 @@ This module provides a definition of the Topology class, which can be used to ma
 Topology instances automatically perform many useful network functions.
 """
 
-from typing import TYPE_CHECKING
+from math import ceil
+from typing import TYPE_CHECKING, List
 
 import json5
 
@@ -185,8 +186,79 @@ class Topology():
         self._cc_graph[node1][node2] = cchannel.delay
         self._cc_graph[node2][node1] = cchannel.delay
 
+    def partition(self, num_partitions: int) -> List[List[str]]:
+        """Method to split the network nodes into groups for parallel simulation (see the `parallel` module).
+
+        Nodes joined by a quantum connection are always placed in the same group,
+        as photons share quantum states with the hardware of the sending node.
+        Classical connections may be cut (messages between partitions are pickled, see the `parallel` module).
+        Groups of joined nodes are ordered by a breadth-first search over classical connections and assigned to partitions of similar size.
+
+        Args:
+            num_partitions (int): maximum number of partitions.
+
+        Returns:
+            List[List[str]]: names of nodes in each partition (may be fewer than `num_partitions`).
+        """
+
+        assert num_partitions > 0
+
+        parent = {name: name for name in self.nodes}
+
+        def find(name):
+            while parent[name] != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        for channel in self.qchannels:
+            root1, root2 = [find(end.name) for end in channel.ends]
+            parent[root1] = root2
+
+        groups = {}
+        for name in self.nodes:
+            groups.setdefault(find(name), []).append(name)
+
+        # order groups so that neighboring groups are likely placed in the same partition
+        order = []
+        visited = set()
+        for root in groups:
+            if root in visited:
+                continue
+            visited.add(root)
+            queue = [root]
+            while queue:
+                group = queue.pop(0)
+                order.append(group)
+                for name in groups[group]:
+                    for neighbor in self._cc_graph[name]:
+                        neighbor_group = find(neighbor)
+                        if neighbor_group not in visited:
+                            visited.add(neighbor_group)
+                            queue.append(neighbor_group)
+
+        partition_size = ceil(len(self.nodes) / num_partitions)
+        partitions = [[]]
+        for group in order:
+            if partitions[-1] and len(partitions[-1]) + len(groups[group]) > partition_size \
+                    and len(partitions) < num_partitions:
+                partitions.append([])
+            partitions[-1].extend(groups[group])
+        return [partition for partition in partitions if partition]
+
     def get_nodes_by_type(self, node_type: str) -> [Node]:
-        return [node for name, node in self.nodes.items() if type(node).__name__ == node_type]
+        """Method to get nodes of the network by class name.
+
+        Nodes are looked up in the entity registry of the timeline (see `EntityRegistry.get_by_type`).
+
+        Args:
+            node_type (str): exact class name of nodes.
+
+        Returns:
+            List[Node]: nodes of the network with the class name.
+        """
+
+        return [node for node in self.timeline.entities.get_by_type(node_type) if self.nodes.get(node.name) is node]
 
     def generate_forwarding_table(self, starting_node: str) -> dict:
         """Method to create forwarding table for static routing protocol.
@@ -0,0 +1,316 @@
+"""Definition of the density matrix state class.
+
+This module defines the DensityState class, a density matrix alternative to the ket vectors of the QuantumState class.
+DensityState provides the same interfaces for measurement and entanglement, as well as noise channels and fidelity computation.
+
+Noise channels are defined by their Kraus operators, and applied through cached superoperators:
+the density matrix of an entangled group is reshaped to a tensor with one row and one column axis per qubit,
+and the superoperator of a channel is contracted with the two axes of the target qubit.
+"""
+
+from functools import lru_cache
+from typing import List, Tuple, Union
+
+import numpy as np
+from numpy.random import random_sample
+
+_I = np.identity(2, dtype=complex)
+_X = np.array([[0, 1], [1, 0]], dtype=complex)
+_Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+_Z = np.array([[1, 0], [0, -1]], dtype=complex)
+
+
+def depolarizing_kraus(p: float) -> Tuple[np.ndarray, ...]:
+    """Function to get the Kraus operators of a depolarizing channel (rho -> (1 - p) rho + p I / 2).
+
+    Args:
+        p (float): depolarizing probability.
+    """
+
+    return (np.sqrt(1 - 3 * p / 4) * _I, np.sqrt(p / 4) * _X, np.sqrt(p / 4) * _Y, np.sqrt(p / 4) * _Z)
+
+
+def dephasing_kraus(p: float) -> Tuple[np.ndarray, ...]:
+    """Function to get the Kraus operators of a dephasing channel (rho -> (1 - p) rho + p Z rho Z).
+
+    Args:
+        p (float): phase flip probability.
+    """
+
+    return (np.sqrt(1 - p) * _I, np.sqrt(p) * _Z)
+
+
+def amplitude_damping_kraus(gamma: float) -> Tuple[np.ndarray, ...]:
+    """Function to get the Kraus operators of an amplitude damping channel (decay from \\|1> to \\|0>).
+
+    Args:
+        gamma (float): decay probability.
+    """
+
+    return (np.array([[1, 0], [0, np.sqrt(1 - gamma)]], dtype=complex),
+            np.array([[0, np.sqrt(gamma)], [0, 0]], dtype=complex))
+
+
+CHANNELS = {"depolarizing": depolarizing_kraus,
+            "dephasing": dephasing_kraus,
+            "amplitude_damping": amplitude_damping_kraus}
+
+
+def kraus_to_superoperator(kraus: Tuple[np.ndarray, ...]) -> np.ndarray:
+    """Function to compute the superoperator of a single qubit channel.
+
+    The superoperator acts on density matrices flattened in row-major order: vec(sum K rho K^dag) = S vec(rho).
+
+    Args:
+        kraus (Tuple[np.ndarray]): 2x2 Kraus operators of the channel.
+
+    Returns:
+        np.ndarray: 4x4 superoperator.
+    """
+
+    return sum(np.kron(k, k.conj()) for k in kraus)
+
+
+@lru_cache(maxsize=1000)
+def get_superoperator(channel: str, param: float) -> np.ndarray:
+    """Function to get the (cached) superoperator of a named channel.
+
+    Args:
+        channel (str): name of the channel, one of "depolarizing", "dephasing" or "amplitude_damping".
+        param (float): parameter of the channel.
+
+    Returns:
+        np.ndarray: read-only superoperator, reshaped to a (2, 2, 2, 2) tensor (row out, column out, row in, column in).
+    """
+
+    if channel not in CHANNELS:
+        raise Exception("invalid channel {}".format(channel))
+    superoperator = kraus_to_superoperator(CHANNELS[channel](param)).reshape(2, 2, 2, 2)
+    superoperator.setflags(write=False)
+    return superoperator
+
+
+def to_density_matrix(state: Union[Tuple[complex], np.ndarray]) -> np.ndarray:
+    """Function to convert a ket (or density matrix) to a density matrix.
+
+    Args:
+        state (Union[Tuple[complex], np.ndarray]): ket coefficients (in Z-basis) or density matrix.
+
+    Returns:
+        np.ndarray: density matrix.
+    """
+
+    state = np.asarray(state, dtype=complex)
+    if state.ndim == 1:
+        return np.outer(state, state.conj())
+    return state.copy()
+
+
+class DensityState():
+    """Class to manage a quantum state as a density matrix.
+
+    Tracks the density matrix (in Z-basis) shared by a group of entangled states.
+    The first state of `entangled_states` corresponds to the most significant qubit (as for QuantumState).
+
+    Attributes:
+        state (np.ndarray): density matrix of the entangled group.
+        entangled_states (List[DensityState]): list of entangled states (including self).
+    """
+
+    def __init__(self):
+        self.state = to_density_matrix((complex(1), complex(0)))
+        self.entangled_states = [self]
+
+    def entangle(self, another_state: "DensityState") -> None:
+        """Method to entangle two quantum states.
+
+        Args:
+            another_state (DensityState): state to entangle current state with.
+
+        Side Effects:
+            Modifies the `entangled_states` and `state` fields of all states in both groups.
+        """
+
+        entangled_states = self.entangled_states + another_state.entangled_states
+        new_state = np.kron(self.state, another_state.state)
+        self._set_group(entangled_states, new_state)
+
+    def set_state(self, state: Union[Tuple[complex], np.ndarray]) -> None:
+        """Method to change the state of the entangled group.
+
+        Args:
+            state (Union[Tuple[complex], np.ndarray]): new ket or density matrix of all entangled states.
+        """
+
+        self._set_group(self.entangled_states, to_density_matrix(state))
+
+    def set_state_single(self, state: Union[Tuple[complex], np.ndarray]) -> None:
+        """Method to unentangle and set the state of a single quantum state object.
+
+        The other states of the group keep their reduced density matrix.
+
+        Args:
+            state (Union[Tuple[complex], np.ndarray]): new ket or density matrix of the single state.
+        """
+
+        self._detach()
+        self.state = to_density_matrix(state)
+
+    def apply_gate(self, gate: np.ndarray) -> None:
+        """Method to apply a single qubit gate to the current state.
+
+        Args:
+            gate (np.ndarray): 2x2 unitary.
+        """
+
+        superoperator = np.kron(gate, np.conj(gate)).reshape(2, 2, 2, 2)
+        self._apply_superoperator(superoperator)
+
+    def cnot(self, target: "DensityState") -> None:
+        """Method to apply a CNOT gate with the current state as control.
+
+        Args:
+            target (DensityState): target state (entangled with the current state if needed).
+        """
+
+        if target not in self.entangled_states:
+            self.entangle(target)
+        group = self.entangled_states
+        n = len(group)
+        control_bit, target_bit = 1 << (n - 1 - group.index(self)), 1 << (n - 1 - group.index(target))
+        # the gate permutes basis vectors, flipping the target bit where the control bit is set
+        indices = np.arange(2 ** n)
+        permutation = np.where(indices & control_bit, indices ^ target_bit, indices)
+        DensityState._set_group(group, self.state[np.ix_(permutation, permutation)])
+
+    def apply_channel(self, channel: str, param: float) -> None:
+        """Method to apply a noise channel to the current state.
+
+        Args:
+            channel (str): name of the channel, one of "depolarizing", "dephasing" or "amplitude_damping".
+            param (float): parameter of the channel.
+        """
+
+        self._apply_superoperator(get_superoperator(channel, param))
+
+    def fidelity(self, target: Union[Tuple[complex], np.ndarray], states=None) -> float:
+        """Method to compute the fidelity of states with a pure target state.
+
+        Args:
+            target (Union[Tuple[complex], np.ndarray]): target ket.
+            states (List[DensityState]): entangled states corresponding to the qubits of the target, in order (default None for [self]).
+
+        Returns:
+            float: fidelity <target|rho|target> of the reduced density matrix of `states`.
+        """
+
+        if states is None:
+            states = [self]
+        for state in states:
+            assert state in self.entangled_states, "states must be entangled"
+        rho = self._reduce(states)
+        target = np.asarray(target, dtype=complex)
+        return float(np.real(target.conj() @ rho @ target))
+
+    def measure(self, basis: Tuple[Tuple[complex]], rng=None) -> int:
+        """Method to measure a single quantum state.
+
+        After measurement the state is unentangled from the rest of its group.
+
+        Args:
+            basis (Tuple[Tuple[complex]]): measurement basis, given as list of states (that are themselves lists of complex coefficients).
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+
+        Returns:
+            int: 0/1 measurement result, corresponding to one basis vector.
+        """
+
+        rand = random_sample() if rng is None else rng.random()
+        return DensityState._measure(basis, [self], rand)
+
+    @staticmethod
+    def measure_multiple(basis, states, rng=None) -> int:
+        """Method to measure multiple qubits in a more complex basis.
+
+        May be used for bell state measurement.
+        After measurement the measured states form an entangled group in the measured basis vector,
+        unentangled from the rest of their previous group.
+
+        Args:
+            basis (List[List[complex]]): list of basis vectors.
+            states (List[DensityState]): list of quantum state objects to measure (must be entangled).
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+
+        Returns:
+            int: measurement result in given basis.
+        """
+
+        for state in states[1:]:
+            assert state in states[0].entangled_states
+        assert len(basis) == 2 ** len(states)
+        rand = random_sample() if rng is None else rng.random()
+        return DensityState._measure(basis, states, rand)
+
+    @staticmethod
+    def _measure(basis, states: List["DensityState"], rand: float) -> int:
+        group = states[0].entangled_states
+        rest = [s for s in group if all(s is not t for t in states)]
+        dim, rest_dim = 2 ** len(states), 2 ** len(rest)
+
+        # order axes as (measured, rest) for rows and columns
+        rho = DensityState._permute(states[0].state, group, states + rest).reshape(dim, rest_dim, dim, rest_dim)
+        vectors = np.asarray(basis, dtype=complex)
+        # reduced states of the rest for each outcome, unnormalized: <b|rho|b>
+        reduced = np.einsum("ia,arbs,ib->irs", vectors.conj(), rho, vectors)
+        probabilities = np.maximum(np.real(np.trace(reduced, axis1=1, axis2=2)), 0)
+
+        result = int(np.searchsorted(np.cumsum(probabilities), rand * probabilities.sum(), side="right"))
+        result = min(result, len(basis) - 1)
+        DensityState._set_group(states, np.outer(vectors[result], vectors[result].conj()))
+        if rest:
+            DensityState._set_group(rest, reduced[result] / probabilities[result])
+        return result
+
+    def _detach(self) -> None:
+        group = self.entangled_states
+        if len(group) > 1:
+            rest = [s for s in group if s is not self]
+            DensityState._set_group(rest, self._reduce(rest))
+            self.entangled_states = [self]
+
+    def _reduce(self, states: List["DensityState"]) -> np.ndarray:
+        """Method to compute the reduced density matrix of entangled states (in the order given)."""
+
+        group = self.entangled_states
+        if len(states) == len(group):
+            return DensityState._permute(self.state, group, states)
+        rest = [s for s in group if all(s is not t for t in states)]
+        dim, rest_dim = 2 ** len(states), 2 ** len(rest)
+        rho = DensityState._permute(self.state, group, states + rest).reshape(dim, rest_dim, dim, rest_dim)
+        return np.trace(rho, axis1=1, axis2=3)
+
+    def _apply_superoperator(self, superoperator: np.ndarray) -> None:
+        group = self.entangled_states
+        n = len(group)
+        index = group.index(self)
+        rho = self.state.reshape((2,) * (2 * n))
+        rho = np.tensordot(superoperator, rho, axes=([2, 3], [index, n + index]))
+        rho = np.moveaxis(rho, [0, 1], [index, n + index]).reshape(2 ** n, 2 ** n)
+        DensityState._set_group(group, rho)
+
+    @staticmethod
+    def _permute(rho: np.ndarray, group: List["DensityState"], order: List["DensityState"]) -> np.ndarray:
+        """Function to reorder the qubits of a group density matrix."""
+
+        n = len(group)
+        if all(s is t for s, t in zip(group, order)):
+            return rho
+        axes = [group.index(s) for s in order]
+        return rho.reshape((2,) * (2 * n)).transpose(axes + [n + a for a in axes]).reshape(2 ** n, 2 ** n)
+
+    @staticmethod
+    def _set_group(states: List["DensityState"], rho: np.ndarray) -> None:
+        states = list(states)
+        for state in states:
+            state.entangled_states = states
+            state.state = rho
@@ -2,42 +2,70 @@
 
 This module defines the QuantumState class, used by photons and memories to track internal quantum states.
 The class provides interfaces for measurement and entanglement.
+Measurement outcomes of entangled states are cached in a StateTable, shared by all quantum states (see `QuantumState.table`).
+Measurement probabilities of unentangled states are cached by coefficients, without interning the states.
 """
 from functools import lru_cache
 from math import sqrt
-from typing import Tuple
+from typing import List, Tuple
 
-from numpy import pi, cos, sin, array, outer, kron, identity, arange
+from numpy import pi, cos, sin, array, outer, kron, arange, einsum, tensordot, vdot, cumsum, searchsorted
 from numpy.random import random, random_sample, choice
 
-
-def swap_bits(num, pos1, pos2):
-    """Swaps bits in num at positions 1 and 2.
-
-    Used by quantum_state.measure_multiple method.
-    """
-
-    bit1 = (num >> pos1) & 1
-    bit2 = (num >> pos2) & 1
-    x = bit1 ^ bit2
-    x = (x << pos1) | (x << pos2)
-    return num ^ x
+from .state_table import StateTable
 
 
 class QuantumState():
     """Class to manage a quantum state.
 
     Tracks quantum state coefficients (in Z-basis) and entangled states.
+    The ID of the state in the state table is kept alongside the coefficients, so that measurements do not hash the coefficients again.
+
+    States in an entanglement group share one `entangled_states` list, which holds exactly the members of the group.
+    Groups are merged by `entangle`, and split when a member is measured or reset, so that measured qubits are released from their group.
 
     Attributes:
         state (Tuple[complex]): list of complex coefficients in Z-basis.
-        entangled_states (List[QuantumState]): list of entangled states (indludng self).
+        entangled_states (List[QuantumState]): list of entangled states (including self).
+        table (StateTable): table of interned states and measurement outcomes, shared by all quantum states (class attribute).
     """
 
+    table = StateTable()
+
     def __init__(self):
         self.state = (complex(1), complex(0))
         self.entangled_states = [self]
 
+    @property
+    def state(self) -> Tuple[complex]:
+        return self._state
+
+    @state.setter
+    def state(self, state: Tuple[complex]) -> None:
+        self._state = state
+        self._state_id = None
+
+    def __getstate__(self):
+        # state IDs are only valid in the state table of the current process
+        state = self.__dict__.copy()
+        state["_state_id"] = None
+        return state
+
+    def _get_state_id(self) -> int:
+        table = QuantumState.table
+        if self._state_id is None or self._state_id not in table:
+            self._state_id = table.intern(self._state)
+        return self._state_id
+
+    @staticmethod
+    def _set_group(states: List["QuantumState"], state: Tuple[complex], state_id: int = None) -> None:
+        # make `states` a group of their own, sharing one new list and the ket `state`
+        group = list(states)
+        for qs in group:
+            qs.entangled_states = group
+            qs._state = state
+            qs._state_id = state_id
+
     def entangle(self, another_state: "QuantumState"):
         """Method to entangle two quantum states.
 
@@ -57,17 +85,20 @@ class QuantumState():
             quantum_state.entangled_states = entangled_states
             quantum_state.state = new_state
 
-    def random_noise(self):
+    def random_noise(self, rng=None):
         """Method to add random noise to a single state.
 
         Chooses a random angle to set the quantum state to (with no phase difference).
 
+        Args:
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+
         Side Effects:
             Modifies the `state` field.
         """
 
         # TODO: rewrite for entangled states
-        angle = random() * 2 * pi
+        angle = (random() if rng is None else rng.random()) * 2 * pi
         self.state = (complex(cos(angle)), complex(sin(angle)))
 
     # only for use with entangled state
@@ -85,127 +116,193 @@ class QuantumState():
             qs.state = state
 
     # for use with single, unentangled state
-    def set_state_single(self, state: Tuple[complex]):
+    def set_state_single(self, state: Tuple[complex], rng=None):
         """Method to unentangle and set the state of a single quantum state object.
 
+        An entangled state is first measured in the Z basis, which separates it from its group
+        (the other states are left in the post-measurement state of the rest of the group).
+
         Args:
             state (Tuple[complex]): 2-element list of new complex coefficients.
+            rng (RandomStream): random number stream for the measurement of an entangled state (default None for the numpy global random state).
 
         Side Effects:
             Will remove current state from any entangled states (if present).
             Modifies the `state` field of current state.
         """
 
-        for qs in self.entangled_states:
-            if qs is not None and qs != self:
-                index = qs.entangled_states.index(self)
-                qs.entangled_states[index] = None
-        self.entangled_states = [self]
-        self.state = state
+        if len(self.entangled_states) > 1:
+            self.measure(_Z_BASIS, rng)
+        self._state = state
+        self._state_id = None
 
-    def measure(self, basis: Tuple[Tuple[complex]]) -> int:
+    def measure(self, basis: Tuple[Tuple[complex]], rng=None) -> int:
         """Method to measure a single quantum state.
 
         Args:
             basis (Tuple[Tuple[complex]]): measurement basis, given as list of states (that are themselves lists of complex coefficients).
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
 
         Returns:
             int: 0/1 measurement result, corresponding to one basis vector.
 
         Side Effects:
             Modifies the `state` field for current and any entangled states.
+            Removes current state from its entanglement group (if present), leaving it in the measured basis state.
         """
 
-        # handle entangled case
-        if len(self.entangled_states) > 1:
-            num_states = len(self.entangled_states)
-            state_index = self.entangled_states.index(self)
-            state0, state1, prob = _measure_entangled_state_with_cache(self.state, basis, state_index, num_states)
-            if random_sample() < prob:
-                new_state = state0
-                result = 0
-            else:
-                new_state = state1
-                result = 1
-            new_state = tuple(new_state)
+        rand = random_sample() if rng is None else rng.random()
+        group = self.entangled_states
 
         # handle unentangled case
-        else:
-            prob = _measure_state_with_cache(self.state, basis)
-            if random_sample() < prob:
-                new_state = basis[0]
+        # (the state table is skipped: probabilities are cached by coefficients, which is cheaper than interning states set from outside)
+        if len(group) == 1:
+            if rand < _measure_state_with_cache(self._state, basis):
+                self._state = basis[0]
                 result = 0
             else:
-                new_state = basis[1]
+                self._state = basis[1]
                 result = 1
+            self._state_id = None
+            return result
 
-        # set new state
-        # new_state = tuple(new_state)
-        for s in self.entangled_states:
-            if s is not None:
-                s.state = new_state
+        # handle entangled case
+        table = QuantumState.table
+        state_id = self._get_state_id()
+        basis_id = table.basis_id(basis)
+        num_states = len(group)
+        state_index = group.index(self)
+        key = (_ENTANGLED, state_id, basis_id, state_index, num_states)
+        outcome = table.lookup(key)
+        if outcome is None:
+            rest0, rest1, prob = _measure_entangled_state(table.get_state(state_id), basis, state_index, num_states)
+            outcomes = (None if rest0 is None else (basis[0], rest0), None if rest1 is None else (basis[1], rest1))
+            outcome = table.store(key, (prob, *_intern_outcomes(table, outcomes)))
+
+        prob, outcome0, outcome1 = outcome
+        if rand < prob:
+            new_states = outcome0
+            result = 0
+        else:
+            new_states = outcome1
+            result = 1
+
+        # set new state, splitting the measured state from the rest of its group
+        rest_state, rest_id = new_states[1]
+        QuantumState._set_group(group[:state_index] + group[state_index + 1:], rest_state, rest_id)
+        self.entangled_states = [self]
+        self._state, self._state_id = new_states[0]
 
         return result
 
     @staticmethod
-    def measure_multiple(basis, states):
+    def measure_multiple(basis, states, rng=None):
         """Method to measure multiple qubits in a more complex basis.
 
         May be used for bell state measurement.
+        The measured states form a new group in the measured basis state, and are removed from the rest of their group.
 
         Args:
             basis (List[List[complex]]): list of basis vectors.
             states (List[QuantumState]): list of quantum state objects to meausre.
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
 
         Returns:
             int: measurement result in given basis.
 
         Side Effects:
-            Will modify the `state` field of all entangled states.
+            Will modify the `state` and `entangled_states` fields of all entangled states.
         """
 
         # ensure states are entangled
         # (must be entangled prior to calling measure_multiple)
-        entangled_list = states[0].entangled_states
+        group = states[0].entangled_states
         for state in states[1:]:
-            assert state in states[0].entangled_states
+            assert state in group
         # ensure basis and vectors in basis are the right size
         basis_dimension = 2 ** len(states)
         assert len(basis) == basis_dimension
         for vector in basis:
             assert len(vector) == len(basis)
 
-        state = states[0].state
-
-        # move states to beginning of entangled list and quantum state
-        pos_state_0 = entangled_list.index(states[0])
-        pos_state_1 = entangled_list.index(states[1])
-        entangled_list[0], entangled_list[pos_state_0] = entangled_list[pos_state_0], entangled_list[0]
-        entangled_list[1], entangled_list[pos_state_1] = entangled_list[pos_state_1], entangled_list[1]
-        switched_state = [complex(0)] * len(state)
-        for i, coefficient in enumerate(state):
-            switched_i = swap_bits(i, pos_state_0, pos_state_1)
-            switched_state[switched_i] = coefficient
-
-        state = tuple(switched_state)
+        table = QuantumState.table
+        state_id = states[0]._get_state_id()
+        basis_id = table.basis_id(basis)
+
+        # move measured states to the leading axes of the quantum state
+        positions = tuple(group.index(state) for state in states)
+        rest = [qs for qs in group if all(qs is not state for state in states)]
+        if positions != tuple(range(len(states))):
+            key = (_PERMUTE, state_id, positions, len(group))
+            permuted = table.lookup(key)
+            if permuted is None:
+                permuted = table.store(key, _intern_state(table, _permute_state(table.get_state(state_id), positions,
+                                                                                len(group))))
+            permuted_state, state_id = permuted
+            if state_id not in table:
+                state_id = table.intern(permuted_state)
 
         # math for probability calculations
-        length_diff = len(entangled_list) - len(states)
+        length_diff = len(rest)
 
-        new_states, probabilities = _measure_multiple_with_cache(state, basis, length_diff)
+        key = (_MULTIPLE, state_id, basis_id, length_diff)
+        outcome = table.lookup(key)
+        if outcome is None:
+            rest_states, probabilities = _measure_multiple(table.get_state(state_id), basis, length_diff)
+            outcomes = [None if rest_state is None else (basis[i], rest_state) if length_diff else (basis[i],)
+                        for i, rest_state in enumerate(rest_states)]
+            outcome = table.store(key, (_intern_outcomes(table, outcomes), probabilities))
+        new_states, probabilities = outcome
 
-        possible_results = arange(0, basis_dimension, 1)
         # result gives index of the basis vector that will be projected to
-        res = choice(possible_results, p=probabilities)
-        # project to new state, then reassign quantum state and entangled photons
-        new_state = new_states[res]
-        for state in entangled_list:
-            state.quantum_state = new_state
-            state.entangled_photons = entangled_list
+        if rng is None:
+            possible_results = arange(0, basis_dimension, 1)
+            res = choice(possible_results, p=probabilities)
+        else:
+            res = int(searchsorted(cumsum(probabilities), rng.random() * sum(probabilities), side="right"))
+            res = min(res, basis_dimension - 1)
+
+        # project to new state, then reassign quantum state and entanglement groups
+        measured_state, measured_id = new_states[res][0]
+        QuantumState._set_group(states, measured_state, measured_id)
+        if rest:
+            rest_state, rest_id = new_states[res][1]
+            QuantumState._set_group(rest, rest_state, rest_id)
 
         return res
 
 
+# kinds of outcomes held in the state table
+_ENTANGLED, _MULTIPLE, _PERMUTE = range(3)
+
+_Z_BASIS = ((complex(1), complex(0)), (complex(0), complex(1)))
+
+
+def _intern_outcomes(table: StateTable, outcomes: Tuple) -> Tuple:
+    """Function to intern the post-measurement states of a measurement.
+
+    Args:
+        outcomes (Tuple): the states for each result (None if impossible).
+            The states of a result are the ket of the measured qubits, followed by the ket of the rest of their group (if any).
+
+    Returns:
+        Tuple: a tuple of (state, state ID) for each state of each result (None if impossible).
+    """
+
+    return tuple(None if kets is None else tuple(_intern_state(table, tuple(ket)) for ket in kets) for kets in outcomes)
+
+
+def _intern_state(table: StateTable, state: Tuple[complex]) -> Tuple[Tuple[complex], int]:
+    state_id = table.intern(state)
+    return table.get_state(state_id), state_id
+
+
+def _permute_state(state: Tuple[complex], positions: Tuple[int], num_states: int) -> Tuple[complex]:
+    # move the qubits at `positions` to the front, keeping the order of the other qubits
+    axes = list(positions) + [i for i in range(num_states) if i not in positions]
+    return tuple(array(state, dtype=complex).reshape((2,) * num_states).transpose(axes).reshape(-1))
+
+
 @lru_cache(maxsize=1000)
 def _measure_state_with_cache(state: Tuple[complex, complex], basis: Tuple[Tuple[complex]]) -> float:
     state = array(state)
@@ -219,64 +316,49 @@ def _measure_state_with_cache(state: Tuple[complex, complex], basis: Tuple[Tuple
     prob_0 = (state.conj().transpose() @ M0.conj().transpose() @ M0 @ state).real
     return prob_0
 
-@lru_cache(maxsize=1000)
-def _measure_entangled_state_with_cache(state: Tuple[complex], basis:Tuple[Tuple[complex]],
+def _measure_entangled_state(state: Tuple[complex], basis:Tuple[Tuple[complex]],
                                         state_index: int, num_states: int) -> Tuple[
         Tuple[complex], Tuple[complex], float]:
-    state = array(state)
+    # contract the axis of the measured state, rather than building 2^n x 2^n projectors
+    # (operator outer(u*, u) maps psi to u* (x) <u*|psi>, leaving the other states in <u*|psi>)
+    state = array(state, dtype=complex).reshape((2,) * num_states)
     u = array(basis[0], dtype=complex)
     v = array(basis[1], dtype=complex)
-    # measurement operator
-    M0 = outer(u.conj(), u)
-    M1 = outer(v.conj(), v)
 
-    # generate projectors
-    projector0 = [1]
-    projector1 = [1]
-    for i in range(num_states):
-        if i == state_index:
-            projector0 = kron(projector0, M0)
-            projector1 = kron(projector1, M1)
-        else:
-            projector0 = kron(projector0, identity(2))
-            projector1 = kron(projector1, identity(2))
+    rest0 = tensordot(u, state, axes=([0], [state_index])).reshape(-1)
+    rest1 = tensordot(v, state, axes=([0], [state_index])).reshape(-1)
 
     # probability of measuring basis[0]
-    prob_0 = (state.conj().transpose() @ projector0.conj().transpose() @ projector0 @ state).real
+    prob_0 = vdot(u, u).real * vdot(rest0, rest0).real
 
     if prob_0 >= 1:
         state1 = None
     else:
-        state1 = (projector1 @ state) / sqrt(1 - prob_0)
+        state1 = rest1 / sqrt(vdot(rest1, rest1).real)
 
     if prob_0 <= 0:
         state0 = None
     else:
-        state0 = (projector0 @ state) / sqrt(prob_0)
+        state0 = rest0 / sqrt(vdot(rest0, rest0).real)
 
     return (state0, state1, prob_0)
 
-@lru_cache(maxsize=1000)
-def _measure_multiple_with_cache(state: Tuple[Tuple[complex]], basis: Tuple[Tuple[complex]], length_diff: int) -> Tuple[
+def _measure_multiple(state: Tuple[Tuple[complex]], basis: Tuple[Tuple[complex]], length_diff: int) -> Tuple[
         Tuple[Tuple[complex]], Tuple[float]]:
-    state = array(state)
-    # construct measurement operators, projectors, and probabilities of measurement
-    projectors = [None] * len(basis)
-    probabilities = [0] * len(basis)
-    for i, vector in enumerate(basis):
-        vector = array(vector, dtype=complex)
-        M = outer(vector.conj(), vector)  # measurement operator
-        projectors[i] = kron(M, identity(2 ** length_diff))  # projector
-        probabilities[i] = (state.conj().transpose() @ projectors[i].conj().transpose() @ projectors[i] @ state).real
-        if probabilities[i] < 0:
-            probabilities[i] = 0
-
-    return_states = [None] * len(projectors)
-    for i, proj in enumerate(projectors):
-        # project to new state
+    # measured states are the leading qubits: view the state as a (2^k, 2^length_diff) matrix
+    state = array(state, dtype=complex).reshape(len(basis), 2 ** length_diff)
+    vectors = array(basis, dtype=complex)
+    # amplitudes <v*|psi> of each basis vector, for each state of the other qubits
+    # (operator outer(v*, v) maps psi to v* (x) <v*|psi> in the current convention)
+    amplitudes = vectors @ state
+    norms = einsum("ij,ij->i", amplitudes.conj(), amplitudes).real
+    probabilities = norms * einsum("ij,ij->i", vectors.conj(), vectors).real
+    probabilities = tuple(max(float(p), 0) for p in probabilities)
+
+    # states of the other qubits for each result
+    return_states = [None] * len(basis)
+    for i in range(len(basis)):
         if probabilities[i] > 0:
-            new_state = (proj @ state) / sqrt(probabilities[i])
-            new_state = tuple(new_state)
-            return_states[i] = new_state
+            return_states[i] = tuple(amplitudes[i] / sqrt(norms[i]))
 
-    return (tuple(return_states), tuple(probabilities))
+    return (tuple(return_states), probabilities)
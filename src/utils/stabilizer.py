@@ -0,0 +1,610 @@
+"""Definition of the stabilizer state class.
+
+This module defines the StabilizerState class, a stabilizer tableau alternative to the ket vectors of the QuantumState class.
+Stabilizer states are limited to the states reachable with Clifford gates and Pauli measurements,
+but an entangled group of n qubits is stored in O(n^2) bits rather than 2^n coefficients.
+Gates are applied in O(n) time and measurements in O(n^2) time.
+
+The tableau follows Aaronson and Gottesman, "Improved simulation of stabilizer circuits" (2004):
+rows 0 to n-1 hold the destabilizers and rows n to 2n-1 the stabilizers of the group, each as X bits, Z bits and a sign bit.
+"""
+
+from functools import lru_cache
+from itertools import product
+from typing import List, Tuple
+
+import numpy as np
+from numpy.random import random_sample
+
+_PAULI_MATRICES = {(0, 0): np.identity(2, dtype=complex),
+                   (1, 0): np.array([[0, 1], [1, 0]], dtype=complex),
+                   (1, 1): np.array([[0, -1j], [1j, 0]], dtype=complex),
+                   (0, 1): np.array([[1, 0], [0, -1]], dtype=complex)}
+
+_SQRT_HALF = np.sqrt(1 / 2)
+# named single qubit clifford gates, given as sequences of tableau updates
+_NAMED_GATES = (("I", np.identity(2), ()),
+                ("X", _PAULI_MATRICES[(1, 0)], ("X",)),
+                ("Y", _PAULI_MATRICES[(1, 1)], ("Y",)),
+                ("Z", _PAULI_MATRICES[(0, 1)], ("Z",)),
+                ("H", np.array([[1, 1], [1, -1]]) * _SQRT_HALF, ("H",)),
+                ("S", np.array([[1, 0], [0, 1j]]), ("S",)),
+                ("Sdg", np.array([[1, 0], [0, -1j]]), ("S", "Z")))
+
+
+def _equal_up_to_phase(matrix1, matrix2) -> bool:
+    product_matrix = np.asarray(matrix1).conj().T @ np.asarray(matrix2)
+    return np.allclose(product_matrix, product_matrix[0, 0] * np.identity(2)) and abs(abs(product_matrix[0, 0]) - 1) < 1e-9
+
+
+def _clifford_group() -> Tuple[Tuple]:
+    """Function to generate the 24 single qubit Clifford gates (up to a global phase) as products of H and S."""
+
+    gates = list(_NAMED_GATES)
+    generators = (_NAMED_GATES[4], _NAMED_GATES[5])
+    for _, matrix, updates in gates:  # grows while iterating (breadth first search)
+        for _, gen_matrix, gen_updates in generators:
+            new_matrix = gen_matrix @ matrix
+            if not any(_equal_up_to_phase(new_matrix, other) for _, other, _ in gates):
+                gates.append((None, new_matrix, updates + gen_updates))
+    return tuple(gates)
+
+
+# all single qubit clifford gates (unnamed beyond _NAMED_GATES)
+_GATES = _clifford_group()
+
+# real single qubit stabilizer states, used for random noise
+_REAL_STATES = ((1, 0), (0, 1), (_SQRT_HALF, _SQRT_HALF), (_SQRT_HALF, -_SQRT_HALF))
+
+
+def _phase_exponents(x1, z1, x2, z2) -> np.ndarray:
+    """Function giving the exponent of i picked up when multiplying Pauli operators (x1, z1) * (x2, z2) on each qubit."""
+
+    x1, z1, x2, z2 = (np.asarray(a, dtype=np.int8) for a in (x1, z1, x2, z2))
+    return np.where(x1 & z1, z2 - x2,
+                    np.where(x1, z2 * (2 * x2 - 1),
+                             np.where(z1, x2 * (1 - 2 * z2), 0)))
+
+
+class _Tableau():
+    """Stabilizer tableau of an entangled group of n qubits.
+
+    Attributes:
+        x (np.ndarray): (2n, n) X bits of destabilizers and stabilizers.
+        z (np.ndarray): (2n, n) Z bits of destabilizers and stabilizers.
+        r (np.ndarray): (2n,) sign bits (1 for a -1 sign).
+    """
+
+    __slots__ = ("x", "z", "r")
+
+    def __init__(self, num_qubits: int):
+        # |0...0>: destabilizers X_i, stabilizers Z_i
+        self.x = np.zeros((2 * num_qubits, num_qubits), dtype=bool)
+        self.z = np.zeros((2 * num_qubits, num_qubits), dtype=bool)
+        self.r = np.zeros(2 * num_qubits, dtype=bool)
+        self.x[:num_qubits] = np.identity(num_qubits, dtype=bool)
+        self.z[num_qubits:] = np.identity(num_qubits, dtype=bool)
+
+    @property
+    def num_qubits(self) -> int:
+        return self.x.shape[1]
+
+    @staticmethod
+    def merge(first: "_Tableau", second: "_Tableau") -> "_Tableau":
+        """Method to build the tableau of the (product) state of two groups."""
+
+        n1, n2 = first.num_qubits, second.num_qubits
+        n = n1 + n2
+        tableau = _Tableau.__new__(_Tableau)
+        tableau.x = np.zeros((2 * n, n), dtype=bool)
+        tableau.z = np.zeros((2 * n, n), dtype=bool)
+        tableau.r = np.zeros(2 * n, dtype=bool)
+        for offset, rows, other in ((0, slice(0, n1), first), (n1, slice(n1, n), second)):
+            cols = slice(offset, offset + other.num_qubits)
+            k = other.num_qubits
+            tableau.x[rows, cols] = other.x[:k]
+            tableau.z[rows, cols] = other.z[:k]
+            tableau.r[rows] = other.r[:k]
+            stab_rows = slice(n + offset, n + offset + k)
+            tableau.x[stab_rows, cols] = other.x[k:]
+            tableau.z[stab_rows, cols] = other.z[k:]
+            tableau.r[stab_rows] = other.r[k:]
+        return tableau
+
+    def rowsum(self, rows: np.ndarray, i: int) -> None:
+        """Method to multiply rows (in place) by row i."""
+
+        exponents = _phase_exponents(self.x[i], self.z[i], self.x[rows], self.z[rows]).sum(axis=1)
+        total = 2 * self.r[rows].astype(int) + 2 * int(self.r[i]) + exponents
+        self.r[rows] = (total % 4) == 2
+        self.x[rows] ^= self.x[i]
+        self.z[rows] ^= self.z[i]
+
+    def anticommuting(self, px: np.ndarray, pz: np.ndarray) -> np.ndarray:
+        """Method to find the rows anticommuting with a Pauli operator."""
+
+        return (np.count_nonzero((self.x & pz) ^ (self.z & px), axis=1) & 1).astype(bool)
+
+    def product_sign(self, rows: np.ndarray) -> int:
+        """Method to get the sign bit of the product of rows."""
+
+        x = np.zeros(self.num_qubits, dtype=bool)
+        z = np.zeros(self.num_qubits, dtype=bool)
+        r = 0
+        for i in rows:
+            exponent = int(_phase_exponents(self.x[i], self.z[i], x, z).sum())
+            r = ((2 * r + 2 * int(self.r[i]) + exponent) % 4) // 2
+            x ^= self.x[i]
+            z ^= self.z[i]
+        return r
+
+    def expectation(self, px: np.ndarray, pz: np.ndarray) -> int:
+        """Method to get the expectation value (-1, 0 or 1) of a Pauli operator."""
+
+        n = self.num_qubits
+        anti = self.anticommuting(px, pz)
+        if anti[n:].any():
+            return 0
+        return 1 - 2 * self.product_sign(n + np.flatnonzero(anti[:n]))
+
+    def measure(self, px: np.ndarray, pz: np.ndarray, rand: float) -> Tuple[int, int]:
+        """Method to measure a Pauli operator.
+
+        After measurement the operator (with the sign of the result) is one of the stabilizer rows.
+
+        Args:
+            px (np.ndarray): X bits of the operator.
+            pz (np.ndarray): Z bits of the operator.
+            rand (float): uniform random number deciding random outcomes.
+
+        Returns:
+            Tuple[int, int]: measurement result (1 for eigenvalue -1) and stabilizer row of the operator.
+        """
+
+        n = self.num_qubits
+        anti = self.anticommuting(px, pz)
+        stab_anti = np.flatnonzero(anti[n:])
+
+        if len(stab_anti) > 0:
+            # random outcome
+            p = n + stab_anti[0]
+            anti[p] = False
+            rows = np.flatnonzero(anti)
+            if len(rows) > 0:
+                self.rowsum(rows, p)
+            self.x[p - n], self.z[p - n], self.r[p - n] = self.x[p], self.z[p], self.r[p]
+            result = int(rand < 0.5)
+        else:
+            # deterministic outcome: the operator is a product of stabilizers, replace one of them
+            rows = n + np.flatnonzero(anti[:n])
+            result = self.product_sign(rows)
+            p = rows[0]
+            destabilizers = rows[1:] - n
+            if len(destabilizers) > 0:
+                self.rowsum(destabilizers, p - n)
+
+        self.x[p], self.z[p], self.r[p] = px, pz, result
+        return result, p
+
+    def remove(self, qubit: int, row: int) -> Tuple["_Tableau", "_Tableau"]:
+        """Method to split a qubit stabilized by a single qubit Pauli operator from the group.
+
+        Args:
+            qubit (int): index of the qubit.
+            row (int): stabilizer row holding the single qubit operator.
+
+        Returns:
+            Tuple[_Tableau, _Tableau]: tableau of the remaining qubits and tableau of the removed qubit.
+        """
+
+        n = self.num_qubits
+        d = row - n
+        px, pz = self.x[row, qubit], self.z[row, qubit]
+
+        # clear the qubit from other rows
+        anti = (self.x[:, qubit] & pz) ^ (self.z[:, qubit] & px)
+        anti[d] = anti[row] = False
+        rows = np.flatnonzero(anti)
+        if len(rows) > 0:
+            self.rowsum(rows, d)
+        support = self.x[:, qubit] | self.z[:, qubit]
+        support[d] = support[row] = False
+        rows = np.flatnonzero(support)
+        if len(rows) > 0:
+            self.rowsum(rows, row)
+
+        single = _Tableau(1)
+        single.x[0, 0], single.z[0, 0] = not px, px  # destabilizer anticommuting with the operator (X or Z)
+        single.x[1, 0], single.z[1, 0], single.r[1] = px, pz, self.r[row]
+
+        rest = _Tableau.__new__(_Tableau)
+        keep = np.ones(2 * n, dtype=bool)
+        keep[[d, row]] = False
+        rest.x = np.delete(self.x[keep], qubit, axis=1)
+        rest.z = np.delete(self.z[keep], qubit, axis=1)
+        rest.r = self.r[keep]
+        return rest, single
+
+    def apply(self, gate: str, qubit: int) -> None:
+        """Method to apply a single qubit gate ("X", "Y", "Z", "H" or "S")."""
+
+        x, z = self.x[:, qubit], self.z[:, qubit]
+        if gate == "X":
+            self.r ^= z
+        elif gate == "Y":
+            self.r ^= x ^ z
+        elif gate == "Z":
+            self.r ^= x
+        elif gate == "H":
+            self.r ^= x & z
+            self.x[:, qubit], self.z[:, qubit] = z.copy(), x.copy()
+        elif gate == "S":
+            self.r ^= x & z
+            self.z[:, qubit] ^= x
+        else:
+            raise Exception("invalid gate {}".format(gate))
+
+    def apply_cnot(self, control: int, target: int) -> None:
+        xc, zc, xt, zt = self.x[:, control], self.z[:, control], self.x[:, target], self.z[:, target]
+        self.r ^= xc & zt & ~(xt ^ zc)
+        self.x[:, target] ^= xc
+        self.z[:, control] ^= zt
+
+
+def _pauli_matrix(x: Tuple[int], z: Tuple[int]) -> np.ndarray:
+    matrix = np.ones((1, 1), dtype=complex)
+    for bits in zip(x, z):
+        matrix = np.kron(matrix, _PAULI_MATRICES[bits])
+    return matrix
+
+
+@lru_cache(maxsize=1000)
+def _stabilizer_generators(ket: Tuple[complex]) -> Tuple[Tuple[Tuple[int], Tuple[int], int]]:
+    """Function to find independent stabilizer generators of a ket.
+
+    Args:
+        ket (Tuple[complex]): 2^k coefficients.
+
+    Returns:
+        Tuple[Tuple[Tuple[int], Tuple[int], int]]: k generators, as X bits, Z bits and sign bit.
+    """
+
+    k = int(np.log2(len(ket)))
+    vector = np.array(ket, dtype=complex)
+    vector = vector / np.linalg.norm(vector)
+    generators = []
+    reduced = []  # (pivot, bits) of generators in echelon form
+
+    for bits in product((0, 1), repeat=2 * k):
+        if not any(bits):
+            continue
+        x, z = bits[:k], bits[k:]
+        image = _pauli_matrix(x, z) @ vector
+        if np.allclose(image, vector):
+            sign = 0
+        elif np.allclose(image, -vector):
+            sign = 1
+        else:
+            continue
+
+        # keep only independent operators
+        row = np.array(bits, dtype=bool)
+        for pivot, other in reduced:
+            if row[pivot]:
+                row ^= other
+        if row.any():
+            reduced.append((int(np.argmax(row)), row))
+            generators.append((x, z, sign))
+            if len(generators) == k:
+                return tuple(generators)
+
+    raise Exception("state {} is not a stabilizer state".format(ket))
+
+
+def _tableau_from_ket(ket: Tuple[complex]) -> _Tableau:
+    """Function to build the tableau of a stabilizer state given as a ket."""
+
+    key = tuple(complex(round(c.real, 12), round(c.imag, 12)) for c in np.asarray(ket, dtype=complex))
+    generators = _stabilizer_generators(key)
+    k = len(generators)
+    tableau = _Tableau(k)
+    for i, (x, z, sign) in enumerate(generators):
+        tableau.x[k + i], tableau.z[k + i], tableau.r[k + i] = x, z, sign
+
+    # destabilizers: solve <d_i, s_j> = delta_ij by elimination over GF(2)
+    matrix = np.concatenate((tableau.z[k:], tableau.x[k:], np.identity(k, dtype=bool)), axis=1)
+    pivots = []
+    row = 0
+    for col in range(2 * k):
+        candidates = np.flatnonzero(matrix[row:, col])
+        if len(candidates) == 0:
+            continue
+        pivot = row + candidates[0]
+        matrix[[row, pivot]] = matrix[[pivot, row]]
+        others = np.flatnonzero(matrix[:, col])
+        others = others[others != row]
+        matrix[others] ^= matrix[row]
+        pivots.append(col)
+        row += 1
+        if row == k:
+            break
+    destabilizers = np.zeros((k, 2 * k), dtype=bool)
+    for r, col in enumerate(pivots):
+        destabilizers[:, col] = matrix[r, 2 * k:]
+    tableau.x[:k], tableau.z[:k] = destabilizers[:, :k], destabilizers[:, k:]
+    tableau.r[:k] = False
+    return tableau
+
+
+@lru_cache(maxsize=1000)
+def _basis_operators(basis: Tuple[Tuple[complex]]) -> Tuple[Tuple, Tuple[Tuple[int]]]:
+    """Function to find commuting Pauli operators with the basis vectors as joint eigenvectors.
+
+    Returns:
+        Tuple[Tuple, Tuple[Tuple[int]]]: operators (X bits, Z bits) and, for each basis vector, its eigenvalue signs.
+    """
+
+    k = int(np.log2(len(basis)))
+    vectors = [np.array(v, dtype=complex) for v in basis]
+    operators = []
+    signs = []
+    reduced = []
+
+    for bits in product((0, 1), repeat=2 * k):
+        if not any(bits):
+            continue
+        x, z = bits[:k], bits[k:]
+        matrix = _pauli_matrix(x, z)
+        eigen = []
+        for v in vectors:
+            image = matrix @ v
+            if np.allclose(image, v):
+                eigen.append(0)
+            elif np.allclose(image, -v):
+                eigen.append(1)
+            else:
+                break
+        if len(eigen) != len(vectors):
+            continue
+
+        row = np.array(bits, dtype=bool)
+        for pivot, other in reduced:
+            if row[pivot]:
+                row ^= other
+        if row.any():
+            reduced.append((int(np.argmax(row)), row))
+            operators.append((x, z))
+            signs.append(eigen)
+            if len(operators) == k:
+                return tuple(operators), tuple(zip(*signs))
+
+    raise Exception("basis {} is not a Pauli basis".format(basis))
+
+
+class StabilizerState():
+    """Class to manage a quantum state as a stabilizer tableau.
+
+    Tracks the stabilizer tableau shared by a group of entangled states.
+    The order of `entangled_states` gives the order of qubits in the tableau (and in kets given to `set_state`).
+    Only stabilizer states may be set, only Pauli bases may be measured and only Clifford gates may be applied.
+
+    Attributes:
+        tableau (_Tableau): stabilizer tableau of the entangled group.
+        entangled_states (List[StabilizerState]): list of entangled states (including self).
+    """
+
+    def __init__(self):
+        self.tableau = _Tableau(1)
+        self.entangled_states = [self]
+
+    def entangle(self, another_state: "StabilizerState") -> None:
+        """Method to entangle two quantum states.
+
+        Args:
+            another_state (StabilizerState): state to entangle current state with.
+
+        Side Effects:
+            Modifies the `entangled_states` and `tableau` fields of all states in both groups.
+        """
+
+        entangled_states = self.entangled_states + another_state.entangled_states
+        tableau = _Tableau.merge(self.tableau, another_state.tableau)
+        StabilizerState._set_group(entangled_states, tableau)
+
+    def set_state(self, state: Tuple[complex]) -> None:
+        """Method to change the state of the entangled group.
+
+        Args:
+            state (Tuple[complex]): ket of a stabilizer state, of length 2^n for n entangled states.
+        """
+
+        assert len(state) == 2 ** len(self.entangled_states)
+        StabilizerState._set_group(self.entangled_states, _tableau_from_ket(state))
+
+    def set_state_single(self, state: Tuple[complex], rng=None) -> None:
+        """Method to unentangle and set the state of a single quantum state object.
+
+        The state is first measured (in the Z basis) to separate it from the rest of its group.
+
+        Args:
+            state (Tuple[complex]): ket of a single qubit stabilizer state.
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+        """
+
+        self._detach(np.array([False]), np.array([True]), rng)
+        self.tableau = _tableau_from_ket(state)
+
+    def random_noise(self, rng=None) -> None:
+        """Method to add random noise to a single state.
+
+        Sets the state to one of the real single qubit stabilizer states, chosen at random.
+        """
+
+        rand = random_sample() if rng is None else rng.random()
+        self.set_state_single(_REAL_STATES[int(rand * len(_REAL_STATES))], rng)
+
+    def apply_gate(self, gate) -> None:
+        """Method to apply a single qubit Clifford gate to the current state.
+
+        Args:
+            gate (Union[str, np.ndarray]): gate name ("I", "X", "Y", "Z", "H", "S" or "Sdg") or 2x2 unitary.
+                Any of the 24 single qubit Clifford gates is accepted as a unitary (up to a global phase).
+        """
+
+        updates = _gate_updates(gate if isinstance(gate, str) else tuple(map(tuple, np.asarray(gate, dtype=complex))))
+        index = self.entangled_states.index(self)
+        for update in updates:
+            self.tableau.apply(update, index)
+
+    def cnot(self, target: "StabilizerState") -> None:
+        """Method to apply a CNOT gate with the current state as control.
+
+        Args:
+            target (StabilizerState): target state (entangled with the current state if needed).
+        """
+
+        if target not in self.entangled_states:
+            self.entangle(target)
+        group = self.entangled_states
+        self.tableau.apply_cnot(group.index(self), group.index(target))
+
+    def apply_channel(self, channel: str, param: float, rng=None) -> None:
+        """Method to apply a Pauli noise channel to the current state.
+
+        Channels are sampled: a random Pauli error is applied with the probability given by the channel.
+
+        Args:
+            channel (str): name of the channel, "depolarizing" or "dephasing" (see `density_matrix` module).
+            param (float): parameter of the channel.
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+        """
+
+        rand = random_sample() if rng is None else rng.random()
+        if channel == "depolarizing":
+            if rand < 3 * param / 4:
+                self.apply_gate("XYZ"[int(4 * rand / param)])
+        elif channel == "dephasing":
+            if rand < param:
+                self.apply_gate("Z")
+        else:
+            raise Exception("channel {} is not a Pauli channel".format(channel))
+
+    def fidelity(self, target: Tuple[complex], states=None) -> float:
+        """Method to compute the fidelity of states with a pure target stabilizer state.
+
+        Args:
+            target (Tuple[complex]): target ket (must be a stabilizer state).
+            states (List[StabilizerState]): entangled states corresponding to the qubits of the target, in order (default None for [self]).
+
+        Returns:
+            float: fidelity <target|rho|target> of the reduced state of `states`.
+        """
+
+        if states is None:
+            states = [self]
+        group = self.entangled_states
+        for state in states:
+            assert state in group, "states must be entangled"
+        indices = [group.index(s) for s in states]
+        target_tableau = _tableau_from_ket(target)
+        k = len(states)
+
+        # <target|rho|target> = average over the target stabilizer group of sign * <P>
+        total = 0
+        for subset in product((False, True), repeat=k):
+            rows = k + np.flatnonzero(subset)
+            x = np.bitwise_xor.reduce(target_tableau.x[rows], axis=0) if len(rows) else np.zeros(k, dtype=bool)
+            z = np.bitwise_xor.reduce(target_tableau.z[rows], axis=0) if len(rows) else np.zeros(k, dtype=bool)
+            sign = 1 - 2 * target_tableau.product_sign(rows)
+            px = np.zeros(len(group), dtype=bool)
+            pz = np.zeros(len(group), dtype=bool)
+            px[indices], pz[indices] = x, z
+            total += sign * self.tableau.expectation(px, pz)
+        return total / 2 ** k
+
+    def measure(self, basis: Tuple[Tuple[complex]], rng=None) -> int:
+        """Method to measure a single quantum state in a Pauli basis.
+
+        After measurement the state is unentangled from the rest of its group.
+
+        Args:
+            basis (Tuple[Tuple[complex]]): measurement basis, given as list of states (that are themselves lists of complex coefficients).
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+
+        Returns:
+            int: 0/1 measurement result, corresponding to one basis vector.
+        """
+
+        operators, signs = _basis_operators(tuple(map(tuple, basis)))
+        x, z = operators[0]
+        result = self._detach(np.array(x, dtype=bool), np.array(z, dtype=bool), rng)
+        return signs.index((result,))
+
+    @staticmethod
+    def measure_multiple(basis, states, rng=None) -> int:
+        """Method to measure multiple qubits in a basis of joint eigenvectors of Pauli operators.
+
+        May be used for bell state measurement.
+        After measurement the measured states are in the measured basis vector.
+
+        Args:
+            basis (List[List[complex]]): list of basis vectors.
+            states (List[StabilizerState]): list of quantum state objects to measure (must be entangled).
+            rng (RandomStream): random number stream to draw from (default None for the numpy global random state).
+
+        Returns:
+            int: measurement result in given basis.
+        """
+
+        for state in states[1:]:
+            assert state in states[0].entangled_states
+        group = states[0].entangled_states
+        tableau = states[0].tableau
+        indices = [group.index(s) for s in states]
+
+        operators, signs = _basis_operators(tuple(map(tuple, basis)))
+        results = []
+        for x, z in operators:
+            px = np.zeros(len(group), dtype=bool)
+            pz = np.zeros(len(group), dtype=bool)
+            px[indices], pz[indices] = x, z
+            rand = random_sample() if rng is None else rng.random()
+            results.append(tableau.measure(px, pz, rand)[0])
+        return signs.index(tuple(results))
+
+    def _detach(self, x: np.ndarray, z: np.ndarray, rng) -> int:
+        """Method to measure a single qubit Pauli operator and split the current state from its group."""
+
+        group = self.entangled_states
+        index = group.index(self)
+        px = np.zeros(len(group), dtype=bool)
+        pz = np.zeros(len(group), dtype=bool)
+        px[index], pz[index] = x[0], z[0]
+        rand = random_sample() if rng is None else rng.random()
+        result, row = self.tableau.measure(px, pz, rand)
+
+        if len(group) > 1:
+            rest, single = self.tableau.remove(index, row)
+            StabilizerState._set_group([s for s in group if s is not self], rest)
+            self.tableau = single
+            self.entangled_states = [self]
+        return result
+
+    @staticmethod
+    def _set_group(states: List["StabilizerState"], tableau: _Tableau) -> None:
+        states = list(states)
+        for state in states:
+            state.entangled_states = states
+            state.tableau = tableau
+
+
+@lru_cache(maxsize=100)
+def _gate_updates(gate) -> Tuple[str]:
+    """Function to get the tableau updates of a single qubit Clifford gate, given by name or matrix."""
+
+    for name, matrix, updates in _GATES:
+        if gate == name:
+            return updates
+        if not isinstance(gate, str) and _equal_up_to_phase(gate, matrix):
+            return updates
+    raise Exception("gate {} is not a supported Clifford gate".format(gate))
@@ -0,0 +1,206 @@
+"""Definition of the StateTable class.
+
+This module defines the StateTable class, used by the QuantumState class to intern quantum states and cache measurement outcomes.
+States are rounded to a tolerance and mapped to small integer IDs, so that states differing only by floating point drift share an ID.
+Measurement outcomes are cached under keys of integer IDs, rather than tuples of complex coefficients.
+"""
+
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Dict, Hashable, Tuple
+
+# state IDs are unique across tables, so that IDs kept from a replaced table are never found in a new one
+_state_ids = count()
+# basis IDs are never reused either, so that outcomes cached for an evicted basis are never found for another basis
+_basis_ids = count()
+
+
+class StateTable():
+    """Class interning quantum states and caching measurement outcomes.
+
+    States are kets given as tuples of complex coefficients.
+    Each interned state has an integer ID; IDs are never reused, so that an ID kept by a state object stays valid until evicted.
+    Both the states and the outcomes tables hold at most `max_size` entries, and evict entries by the `eviction` policy.
+    At most `max_size` measurement bases are also held, evicted first in, first out.
+
+    Attributes:
+        tolerance (float): coefficients are rounded to multiples of `tolerance` before comparison.
+        max_size (int): maximum number of states and of outcomes held (None for unbounded).
+        eviction (str): eviction policy, "lru" (least recently used) or "fifo" (first in, first out).
+        hits (int): number of outcome lookups found in the table.
+        misses (int): number of outcome lookups computed.
+        evictions (int): number of entries evicted.
+    """
+
+    MAX_ALIASES = 16  # exact coefficients remembered for each state
+
+    def __init__(self, tolerance=1e-9, max_size=10000, eviction="lru"):
+        """Constructor for state table class.
+
+        Args:
+            tolerance (float): coefficients are rounded to multiples of `tolerance` before comparison (default 1e-9).
+            max_size (int): maximum number of states and of outcomes held (default 10000, None for unbounded).
+            eviction (str): eviction policy, "lru" or "fifo" (default "lru").
+        """
+
+        if eviction not in ("lru", "fifo"):
+            raise Exception("invalid eviction policy {}".format(eviction))
+        self.tolerance = tolerance
+        self.max_size = max_size
+        self.eviction = eviction
+        self._lru = eviction == "lru"
+        self._basis_objects = {}  # id of basis object -> (basis, basis ID)
+        self._bases = OrderedDict()  # basis tuple -> basis ID
+        self.clear()
+
+    def clear(self) -> None:
+        """Method to remove all states and outcomes, and reset counters."""
+
+        self._ids = {}  # rounded coefficients -> state ID
+        self._exact = {}  # coefficients -> state ID
+        self._states = OrderedDict()  # state ID -> (state, rounded coefficients, list of coefficients in _exact)
+        self._outcomes = OrderedDict()  # key -> outcome
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, state_id: int) -> bool:
+        return state_id in self._states
+
+    def intern(self, state: Tuple[complex]) -> int:
+        """Method to get the ID of a state.
+
+        Args:
+            state (Tuple[complex]): ket coefficients.
+
+        Returns:
+            int: ID of the state (or of a previously interned state equal within tolerance).
+        """
+
+        # exact coefficients are looked up first, rounding is only needed for new coefficients
+        try:
+            state_id = self._exact.get(state)
+        except TypeError:  # unhashable coefficients (list or array)
+            state = tuple(state)
+            state_id = self._exact.get(state)
+        if state_id is None:
+            state = tuple(state)
+            scale = 1 / self.tolerance
+            key = tuple((round(c.real * scale), round(c.imag * scale)) for c in map(complex, state))
+            state_id = self._ids.get(key)
+            if state_id is None:
+                state_id = next(_state_ids)
+                self._ids[key] = state_id
+                self._states[state_id] = (state, key, [])
+                if self.max_size is not None and len(self._states) > self.max_size:
+                    self._evict_state()
+            aliases = self._states[state_id][2]
+            if len(aliases) < self.MAX_ALIASES:
+                self._exact[state] = state_id
+                aliases.append(state)
+
+        if self._lru:
+            self._states.move_to_end(state_id)
+        return state_id
+
+    def _evict_state(self) -> None:
+        _, (_, key, aliases) = self._states.popitem(last=False)
+        del self._ids[key]
+        for alias in aliases:
+            del self._exact[alias]
+        self.evictions += 1
+
+    def get_state(self, state_id: int) -> Tuple[complex]:
+        """Method to get the (canonical) coefficients of an interned state.
+
+        Args:
+            state_id (int): ID of the state.
+
+        Returns:
+            Tuple[complex]: coefficients of the first state interned with the ID.
+        """
+
+        return self._states[state_id][0]
+
+    def basis_id(self, basis) -> int:
+        """Method to get the ID of a measurement basis.
+
+        Bases are identified by object first, so that constant bases (such as those of the encoding module) are not hashed again.
+        A basis evicted from the table gets a new ID when used again.
+
+        Args:
+            basis (Tuple[Tuple[complex]]): basis vectors.
+
+        Returns:
+            int: ID of the basis.
+        """
+
+        entry = self._basis_objects.get(id(basis))
+        if entry is not None and entry[0] is basis:
+            return entry[1]
+        key = tuple(tuple(vector) for vector in basis)
+        basis_id = self._bases.get(key)
+        if basis_id is None:
+            basis_id = self._bases[key] = next(_basis_ids)
+            if self.max_size is not None and len(self._bases) > self.max_size:
+                self._bases.popitem(last=False)
+        if self.max_size is not None and len(self._basis_objects) >= self.max_size:
+            self._basis_objects.clear()
+        self._basis_objects[id(basis)] = (basis, basis_id)
+        return basis_id
+
+    def lookup(self, key: Hashable) -> Any:
+        """Method to get a cached outcome.
+
+        Args:
+            key (Hashable): key of the outcome (a tuple of IDs and integer parameters).
+
+        Returns:
+            Any: the outcome (None if not in the table, in which case it should be computed and added with `store`).
+        """
+
+        outcome = self._outcomes.get(key)
+        if outcome is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            if self._lru:
+                self._outcomes.move_to_end(key)
+        return outcome
+
+    def store(self, key: Hashable, outcome: Any) -> Any:
+        """Method to add a computed outcome.
+
+        Args:
+            key (Hashable): key of the outcome.
+            outcome (Any): the outcome (must not be None).
+
+        Returns:
+            Any: the outcome.
+        """
+
+        outcomes = self._outcomes
+        outcomes[key] = outcome
+        if self.max_size is not None and len(outcomes) > self.max_size:
+            outcomes.popitem(last=False)
+            self.evictions += 1
+        return outcome
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Method to get table statistics.
+
+        Returns:
+            Dict[str, Any]: mapping of statistic name to value, with keys "states", "outcomes", "hits", "misses",
+                "hit_rate" (0 if no lookups) and "evictions".
+        """
+
+        lookups = self.hits + self.misses
+        return {"states": len(self._states),
+                "outcomes": len(self._outcomes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions}
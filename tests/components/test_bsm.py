@@ -1,4 +1,5 @@
 import pytest
+from numpy import random
 from sequence.components.bsm import *
 from sequence.components.memory import *
 from sequence.kernel.timeline import Timeline
@@ -44,7 +45,7 @@ def test_init():
     bsm = make_bsm("bsm", tl, encoding_type="time_bin", detectors=detectors)
     tl.init()
 
-    assert len(tl.events) == len(detectors) * 2
+    assert len(tl.events) == len(detectors)
 
 def test_base_get():
     tl = Timeline()
@@ -245,3 +246,22 @@ def test_single_atom_get():
     assert len(mem_1.qstate.state) == 4
 
 
+
+def test_random_stream():
+    # results depend on the timeline seed only, and not on the numpy global random state
+    def run(global_seed):
+        tl = Timeline()
+        tl.seed(1)
+        random.seed(global_seed)
+        bsm = make_bsm("bsm", tl, encoding_type="polarization", detectors=[{"efficiency": 1}] * 4)
+        parent = Parent()
+        bsm.attach(parent)
+        for i in range(20):
+            tl.time = i * 1e6
+            bsm.get(Photon("", location=1, quantum_state=(complex(1), complex(0))))
+            bsm.get(Photon("", location=2, quantum_state=(complex(0), complex(1))))
+        return parent.results
+
+    results = run(0)
+    assert len(results) == 20 and len(set(results)) == 2
+    assert run(1) == results
@@ -1,10 +1,13 @@
+import numpy as np
+from numpy import random
+
 from sequence.components.detector import *
 from sequence.components.photon import Photon
 from sequence.kernel.timeline import Timeline
 from sequence.utils.encoding import polarization, time_bin
 
 
-def create_detector(efficiency=0.9, dark_count=0, count_rate=25e6, time_resolution=150):
+def create_detector(efficiency=0.9, dark_count=0, count_rate=25e6, time_resolution=150, lazy_dark_count=False):
     class Parent():
         def __init__(self, tl):
             self.timeline = tl
@@ -16,7 +19,7 @@ def create_detector(efficiency=0.9, dark_count=0, count_rate=25e6, time_resoluti
     tl = Timeline()
     tl.seed(1)
     detector = Detector("", tl, efficiency=efficiency, dark_count=dark_count,
-                        count_rate=count_rate, time_resolution=time_resolution)
+                        count_rate=count_rate, time_resolution=time_resolution, lazy_dark_count=lazy_dark_count)
     parent = Parent(tl)
     detector.attach(parent)
     return detector, parent, tl
@@ -82,6 +85,88 @@ def test_Detector_dark_count():
     assert ratio - 1 < 0.1
 
 
+def ks_statistic(sample1, sample2):
+    # two sample Kolmogorov-Smirnov statistic
+    sample1, sample2 = np.sort(sample1), np.sort(sample2)
+    values = np.concatenate((sample1, sample2))
+    cdf1 = np.searchsorted(sample1, values, side="right") / len(sample1)
+    cdf2 = np.searchsorted(sample2, values, side="right") / len(sample2)
+    return np.max(np.abs(cdf1 - cdf2))
+
+
+def test_Detector_lazy_dark_count():
+    time = int(1e11)
+    dark_count = 1e5
+    window = int(5e7)  # 5 dark counts on average
+
+    detector, parent, tl = create_detector(dark_count=dark_count)
+    tl.init()
+    tl.stop_time = time
+    tl.run()
+    event_times = np.array([log[1] for log in parent.log])
+
+    detector, parent, tl = create_detector(dark_count=dark_count, lazy_dark_count=True)
+    tl.init()
+    # idle detector schedules no events
+    assert len(tl.events) == 0
+    tl.time = time
+    detector.flush_dark_counts(time - 1)
+    lazy_times = np.array([log[1] for log in parent.log])
+    assert all(log[1] < time for log in parent.log)
+    assert detector.photon_counter >= len(lazy_times)  # some dark counts fall in the dead time
+
+    # times between dark counts and counts in windows follow the same distributions
+    n, m = len(event_times), len(lazy_times)
+    critical = 1.95 * np.sqrt((n + m) / (n * m))  # 0.1% significance
+    assert ks_statistic(np.diff(event_times), np.diff(lazy_times)) < critical
+    bins = np.arange(0, time + 1, window)
+    event_counts = np.histogram(event_times, bins)[0]
+    lazy_counts = np.histogram(lazy_times, bins)[0]
+    assert ks_statistic(event_counts, lazy_counts) < 1.95 * np.sqrt(2 / len(bins))
+
+    # dark counts are processed before later photons
+    detector, parent, tl = create_detector(efficiency=1, dark_count=dark_count, lazy_dark_count=True)
+    tl.init()
+    dark_time = int(detector._dark_times[0])
+    tl.time = dark_time + 100000  # after the dead time
+    detector.get()
+    assert [log[1] for log in parent.log] == [round(dark_time / 150) * 150, round(tl.time / 150) * 150]
+
+
+def test_TimeBuffer():
+    buffer = TimeBuffer(capacity=4)
+    for t in range(10):
+        buffer.append(t)
+    assert len(buffer) == 10 and buffer[-1] == 9
+    view = buffer.view()
+    assert view.dtype == np.int64 and list(view) == list(range(10))
+    # views share memory with the buffer
+    assert np.shares_memory(view, buffer.view())
+
+    # bounded buffers keep the latest times
+    buffer = TimeBuffer(max_size=3)
+    for t in range(10):
+        buffer.append(t)
+        assert list(buffer) == list(range(max(0, t - 2), t + 1))
+    assert len(buffer._times) == 6
+
+
+def test_QSDetector_max_trigger_times():
+    tl = Timeline()
+    tl.seed(1)
+    qsdetector = QSDetectorPolarization("qsd", tl, max_trigger_times=5)
+    for t in range(20):
+        qsdetector.trigger(qsdetector.detectors[t % 2], {'time': t})
+    times = qsdetector.get_photon_times()
+    assert list(times[0]) == [10, 12, 14, 16, 18]
+    assert list(times[1]) == [11, 13, 15, 17, 19]
+
+    # later detections do not change returned times
+    qsdetector.trigger(qsdetector.detectors[0], {'time': 20})
+    assert list(times[0]) == [10, 12, 14, 16, 18]
+    assert list(qsdetector.get_photon_times()[0]) == [20]
+
+
 def test_QSDetectorPolarization_init():
     tl = Timeline()
     tl.seed(1)
@@ -89,6 +174,22 @@ def test_QSDetectorPolarization_init():
     tl.init()
 
 
+def test_QSDetector_dark_count():
+    tl = Timeline()
+    tl.seed(1)
+    qsdetector = QSDetectorPolarization("qsd", tl)
+    qsdetector.update_detector_params(0, "dark_count", 1e4)
+    tl.init()
+    assert len(tl.events) == 0
+
+    # dark counts are recorded when the photon times are read
+    tl.time = int(1e12)
+    times = qsdetector.get_photon_times()
+    assert abs(len(times[0]) - 1e4) < 500 and len(times[1]) == 0
+    assert all(np.diff(times[0]) >= 0)
+    assert [len(times) for times in qsdetector.get_photon_times()] == [0, 0]
+
+
 def test_QSDetectorPolarization_set_basis_list():
     tl = Timeline()
     tl.seed(1)
@@ -151,9 +252,9 @@ def test_QSDetectorPolarization():
         qsdetector.get(photon)
 
     trigger_times = qsdetector.get_photon_times()
-    length = len(trigger_times[0] + trigger_times[1])
+    length = len(trigger_times[0]) + len(trigger_times[1])
     assert length == 1000
-    assert qsdetector.get_photon_times() == [[], []]
+    assert [len(times) for times in qsdetector.get_photon_times()] == [0, 0]
 
 
 def test_QSDetectorTimeBin():
@@ -177,5 +278,28 @@ def test_QSDetectorTimeBin():
     tl.run()
 
     trigger_times = qsdetector.get_photon_times()
-    length = len(trigger_times[0] + trigger_times[1] + trigger_times[2])
+    length = len(trigger_times[0]) + len(trigger_times[1]) + len(trigger_times[2])
     assert abs(length / 1000 - 7 / 8) < 0.1
+
+
+def test_QSDetectorPolarization_get_batch():
+    tl = Timeline()
+    tl.seed(1)
+    qsdetector = QSDetectorPolarization("qsd", tl)
+    qsdetector.update_detector_params(0, "efficiency", 1)
+    qsdetector.update_detector_params(1, "efficiency", 1)
+    qsdetector.update_detector_params(0, "time_resolution", 1)
+    qsdetector.update_detector_params(1, "time_resolution", 1)
+    frequency = 1e5
+    basis_list = [random.randint(2) for _ in range(1000)]
+    qsdetector.set_basis_list(basis_list, 0, frequency)
+
+    bits = random.randint(2, size=1000)
+    times = np.arange(1000, dtype=np.int64) * int(1e12 / frequency)
+    states = np.array([polarization["bases"][basis][bit] for basis, bit in zip(basis_list, bits)], dtype=complex)
+    tl.time = int(times[-1])
+    qsdetector.get_batch(times, states)
+
+    trigger_times = qsdetector.get_photon_times()
+    assert np.array_equal(trigger_times[0], times[bits == 0])
+    assert np.array_equal(trigger_times[1], times[bits == 1])
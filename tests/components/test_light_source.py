@@ -1,6 +1,7 @@
 from numpy import random
 from sequence.components.light_source import LightSource
 from sequence.components.optical_channel import QuantumChannel
+from sequence.kernel.entity import Entity
 from sequence.kernel.timeline import Timeline
 from sequence.topology.node import Node
 from sequence.utils.encoding import polarization
@@ -51,3 +52,51 @@ def test_light_source():
         assert state_list[index] == qubit.quantum_state.state
         assert time == index * (1e12 / FREQ) + qc.delay
         assert src == "sender"
+
+
+def test_emit_batch():
+    tl = Timeline()
+    ls = LightSource("ls", tl, frequency=1e8, mean_photon_num=0.5, bandwidth=0.1, phase_error=1)
+    FakeNode("sender", tl, ls)
+    state_list = [polarization["bases"][1][0]] * 10000
+    batch = ls._emit_batch(state_list)
+
+    assert abs(len(batch) / len(state_list) - 0.5) < 0.05
+    assert all(batch.times == batch.pulses * 10000)
+    assert all(batch.times[1:] >= batch.times[:-1])
+    # phase errors flip the sign of the second coefficient
+    plus = polarization["bases"][1][0]
+    assert batch.get_photon(0).quantum_state.state == (plus[0], -plus[1])
+    assert abs(batch.wavelengths.mean() - 1550) < 0.01
+    assert abs(batch.wavelengths.std() - 0.1) < 0.01
+
+
+def test_emit_without_batch():
+    # owners without send_qubit_batch get photons one at a time at their emission times
+    class Sender(Entity):
+        def __init__(self, name, tl, ls):
+            Entity.__init__(self, name, tl)
+            ls.owner = self
+            self.log = []
+
+        def init(self):
+            pass
+
+        def send_qubit(self, dst, qubit):
+            self.log.append((self.timeline.now(), dst, qubit))
+
+    tl = Timeline()
+    tl.seed(0)
+    ls = LightSource("ls", tl, frequency=1e8, mean_photon_num=0.5)
+    sender = Sender("sender", tl, ls)
+    state_list = [polarization["bases"][0][0]] * 100
+
+    tl.init()
+    ls.emit(state_list, "receiver")
+    tl.run()
+
+    assert len(sender.log) == ls.photon_counter > 0
+    for time, dst, qubit in sender.log:
+        assert time == int(qubit.name) * 10000
+        assert dst == "receiver"
+        assert qubit.quantum_state.state == polarization["bases"][0][0]
@@ -1,5 +1,8 @@
+from math import sqrt
 from typing import Dict
 
+import pytest
+
 from sequence.components.memory import Memory, MemoryArray
 from sequence.kernel.event import Event
 from sequence.kernel.process import Process
@@ -122,6 +125,66 @@ def test_Memory_flip_state():
     assert not rec.photon_list[1].is_null
 
 
+def test_Memory_formalism():
+    tl = Timeline()
+    rec = DumbReceiver()
+    mem = Memory("mem", tl, fidelity=1, frequency=0, efficiency=1, coherence_time=-1, wavelength=500,
+                 formalism="density")
+    other = Memory("other", tl, fidelity=1, frequency=0, efficiency=1, coherence_time=-1, wavelength=500,
+                   formalism="density")
+    mem.owner = rec
+
+    mem.excite()
+    mem.flip_state()
+    mem.excite()
+    assert rec.photon_list[0].is_null
+    assert not rec.photon_list[1].is_null
+
+    # bell pair fidelity is computed from the state, against the heralded bell state
+    mem.qstate.entangle(other.qstate)
+    mem.qstate.set_state((0, sqrt(1 / 2), -sqrt(1 / 2), 0))
+    assert mem.get_bell_fidelity() == 0
+    mem.bell_state = other.bell_state = "psi-"
+    assert abs(mem.get_bell_fidelity() - 1) < 1e-9
+    mem.apply_noise("dephasing", 0.1)
+    assert abs(other.get_bell_fidelity() - 0.9) < 1e-9
+    assert abs(other.fidelity - 0.9) < 1e-9
+    other.bell_state = "psi+"
+    assert abs(other.fidelity - 0.1) < 1e-9
+
+    # reset traces out the memory, leaving the other memory mixed
+    mem.reset()
+    assert mem.get_bell_fidelity() == 0
+    assert len(other.qstate.entangled_states) == 1
+    assert abs(other.qstate.fidelity((1, 0)) - 0.5) < 1e-9
+
+    # stabilizer formalism
+    mem = Memory("stabilizer_mem", tl, fidelity=1, frequency=0, efficiency=1, coherence_time=-1, wavelength=500,
+                 formalism="stabilizer")
+    other = Memory("stabilizer_other", tl, fidelity=1, frequency=0, efficiency=1, coherence_time=-1, wavelength=500,
+                   formalism="stabilizer")
+    mem.qstate.entangle(other.qstate)
+    mem.qstate.set_state((0, sqrt(1 / 2), sqrt(1 / 2), 0))
+    mem.bell_state = other.bell_state = "psi+"
+    mem.entangled_memory = {"node_id": None, "memo_id": "stabilizer_other"}
+    other.entangled_memory = {"node_id": None, "memo_id": "stabilizer_mem"}
+    mem.fidelity = other.fidelity = 1
+    assert abs(mem.get_bell_fidelity() - 1) < 1e-9
+    mem.flip_state()
+    assert abs(other.get_bell_fidelity()) < 1e-9
+    # sampled errors leave the expected fidelity of both memories
+    mem.apply_noise("dephasing", 1)
+    assert mem.fidelity == other.fidelity == 0
+    mem.reset()
+    assert len(other.qstate.entangled_states) == 1
+
+    ket_mem = Memory("ket", tl, fidelity=1, frequency=0, efficiency=1, coherence_time=-1, wavelength=500)
+    with pytest.raises(Exception):
+        ket_mem.apply_noise("dephasing", 0.1)
+    with pytest.raises(Exception):
+        Memory("", tl, fidelity=1, frequency=0, efficiency=1, coherence_time=-1, wavelength=500, formalism="invalid")
+
+
 def test_Memory_expire():
     class FakeProtocol(EntanglementProtocol):
         def __init__(self, name):
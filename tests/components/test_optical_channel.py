@@ -118,6 +118,53 @@ def test_QuantumChannel_transmit():
     assert abs(len(receiver.log) / 1000 - expect_rate) < 0.1
 
 
+def test_QuantumChannel_transmit_batch():
+    import numpy as np
+    from sequence.components.photon import PhotonBatch
+    from sequence.utils.encoding import polarization, time_bin
+
+    class FakeNode(Node):
+        def __init__(self, name, tl):
+            Node.__init__(self, name, tl)
+            self.log = []
+
+        def receive_qubit(self, src, photon):
+            self.log.append((src, self.timeline.now(), photon))
+
+    tl = Timeline()
+    qc = QuantumChannel("qc", tl, attenuation=0.0002, distance=1e4, polarization_fidelity=0.5)
+    sender = FakeNode("sender", tl)
+    receiver = FakeNode("receiver", tl)
+    qc.set_ends(sender, receiver)
+    tl.init()
+
+    num = 10000
+    states = np.zeros((num, 2), dtype=complex)
+    states[:, 0] = 1
+    batch = PhotonBatch(np.arange(num) * 10, states, np.full(num, 1550.0), np.arange(num))
+    qc.transmit_batch(batch, sender)
+    # one arrival event for the whole batch
+    assert len(tl.events) == 1
+    tl.run()
+
+    assert len(sender.log) == 0
+    assert abs(len(receiver.log) / num - (1 - qc.loss)) < 0.02
+    noisy = 0
+    for src, time, photon in receiver.log:
+        assert src == "sender"
+        assert time == int(photon.name) * 10 + qc.delay
+        noisy += photon.quantum_state.state != (complex(1), complex(0))
+    assert abs(noisy / len(receiver.log) - 0.5) < 0.05
+
+    # no polarization noise for other encodings
+    receiver.log = []
+    batch = PhotonBatch(tl.now() + np.arange(num) * 10, states, np.full(num, 1550.0), np.arange(num),
+                        encoding_type=time_bin)
+    qc.transmit_batch(batch, sender)
+    tl.run()
+    assert all(photon.quantum_state.state == (complex(1), complex(0)) for _, _, photon in receiver.log)
+
+
 def test_QuantumChannel_schedule_transmit():
     tl = Timeline()
     qc = QuantumChannel("qc", tl, attenuation=0, distance=1e3, frequency=1e12)
@@ -139,3 +186,66 @@ def test_QuantumChannel_schedule_transmit():
     tl.time = 2
     time = qc.schedule_transmit(0)
     assert time == 3
+
+
+def test_SlotAllocator():
+    slots = SlotAllocator()
+    assert slots.first() is None
+    assert [slots.allocate(0) for _ in range(3)] == [0, 1, 2]
+    assert slots.allocate(5) == 5
+    assert slots.allocate(1) == 3
+    assert slots.allocate(0) == 4  # joins the two runs
+    assert slots._starts == [0] and slots._ends == [6]
+    assert len(slots) == 6
+
+    assert slots.release(2)
+    assert not slots.release(2)
+    assert 2 not in slots and 1 in slots and 3 in slots
+    assert slots.allocate(0) == 2
+
+    assert slots.release_before(4) == 4
+    assert slots.first() == 4 and len(slots) == 2
+    assert slots.release_before(10) == 2
+    assert len(slots) == 0 and slots.first() is None
+
+    # compare with a set of slots
+    random.seed(0)
+    reserved = set()
+    for _ in range(2000):
+        slot = random.randint(100)
+        if random.random_sample() < 0.6:
+            expected = slot
+            while expected in reserved:
+                expected += 1
+            assert slots.allocate(slot) == expected
+            reserved.add(expected)
+        else:
+            assert slots.release(slot) == (slot in reserved)
+            reserved.discard(slot)
+        assert len(slots) == len(reserved)
+    assert all(slot in slots for slot in reserved)
+
+
+def test_QuantumChannel_slot_stats():
+    from sequence.components.photon import Photon
+
+    tl = Timeline()
+    qc = QuantumChannel("qc", tl, attenuation=0, distance=1e3, frequency=1e12)
+    sender = Node("sender", tl)
+    receiver = Node("receiver", tl)
+    qc.set_ends(sender, receiver)
+    tl.init()
+
+    for _ in range(4):
+        qc.schedule_transmit(0)
+    tl.time = 1
+    qc.transmit(Photon("0"), sender)
+    tl.time = 3
+    qc.transmit(Photon("1"), sender)
+
+    stats = qc.get_slot_stats()
+    assert stats["transmitted"] == 2 and stats["expired"] == 2 and stats["reserved"] == 0
+    assert stats["utilization"] == 0.5
+
+    # expired windows are freed for later reservations
+    assert qc.schedule_transmit(0) == 3
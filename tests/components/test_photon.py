@@ -1,7 +1,9 @@
+from math import sqrt
+
 import numpy
 import pytest
 
-from sequence.components.photon import Photon
+from sequence.components.photon import Photon, PhotonBatch
 
 
 numpy.random.seed(0)
@@ -54,3 +56,37 @@ def test_measure_multiple():
              (complex(0), complex(0), complex(0), complex(1)))
 
     assert Photon.measure_multiple(basis, [photon1, photon2]) == 0
+
+
+def test_stabilizer():
+    photon1 = Photon("p1", quantum_state=(complex(1), complex(0)), formalism="stabilizer")
+    photon2 = Photon("p2", quantum_state=(complex(0), complex(1)), formalism="stabilizer")
+    photon1.entangle(photon2)
+    bell_basis = ((complex(sqrt(1 / 2)), complex(0), complex(0), complex(sqrt(1 / 2))),
+                  (complex(sqrt(1 / 2)), complex(0), complex(0), -complex(sqrt(1 / 2))),
+                  (complex(0), complex(sqrt(1 / 2)), complex(sqrt(1 / 2)), complex(0)),
+                  (complex(0), complex(sqrt(1 / 2)), -complex(sqrt(1 / 2)), complex(0)))
+    assert Photon.measure_multiple(bell_basis, [photon1, photon2]) in (2, 3)
+
+    photon = Photon("", quantum_state=(complex(sqrt(1 / 2)), complex(sqrt(1 / 2))), formalism="stabilizer")
+    assert Photon.measure(((complex(sqrt(1 / 2)), complex(sqrt(1 / 2))),
+                           (complex(-sqrt(1 / 2)), complex(sqrt(1 / 2)))), photon) == 0
+
+    with pytest.raises(Exception):
+        Photon("", formalism="invalid")
+
+
+def test_photon_batch():
+    states = numpy.array([[1, 0], [0, 1], [sqrt(1 / 2), sqrt(1 / 2)]], dtype=complex)
+    batch = PhotonBatch(numpy.array([0, 10, 20]), states, numpy.array([1550.0, 1551.0, 1552.0]), numpy.array([0, 1, 3]))
+    assert len(batch) == 3
+
+    photon = batch.get_photon(2)
+    assert photon.name == "3"
+    assert photon.wavelength == 1552.0
+    assert photon.quantum_state.state == (complex(sqrt(1 / 2)), complex(sqrt(1 / 2)))
+
+    selected = batch.select(numpy.array([True, False, True]))
+    assert len(selected) == 2
+    assert list(selected.times) == [0, 20]
+    assert selected.get_photon(0).name == "0"
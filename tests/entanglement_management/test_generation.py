@@ -1,3 +1,5 @@
+from numpy import random
+
 from sequence.components.bsm import *
 from sequence.components.memory import MemoryArray
 from sequence.components.optical_channel import *
@@ -9,9 +11,11 @@ from sequence.topology.node import Node
 class ResourceManager():
     def __init__(self):
         self.log = []
+        self.fidelities = {}
 
     def update(self, protocol, memory, state):
         self.log.append((memory, state))
+        self.fidelities[memory.name] = memory.fidelity
 
 
 class FakeNode(Node):
@@ -204,3 +208,138 @@ def test_generation_run():
     assert abs(ratio - 0.5) < 0.1
     
 
+
+def test_generation_fidelity_density():
+    random.seed(1)
+    NUM_TESTS = 50
+
+    tl = Timeline()
+
+    e0 = FakeNode("e0", tl)
+    m0 = FakeNode("m0", tl)
+    e1 = FakeNode("e1", tl)
+
+    cc = ClassicalChannel("cc_e0m0", tl, 1e3)
+    cc.set_ends(e0, m0)
+    cc = ClassicalChannel("cc_e1m0", tl, 1e3)
+    cc.set_ends(e1, m0)
+    cc = ClassicalChannel("cc_e0e1", tl, 1e3)
+    cc.set_ends(e0, e1)
+    qc = QuantumChannel("qc_e0m0", tl, 0, 1e3)
+    qc.set_ends(e0, m0)
+    qc = QuantumChannel("qc_e1m0", tl, 0, 1e3)
+    qc.set_ends(e1, m0)
+
+    e0.memory_array = MemoryArray("e0.memory_array", tl, num_memories=NUM_TESTS, fidelity=0.9,
+                                  formalism="density")
+    e0.memory_array.owner = e0
+    e1.memory_array = MemoryArray("e1.memory_array", tl, num_memories=NUM_TESTS, fidelity=0.9,
+                                  formalism="density")
+    e1.memory_array.owner = e1
+    detectors = [{"efficiency": 1}] * 2
+    m0.bsm = make_bsm("m0.bsm", tl, encoding_type="single_atom", detectors=detectors)
+
+    eg_m0 = EntanglementGenerationB(m0, "eg_m0", others=["e0", "e1"])
+    m0.bsm.attach(eg_m0)
+
+    tl.init()
+
+    for i in range(NUM_TESTS):
+        protocol0 = EntanglementGenerationA(e0, "eg_e0[{}]".format(i), middle="m0", other="e1",
+                                            memory=e0.memory_array[i])
+        e0.protocols.append(protocol0)
+        protocol1 = EntanglementGenerationA(e1, "eg_e1[{}]".format(i), middle="m0", other="e0",
+                                            memory=e1.memory_array[i])
+        e1.protocols.append(protocol1)
+        protocol0.set_others(protocol1)
+        protocol1.set_others(protocol0)
+
+        tl.schedule(Event(i * 1e12, Process(protocol0, "start", [])))
+        tl.schedule(Event(i * 1e12, Process(protocol1, "start", [])))
+
+    tl.run()
+
+    entangled = [memory for memory, state in e0.resource_manager.log if state == "ENTANGLED"]
+    assert len(entangled) > 0
+    for memory in entangled:
+        # the entangled pair is a Werner state with the raw fidelity of the memories, around the heralded bell state
+        assert abs(memory.fidelity - 0.9) < 1e-9
+        assert memory.fidelity == memory.get_bell_fidelity()
+        assert len(memory.qstate.entangled_states) == 2
+        partner = e1.memory_array[e0.memory_array.memories.index(memory)]
+        assert partner.qstate in memory.qstate.entangled_states
+        assert partner.bell_state == memory.bell_state
+        assert abs(partner.fidelity - 0.9) < 1e-9
+    # the resource manager of both ends sees the noisy state
+    for node in [e0, e1]:
+        for memory, state in node.resource_manager.log:
+            if state == "ENTANGLED":
+                assert abs(node.resource_manager.fidelities[memory.name] - 0.9) < 1e-9
+    assert {memory.bell_state for memory in entangled} == {"psi+", "psi-"}
+
+
+def test_generation_fidelity_stabilizer():
+    NUM_TESTS = 200
+
+    tl = Timeline()
+    tl.seed(1)
+
+    e0 = FakeNode("e0", tl)
+    m0 = FakeNode("m0", tl)
+    e1 = FakeNode("e1", tl)
+
+    cc = ClassicalChannel("cc_e0m0", tl, 1e3)
+    cc.set_ends(e0, m0)
+    cc = ClassicalChannel("cc_e1m0", tl, 1e3)
+    cc.set_ends(e1, m0)
+    cc = ClassicalChannel("cc_e0e1", tl, 1e3)
+    cc.set_ends(e0, e1)
+    qc = QuantumChannel("qc_e0m0", tl, 0, 1e3)
+    qc.set_ends(e0, m0)
+    qc = QuantumChannel("qc_e1m0", tl, 0, 1e3)
+    qc.set_ends(e1, m0)
+
+    e0.memory_array = MemoryArray("e0.memory_array", tl, num_memories=NUM_TESTS, fidelity=0.7,
+                                  formalism="stabilizer")
+    e0.memory_array.owner = e0
+    e1.memory_array = MemoryArray("e1.memory_array", tl, num_memories=NUM_TESTS, fidelity=0.7,
+                                  formalism="stabilizer")
+    e1.memory_array.owner = e1
+    detectors = [{"efficiency": 1}] * 2
+    m0.bsm = make_bsm("m0.bsm", tl, encoding_type="single_atom", detectors=detectors)
+
+    eg_m0 = EntanglementGenerationB(m0, "eg_m0", others=["e0", "e1"])
+    m0.bsm.attach(eg_m0)
+
+    tl.init()
+
+    for i in range(NUM_TESTS):
+        protocol0 = EntanglementGenerationA(e0, "eg_e0[{}]".format(i), middle="m0", other="e1",
+                                            memory=e0.memory_array[i])
+        e0.protocols.append(protocol0)
+        protocol1 = EntanglementGenerationA(e1, "eg_e1[{}]".format(i), middle="m0", other="e0",
+                                            memory=e1.memory_array[i])
+        e1.protocols.append(protocol1)
+        protocol0.set_others(protocol1)
+        protocol1.set_others(protocol0)
+
+        tl.schedule(Event(i * 1e12, Process(protocol0, "start", [])))
+        tl.schedule(Event(i * 1e12, Process(protocol1, "start", [])))
+
+    tl.run()
+
+    entangled = [memory for memory, state in e0.resource_manager.log if state == "ENTANGLED"]
+    assert len(entangled) > 0
+    pairs = []
+    for memory in entangled:
+        assert memory.fidelity == 0.7
+        assert len(memory.qstate.entangled_states) == 2
+        partner = e1.memory_array[e0.memory_array.memories.index(memory)]
+        assert partner.qstate in memory.qstate.entangled_states
+        assert partner.fidelity == 0.7
+        pairs.append(memory.get_bell_fidelity())
+
+    # pairs are the heralded Bell states with Pauli errors of a depolarizing channel with fidelity 0.7:
+    # only pairs without error are in the heralded state
+    assert set(pairs) == {0, 1}
+    assert abs(pairs.count(1) / len(pairs) - 0.7) < 0.1
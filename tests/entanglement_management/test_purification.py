@@ -1,6 +1,6 @@
 import numpy
 import pytest
-from sequence.components.memory import Memory
+from sequence.components.memory import BELL_STATES, Memory
 from sequence.components.optical_channel import ClassicalChannel
 from sequence.kernel.timeline import Timeline
 from sequence.entanglement_management.purification import *
@@ -31,6 +31,41 @@ class FakeNode(Node):
                 protocol.received_message(src, msg)
 
 
+def entangle_pair(memo1, memo2, bell_state, fidelity):
+    # werner state: heralded bell state with one qubit depolarized
+    memo1.qstate.entangle(memo2.qstate)
+    memo1.qstate.set_state(BELL_STATES[bell_state])
+    memo1.fidelity = memo2.fidelity = 1
+    memo1.bell_state = memo2.bell_state = bell_state
+    memo1.entangled_memory["node_id"] = "a2"
+    memo1.entangled_memory["memo_id"] = memo2.name
+    memo2.entangled_memory["node_id"] = "a1"
+    memo2.entangled_memory["memo_id"] = memo1.name
+    memo1.apply_noise("depolarizing", 4 * (1 - fidelity) / 3)
+
+
+def purify(tl, a1, a2, index, formalism, fidelity):
+    kept_memo1 = Memory("a1.kept.%d" % index, tl, fidelity, 0, 1, -1, 500, formalism)
+    kept_memo2 = Memory("a2.kept.%d" % index, tl, fidelity, 0, 1, -1, 500, formalism)
+    meas_memo1 = Memory("a1.meas.%d" % index, tl, fidelity, 0, 1, -1, 500, formalism)
+    meas_memo2 = Memory("a2.meas.%d" % index, tl, fidelity, 0, 1, -1, 500, formalism)
+    entangle_pair(kept_memo1, kept_memo2, "psi+", fidelity)
+    entangle_pair(meas_memo1, meas_memo2, "psi-", fidelity)
+
+    ep1 = BBPSSW(a1, "a1.ep1.%d" % index, kept_memo1, meas_memo1)
+    ep2 = BBPSSW(a2, "a2.ep2.%d" % index, kept_memo2, meas_memo2)
+    a1.protocols.append(ep1)
+    a2.protocols.append(ep2)
+    ep1.set_others(ep2)
+    ep2.set_others(ep1)
+
+    ep1.start()
+    ep2.start()
+    assert ep1.is_success == ep2.is_success
+    tl.run()
+    return ep1, kept_memo1, kept_memo2
+
+
 def test_BBPSSWMessage():
     msg = BBPSSWMessage(BBPSSWMsgType.PURIFICATION_RES, "another")
     assert msg.msg_type == BBPSSWMsgType.PURIFICATION_RES
@@ -150,3 +185,53 @@ def test_BBPSSW2():
         tl.run()
 
     assert abs(counter1 / (counter1 + counter2) - BBPSSW.success_probability(fidelity)) < 0.1
+
+
+def test_BBPSSW_density():
+    tl = Timeline()
+    a1 = FakeNode("a1", tl)
+    a2 = FakeNode("a2", tl)
+    cc = ClassicalChannel("cc", tl, 0, 1e5)
+    cc.delay = 1e9
+    cc.set_ends(a1, a2)
+    tl.init()
+
+    counter = 0
+    for i in range(500):
+        ep1, kept_memo1, kept_memo2 = purify(tl, a1, a2, i, "density", 0.8)
+        if ep1.is_success:
+            counter += 1
+            # the phase of the measured pair is copied to the kept pair
+            assert kept_memo1.bell_state == kept_memo2.bell_state == "psi-"
+            assert kept_memo1.qstate.entangled_states == [kept_memo1.qstate, kept_memo2.qstate]
+            assert kept_memo1.fidelity == pytest.approx(BBPSSW.improved_fidelity(0.8))
+            assert a1.resource_manager.log[-1] == (kept_memo1, "ENTANGLED")
+        else:
+            assert kept_memo1.bell_state is None and kept_memo1.fidelity == 0
+            assert a1.resource_manager.log[-1] == (kept_memo1, "RAW")
+
+    assert abs(counter / 500 - BBPSSW.success_probability(0.8)) < 0.05
+
+
+def test_BBPSSW_stabilizer():
+    tl = Timeline()
+    a1 = FakeNode("a1", tl)
+    a2 = FakeNode("a2", tl)
+    cc = ClassicalChannel("cc", tl, 0, 1e5)
+    cc.delay = 1e9
+    cc.set_ends(a1, a2)
+    tl.init()
+
+    counter = 0
+    total = 0
+    for i in range(1000):
+        ep1, kept_memo1, kept_memo2 = purify(tl, a1, a2, i, "stabilizer", 0.8)
+        if ep1.is_success:
+            counter += 1
+            assert kept_memo1.bell_state == kept_memo2.bell_state == "psi-"
+            assert kept_memo1.fidelity == kept_memo2.fidelity == pytest.approx(BBPSSW.improved_fidelity(0.8))
+            total += kept_memo1.get_bell_fidelity()
+
+    assert abs(counter / 1000 - BBPSSW.success_probability(0.8)) < 0.05
+    # sampled errors give the expected fidelity on average
+    assert abs(total / counter - BBPSSW.improved_fidelity(0.8)) < 0.05
@@ -1,6 +1,6 @@
 import numpy
 import pytest
-from sequence.components.memory import Memory
+from sequence.components.memory import BELL_STATES, Memory
 from sequence.components.optical_channel import ClassicalChannel
 from sequence.kernel.timeline import Timeline
 from sequence.entanglement_management.swapping import *
@@ -32,6 +32,44 @@ class FakeNode(Node):
                 protocol.received_message(src, msg)
 
 
+def entangle_pair(memo1, memo2, bell_state, fidelity):
+    # werner state: heralded bell state with one qubit depolarized
+    memo1.qstate.entangle(memo2.qstate)
+    memo1.qstate.set_state(BELL_STATES[bell_state])
+    memo1.fidelity = memo2.fidelity = 1
+    memo1.bell_state = memo2.bell_state = bell_state
+    memo1.entangled_memory["memo_id"] = memo2.name
+    memo2.entangled_memory["memo_id"] = memo1.name
+    memo1.apply_noise("depolarizing", 4 * (1 - fidelity) / 3)
+
+
+def swap(tl, a1, a2, a3, index, formalism, degradation):
+    memo1 = Memory("a1.%d" % index, tl, 0.9, 0, 1, -1, 500, formalism)
+    memo2 = Memory("a2.%d" % index, tl, 0.9, 0, 1, -1, 500, formalism)
+    memo3 = Memory("a2.%d'" % index, tl, 0.9, 0, 1, -1, 500, formalism)
+    memo4 = Memory("a3.%d" % index, tl, 0.9, 0, 1, -1, 500, formalism)
+    memo1.entangled_memory["node_id"] = memo4.entangled_memory["node_id"] = "a2"
+    memo2.entangled_memory["node_id"] = "a1"
+    memo3.entangled_memory["node_id"] = "a3"
+    entangle_pair(memo1, memo2, "psi+", 0.9)
+    entangle_pair(memo3, memo4, "psi-", 0.8)
+
+    es1 = EntanglementSwappingB(a1, "a1.ESb%d" % index, memo1)
+    es2 = EntanglementSwappingA(a2, "a2.ESa%d" % index, memo2, memo3, degradation=degradation)
+    es3 = EntanglementSwappingB(a3, "a3.ESb%d" % index, memo4)
+    a1.protocols.append(es1)
+    a2.protocols.append(es2)
+    a3.protocols.append(es3)
+    es1.set_others(es2)
+    es3.set_others(es2)
+    es2.set_others(es1)
+    es2.set_others(es3)
+
+    es2.start()
+    tl.run()
+    return memo1, memo2, memo3, memo4
+
+
 def test_EntanglementSwappingMessage():
     # __init__ function
     msg = EntanglementSwappingMessage(SwappingMsgType.SWAP_RES, "receiver", fidelity=0.9, remote_node="a1", remote_memo=2)
@@ -113,3 +151,54 @@ def test_EntanglementSwapping():
             assert a3.resource_manager.log[-1] == (memo4, "RAW")
 
     assert abs((counter1 / (counter1 + counter2)) - 0.2) < 0.1
+
+
+def test_EntanglementSwapping_density():
+    tl = Timeline()
+    a1 = FakeNode("a1", tl)
+    a2 = FakeNode("a2", tl)
+    a3 = FakeNode("a3", tl)
+    cc1 = ClassicalChannel("a1-a2", tl, 0, 1e5)
+    cc1.set_ends(a1, a2)
+    cc1 = ClassicalChannel("a2-a3", tl, 0, 1e5)
+    cc1.set_ends(a2, a3)
+    tl.init()
+
+    for i, degradation in enumerate([1, 0.95]):
+        memo1, memo2, memo3, memo4 = swap(tl, a1, a2, a3, i, "density", degradation)
+
+        # the end memories stay entangled after the middle memories are reset
+        assert memo2.qstate.entangled_states == [memo2.qstate] and memo3.qstate.entangled_states == [memo3.qstate]
+        assert memo1.qstate.entangled_states == [memo1.qstate, memo4.qstate]
+        assert memo1.entangled_memory["memo_id"] == memo4.name and memo4.entangled_memory["memo_id"] == memo1.name
+        assert memo1.bell_state == memo4.bell_state == "psi+"
+        # swapped werner states, with the degradation depolarizing one qubit
+        werner = (4 * 0.9 - 1) / 3 * (4 * 0.8 - 1) / 3 * degradation
+        assert memo1.fidelity == memo4.fidelity == pytest.approx((1 + 3 * werner) / 4)
+        assert a1.resource_manager.log[-1] == (memo1, "ENTANGLED")
+        assert a3.resource_manager.log[-1] == (memo4, "ENTANGLED")
+
+
+def test_EntanglementSwapping_stabilizer():
+    tl = Timeline()
+    a1 = FakeNode("a1", tl)
+    a2 = FakeNode("a2", tl)
+    a3 = FakeNode("a3", tl)
+    cc1 = ClassicalChannel("a1-a2", tl, 0, 1e5)
+    cc1.set_ends(a1, a2)
+    cc1 = ClassicalChannel("a2-a3", tl, 0, 1e5)
+    cc1.set_ends(a2, a3)
+    tl.init()
+
+    expected = 0.9 * 0.8 + 0.1 * 0.2 / 3
+    total = 0
+    for i in range(1000):
+        memo1, memo2, memo3, memo4 = swap(tl, a1, a2, a3, i, "stabilizer", 1)
+
+        assert memo1.qstate.entangled_states == [memo1.qstate, memo4.qstate]
+        assert memo1.bell_state == memo4.bell_state == "psi+"
+        assert memo1.fidelity == memo4.fidelity == pytest.approx(expected)
+        total += memo1.get_bell_fidelity()
+
+    # sampled errors give the expected fidelity on average
+    assert abs(total / 1000 - expected) < 0.05
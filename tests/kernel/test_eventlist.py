@@ -1,3 +1,5 @@
+import math
+
 from sequence.kernel.event import Event
 from sequence.kernel.eventlist import EventList
 
@@ -133,3 +135,235 @@ def test_update_event_time():
             event = e.pop()
             assert event.time >= pre_time
             pre_time = event.time
+
+
+def test_update_event_time_index():
+    from heapq import heappush, heappop
+    from numpy import random
+    random.seed(1)
+
+    def reference_update(heap, event, time):
+        # linear-scan implementation used before events tracked their heap position
+        def _pop_updated_event(index):
+            parent_i = (index - 1) // 2
+            while index > 0 and event < heap[parent_i]:
+                heap[index], heap[parent_i] = heap[parent_i], heap[index]
+                index = parent_i
+                parent_i = (parent_i - 1) // 2
+
+        for i, e in enumerate(heap):
+            if e is event:
+                if event.time > time:
+                    event.time = time
+                    _pop_updated_event(i)
+                elif event.time < time:
+                    event.time = -1
+                    _pop_updated_event(i)
+                    heappop(heap)
+                    event.time = time
+                    heappush(heap, event)
+                break
+
+    for i in range(100):
+        el = EventList()
+        ref = []
+        ts = random.randint(1, 100, i + 10)
+        ps = random.randint(0, 5, i + 10)
+        events = []
+        for t, p in zip(ts, ps):
+            event = Event(t, None, p)
+            ref_event = Event(t, None, p)
+            el.push(event)
+            heappush(ref, ref_event)
+            events.append((event, ref_event))
+
+        for _ in range(20):
+            index = random.randint(len(events))
+            new_time = random.randint(1, 150)
+            event, ref_event = events[index]
+            el.update_event_time(event, new_time)
+            reference_update(ref, ref_event, new_time)
+
+            assert len(el) == len(ref)
+            for e in el.data:
+                assert e._entry[3] is e and e._entry[0] == e.time
+
+        while not el.isempty():
+            event = el.pop()
+            ref_event = heappop(ref)
+            assert event.time == ref_event.time and event.priority == ref_event.priority
+            assert event._index == -1
+        assert len(ref) == 0
+
+
+def test_update_popped_event_time():
+    el = EventList()
+    e1 = Event(5, None)
+    e2 = Event(10, None)
+    el.push(e1)
+    el.push(e2)
+    popped = el.pop()
+    assert popped is e1
+    el.update_event_time(e1, 20)
+    assert e1.time == 5 and len(el) == 1
+
+
+def test_queue_backends():
+    from numpy import random
+    from sequence.kernel.eventlist import CalendarQueue, LadderQueue, make_event_queue
+    random.seed(2)
+
+    assert type(make_event_queue("calendar")) == CalendarQueue
+    assert type(make_event_queue("ladder")) == LadderQueue
+
+    for queue_type in ["calendar", "ladder"]:
+        for trial in range(20):
+            reference = EventList()
+            queue = make_event_queue(queue_type)
+            pairs = []
+            now = 0
+            for step in range(2000):
+                op = random.random_sample()
+                if op < 0.55 or reference.isempty():
+                    # mix of periodic, clustered and far-future events
+                    offset = random.choice([1000, 1000, random.randint(0, 50), random.randint(0, 10 ** 7)])
+                    time = now + int(offset) if random.random_sample() > 0.01 else math.inf
+                    # unique priorities so that paired events are popped in the same order
+                    priority = int(random.randint(0, 3)) * 10000 + step
+                    e1, e2 = Event(time, None, priority), Event(time, None, priority)
+                    reference.push(e1)
+                    queue.push(e2)
+                    pairs.append((e1, e2))
+                elif op < 0.65:
+                    e1, e2 = pairs[random.randint(len(pairs))]
+                    time = now + int(random.randint(0, 10 ** 5)) if random.random_sample() > 0.05 else math.inf
+                    reference.update_event_time(e1, time)
+                    queue.update_event_time(e2, time)
+                else:
+                    e1 = reference.pop()
+                    e2 = queue.pop()
+                    assert (e1.time, e1.priority) == (e2.time, e2.priority)
+                    now = e1.time
+                assert len(reference) == len(queue)
+
+            while not reference.isempty():
+                e1 = reference.pop()
+                e2 = queue.pop()
+                assert (e1.time, e1.priority) == (e2.time, e2.priority)
+            assert queue.isempty()
+
+
+def test_compaction():
+    from numpy import random
+    from sequence.kernel.eventlist import make_event_queue
+    random.seed(3)
+
+    for queue_type in ["heap", "calendar", "ladder"]:
+        queue = make_event_queue(queue_type, compaction_ratio=0.5)
+        events = [Event(int(t), None, i) for i, t in enumerate(random.randint(0, 10 ** 6, 4000))]
+        for e in events:
+            queue.push(e)
+
+        # removing popped or already removed events is not counted
+        popped = queue.pop()
+        queue.remove(popped)
+        assert queue.invalid_count == 0
+
+        live = [e for e in events if e is not popped]
+        for e in live[:1500]:
+            queue.remove(e)
+            queue.remove(e)
+        assert queue.invalid_count == 1500 and queue.compactions == 0
+
+        # compaction at 2000 invalid events (half of queue)
+        for e in live[1500:2000]:
+            queue.remove(e)
+        assert queue.compactions == 1 and queue.invalid_count == 0
+        assert len(queue) == 1999
+        assert all(e._index == -1 for e in live[:2000])
+
+        result = []
+        while not queue.isempty():
+            result.append(queue.pop())
+        assert result == sorted(live[2000:])
+
+
+def test_push_order_ties():
+    el = EventList()
+    events = [Event(10, None, 1) for _ in range(50)] + [Event(10, None, 0)]
+    for e in events:
+        el.push(e)
+
+    assert el.pop() is events[-1]
+    for e in events[:-1]:
+        assert el.pop() is e
+
+
+def test_update_stale_entries():
+    el = EventList()
+    events = [Event(t, None) for t in range(2000)]
+    for e in events:
+        el.push(e)
+
+    for i in range(3):
+        for e in events:
+            el.update_event_time(e, e.time + 1)
+        assert len(el) == 2000
+    assert len(el._heap) < 2 * 2000 + 1 and el.compactions > 0
+
+    for t in range(2000):
+        assert el.pop().time == t + 3
+    assert el.isempty()
+
+
+def test_unpop():
+    from sequence.kernel.eventlist import make_event_queue
+
+    for queue_type in ["heap", "calendar", "ladder"]:
+        queue = make_event_queue(queue_type)
+        events = [Event(t // 3, None, 0) for t in range(300)] + [Event(math.inf, None, 0) for _ in range(3)]
+        for e in events:
+            queue.push(e)
+
+        result = []
+        for i in range(len(events)):
+            e = queue.pop()
+            if i % 2 == 0:
+                queue.unpop(e)
+                assert len(queue) == len(events) - i
+                e = queue.pop()
+            result.append(e)
+        assert result == events and all(a is b for a, b in zip(result, events))
+
+    # an unpopped event can still be rescheduled
+    queue = EventList()
+    e1, e2 = Event(1, None, 0), Event(1, None, 0)
+    queue.push(e1)
+    queue.push(e2)
+    queue.unpop(queue.pop())
+    queue.update_event_time(e1, 2)
+    assert queue.pop() is e2 and queue.pop() is e1
+
+
+def test_no_reference_cycles():
+    # popped events must not keep a reference cycle with their heap entry (see `EventList.pop`)
+    import gc
+
+    from sequence.kernel.process import Process
+    from sequence.kernel.timeline import Timeline
+
+    class Owner:
+        def op(self):
+            pass
+
+    tl = Timeline()
+    owner = Owner()
+    for t in range(10000):
+        tl.schedule(Event(t, Process(owner, "op", [])))
+    gc.collect()
+    gc.disable()
+    try:
+        tl.run()
+        assert gc.collect() < 100
+    finally:
+        gc.enable()
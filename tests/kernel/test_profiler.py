@@ -0,0 +1,40 @@
+import json
+
+from sequence.kernel.profiler import Profiler
+
+
+def test_record():
+    profiler = Profiler()
+    profiler.record(("Detector", "add_dark_count"), 10)
+    profiler.record(("Detector", "add_dark_count"), 30)
+    profiler.record(("Memory", "expire"), 25)
+
+    assert profiler.stats == {("Detector", "add_dark_count"): [2, 40, 30], ("Memory", "expire"): [1, 25, 25]}
+
+    profiler.reset()
+    assert profiler.stats == {}
+
+
+def test_report():
+    profiler = Profiler()
+    for elapsed in [10, 30]:
+        profiler.record(("Detector", "add_dark_count"), elapsed)
+    profiler.record(("Memory", "expire"), 35)
+
+    report = profiler.get_report()
+    assert [record["owner"] for record in report] == ["Detector", "Memory"]
+    assert report[0] == {"owner": "Detector", "activation": "add_dark_count", "count": 2, "total_time": 40,
+                         "max_time": 30, "mean_time": 20}
+    assert [record["owner"] for record in profiler.get_report("max_time")] == ["Memory", "Detector"]
+
+    try:
+        profiler.get_report("invalid")
+        assert False
+    except Exception:
+        pass
+
+    assert json.loads(profiler.to_json()) == report
+
+    table = profiler.to_table().split("\n")
+    assert len(table) == 3
+    assert table[1].startswith("Detector.add_dark_count") and table[2].startswith("Memory.expire")
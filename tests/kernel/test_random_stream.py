@@ -0,0 +1,87 @@
+import pickle
+
+import numpy as np
+
+from sequence.kernel.random_stream import RandomStream, RandomStreams
+from sequence.kernel.timeline import Timeline
+
+
+def test_random_stream():
+    stream = RandomStream(np.random.SeedSequence(0), block_size=256)
+    values = [stream.random() for _ in range(1000)]
+    assert all(0 <= v < 1 for v in values)
+    assert abs(np.mean(values) - 0.5) < 0.05
+
+    # buffered values follow the generator sequence
+    expected = np.random.Generator(np.random.PCG64(np.random.SeedSequence(0)))
+    assert values[:64] == expected.random(64).tolist()
+
+    normals = [stream.normal(1550, 2) for _ in range(1000)]
+    assert abs(np.mean(normals) - 1550) < 0.5 and abs(np.std(normals) - 2) < 0.2
+    exponentials = [stream.exponential(10) for _ in range(1000)]
+    assert abs(np.mean(exponentials) - 10) < 1.5
+    counts = [stream.poisson(0.1) for _ in range(1000)] + [stream.poisson(5) for _ in range(1000)]
+    assert abs(np.mean(counts[:1000]) - 0.1) < 0.05 and abs(np.mean(counts[1000:]) - 5) < 0.5
+
+    # means beyond the buffered ones are not buffered
+    for i in range(100):
+        assert stream.poisson(i * 0.01) >= 0
+    assert len(stream._poisson) == RandomStream.MAX_POISSON_BUFFERS
+
+
+def test_random_streams():
+    streams = RandomStreams(0)
+    a = streams.get("a")
+    b = streams.get("b")
+    a2 = streams.get("a")
+    draws = [[s.random() for _ in range(10)] for s in [a, b, a2]]
+    assert draws[0] != draws[1] and draws[0] != draws[2]
+
+    # streams do not depend on the draws of other streams or on the creation order of other names
+    other = RandomStreams(0)
+    b_other = other.get("b")
+    a_other = other.get("a")
+    assert [b_other.random() for _ in range(10)] == draws[1]
+    assert [a_other.random() for _ in range(10)] == draws[0]
+
+    # reseeding
+    streams.seed(0)
+    assert [a.random() for _ in range(10)] == draws[0]
+    streams.seed(1)
+    assert [a.random() for _ in range(10)] != draws[0]
+
+
+def test_timeline_seed():
+    def draw(seed_first):
+        tl = Timeline()
+        if seed_first:
+            tl.seed(5)
+        stream = tl.get_random_stream("entity")
+        if not seed_first:
+            tl.seed(5)
+        return [stream.random() for _ in range(100)]
+
+    assert draw(True) == draw(False)
+
+    # unseeded timelines do not use the numpy global random state, unless asked to
+    np.random.seed(2)
+    state = np.random.get_state()[1].copy()
+    values = [Timeline().get_random_stream("entity").random() for _ in range(2)]
+    assert (np.random.get_state()[1] == state).all()
+    assert values[0] != values[1]
+
+    np.random.seed(2)
+    values = [Timeline(global_entropy=True).get_random_stream("entity").random() for _ in range(2)]
+    np.random.seed(2)
+    assert values == [Timeline(global_entropy=True).get_random_stream("entity").random() for _ in range(2)]
+    assert values[0] != values[1]
+
+
+def test_pickle():
+    tl = Timeline()
+    tl.seed(0)
+    stream = tl.get_random_stream("entity")
+    [stream.random() for _ in range(100)]
+    tl2 = pickle.loads(pickle.dumps(tl))
+    stream2 = tl2.random_streams.streams[("entity", 0)]
+    assert [stream.random() for _ in range(5000)] == [stream2.random() for _ in range(5000)]
@@ -0,0 +1,92 @@
+import asyncio
+from time import perf_counter, sleep
+
+from sequence.kernel.entity import Entity
+from sequence.kernel.event import Event
+from sequence.kernel.process import Process
+from sequence.kernel.realtime import RealTimePacer
+from sequence.kernel.timeline import Timeline
+
+
+class Worker(Entity):
+    def __init__(self, name, timeline, work_time=0):
+        Entity.__init__(self, name, timeline)
+        self.work_time = work_time
+        self.wall_times = []
+
+    def init(self):
+        pass
+
+    def op(self):
+        self.wall_times.append(perf_counter())
+        if self.work_time:
+            sleep(self.work_time)
+
+
+def build(num_events, period, work_time=0):
+    tl = Timeline()
+    worker = Worker("worker", tl, work_time)
+    for i in range(num_events):
+        tl.schedule(Event(i * period, Process(worker, "op", [])))
+    return tl, worker
+
+
+def test_pacing():
+    # 1 ps of simulation lasts 1 ms
+    tl, worker = build(20, 2)
+    tl.pacer = RealTimePacer(time_scale=1e9, tolerance=0.01)
+    start = perf_counter()
+    tl.run()
+    assert perf_counter() - start >= 0.038
+    # events are never executed early (a late event may shorten the following gap)
+    for i, wall_time in enumerate(worker.wall_times):
+        assert wall_time - start >= i * 0.002
+    report = tl.pacer.get_report()
+    assert report["paced_events"] == 20 and report["resyncs"] == 0
+
+
+def test_late_events():
+    # events take 5 ms of work but are due every 1 ms: the simulation runs as fast as possible
+    tl, worker = build(10, 1, work_time=0.005)
+    tl.pacer = RealTimePacer(time_scale=1e9, tolerance=0.002)
+    tl.run()
+    report = tl.pacer.get_report()
+    assert report["late_events"] >= 8
+    assert report["max_observed_lag"] >= 0.03 and report["mean_late_lag"] > 0.002
+    assert report["resyncs"] == 0
+
+    # with a maximum lag, the pacer resynchronizes instead of catching up
+    tl, worker = build(10, 1, work_time=0.005)
+    tl.pacer = RealTimePacer(time_scale=1e9, tolerance=0.002, max_lag=0.003)
+    tl.run()
+    report = tl.pacer.get_report()
+    assert report["resyncs"] >= 8
+
+    tl.pacer.reset()
+    assert tl.pacer.get_report()["paced_events"] == 0
+
+
+def test_pacing_async():
+    # a paced asynchronous run sleeps on the event loop, so that other coroutines run between events
+    tl, worker = build(10, 5)
+    tl.pacer = RealTimePacer(time_scale=1e9, tolerance=0.01)
+    ticks = []
+
+    async def controller(task):
+        while not task.done():
+            ticks.append(perf_counter())
+            await asyncio.sleep(0.001)
+
+    async def main():
+        task = asyncio.ensure_future(tl.run_async())
+        await controller(task)
+        return await task
+
+    start = perf_counter()
+    assert asyncio.run(main()) == 10
+    assert perf_counter() - start >= 0.045
+    for i, wall_time in enumerate(worker.wall_times):
+        assert wall_time - start >= i * 0.005
+    # the controller keeps ticking while the simulation waits for events
+    assert len(ticks) >= 20
+    assert tl.pacer.get_report()["paced_events"] == 10
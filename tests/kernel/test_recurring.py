@@ -0,0 +1,77 @@
+import pickle
+
+from numpy import random
+
+from sequence.kernel.entity import Entity
+from sequence.kernel.process import Process
+from sequence.kernel.recurring import PeriodicTimes, PoissonTimes, RecurringEvent
+from sequence.kernel.timeline import Timeline
+
+
+class Counter(Entity):
+    def __init__(self, name, timeline):
+        Entity.__init__(self, name, timeline)
+        self.times = []
+
+    def init(self):
+        pass
+
+    def count(self, limit=None):
+        self.times.append(self.timeline.now())
+        if limit is not None and len(self.times) >= limit:
+            self.timeline.remove_event(self.event)
+
+
+def test_periodic_times():
+    assert list(PeriodicTimes(5, 10, 4)) == [5, 15, 25, 35]
+    times = PeriodicTimes(0, 3)
+    assert [next(times) for _ in range(3)] == [0, 3, 6]
+
+
+def test_poisson_times():
+    random.seed(0)
+    times = list(PoissonTimes(100, 1e6, stop_time=1e12))
+    assert times == sorted(times) and times[0] > 100 and times[-1] < 1e12
+    assert abs(len(times) - 1e6) < 5 * 1e3
+
+
+def test_recurring_event():
+    tl = Timeline()
+    counter = Counter("counter", tl)
+    event = RecurringEvent(tl, PeriodicTimes(10, 10, 5), Process(counter, "count", []))
+    tl.schedule(event)
+    assert len(tl.events) == 1
+    tl.run()
+    assert counter.times == [10, 20, 30, 40, 50]
+    assert tl.run_counter == 5 and len(tl.events) == 0
+
+    # stop time and resume
+    tl = Timeline(25)
+    counter = Counter("counter", tl)
+    tl.schedule(RecurringEvent(tl, [5, 15, 25, 35], Process(counter, "count", [])))
+    tl.run()
+    assert counter.times == [5, 15]
+    tl.stop_time = 100
+    tl.run()
+    assert counter.times == [5, 15, 25, 35]
+
+
+def test_recurring_event_remove():
+    tl = Timeline()
+    counter = Counter("counter", tl)
+    counter.event = RecurringEvent(tl, PeriodicTimes(0, 10), Process(counter, "count", [3]))
+    tl.schedule(counter.event)
+    tl.run()
+    assert counter.times == [0, 10, 20]
+
+
+def test_recurring_event_pickle():
+    tl = Timeline(100)
+    counter = Counter("counter", tl)
+    tl.schedule(RecurringEvent(tl, PeriodicTimes(0, 10), Process(counter, "count", [])))
+    tl.run()
+
+    tl2 = pickle.loads(pickle.dumps(tl))
+    tl2.stop_time = 200
+    tl2.run()
+    assert tl2.entities.get("counter").times == list(range(0, 200, 10))
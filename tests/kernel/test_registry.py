@@ -0,0 +1,76 @@
+import gc
+import pickle
+
+import pytest
+
+from sequence.kernel.entity import Entity
+from sequence.kernel.registry import EntityRegistry
+from sequence.kernel.timeline import Timeline
+
+
+class Dummy(Entity):
+    def __init__(self, name, timeline):
+        Entity.__init__(self, name, timeline)
+        self.initialized = False
+
+    def init(self):
+        self.initialized = True
+
+
+class SubDummy(Dummy):
+    pass
+
+
+def test_registry():
+    tl = Timeline()
+    a = Dummy("a", tl)
+    b = SubDummy("b", tl)
+    c = Dummy("c", tl)
+    unnamed = [Dummy("", tl) for _ in range(3)]
+
+    assert len(tl.entities) == 6
+    assert list(tl.entities) == [a, b, c] + unnamed
+    assert tl.entities.get("b") is b and tl.entities.get("d") is None
+    assert tl.entities.get_by_name("") == unnamed
+    assert tl.entities.get_by_type(SubDummy) == [b]
+    assert tl.entities.get_by_type(Dummy) == [a, b, c] + unnamed
+    assert tl.entities.get_by_type("Dummy") == [a, c] + unnamed
+
+    c.remove_from_timeline()
+    unnamed[1].remove_from_timeline()
+    assert c not in tl.entities and a in tl.entities
+    assert list(tl.entities) == [a, b, unnamed[0], unnamed[2]]
+    assert tl.entities.get("c") is None and tl.entities.get_by_name("") == [unnamed[0], unnamed[2]]
+    with pytest.raises(ValueError):
+        c.remove_from_timeline()
+    with pytest.raises(Exception):
+        tl.entities.add(a)
+
+    tl.init()
+    assert a.initialized and b.initialized and not c.initialized
+
+
+def test_weak_registry():
+    tl = Timeline(weak_entities=True)
+    kept = Dummy("kept", tl)
+    Dummy("transient", tl)
+    gc.collect()
+    assert list(tl.entities) == [kept] and tl.entities.get("transient") is None
+    assert tl.entities.get_by_type(Dummy) == [kept]
+
+    # entities may also be added weakly one at a time
+    registry = EntityRegistry()
+    registry.add(kept)
+    registry.add(Dummy("transient", tl), weak=True)
+    gc.collect()
+    assert list(registry) == [kept]
+
+
+def test_pickle():
+    tl = Timeline()
+    Dummy("a", tl)
+    SubDummy("b", tl)
+    tl2 = pickle.loads(pickle.dumps(tl))
+    assert [e.name for e in tl2.entities] == ["a", "b"]
+    assert tl2.entities.get("b").timeline is tl2
+    assert tl2.entities.get_by_type(SubDummy) == [tl2.entities.get("b")]
@@ -1,6 +1,11 @@
+import asyncio
+import gc
+from math import inf
+
 from sequence.kernel.entity import Entity
 from sequence.kernel.event import Event
 from sequence.kernel.process import Process
+from sequence.kernel.recurring import PeriodicTimes, RecurringEvent
 from sequence.kernel.timeline import Timeline
 
 
@@ -62,6 +67,70 @@ def test_run():
     assert tl.now() == tl.time < 5 and len(tl.events) > 0
 
 
+def test_run_slices():
+    def build(profile=False):
+        tl = Timeline(stop_time=80, profile=profile)
+        dummy = Dummy('1', tl)
+        for t in range(100):
+            tl.schedule(Event(t, Process(dummy, 'op', [])))
+        return tl, dummy
+
+    for profile in [False, True]:
+        tl, dummy = build(profile)
+        assert tl.run(until_time=10) == 10
+        assert dummy.counter == 10 and tl.now() == 9 and tl.stop_time == 80
+        assert tl.run(max_events=15) == 15
+        assert dummy.counter == 25 and tl.now() == 24
+
+        # stop_when is checked every check_every events
+        assert tl.run(stop_when=lambda: dummy.counter >= 33, check_every=5) == 10
+        assert dummy.counter == 35
+        assert tl.run(stop_when=lambda: dummy.counter >= 36) == 1
+
+        # resume until the stop time
+        assert tl.run(until_time=1000) == 44
+        assert dummy.counter == 80 and tl.run() == 0
+        tl.stop_time = 200
+        assert tl.run() == 20 and dummy.counter == 100
+
+
+def test_run_async():
+    tl = Timeline(stop_time=1000)
+    dummy = Dummy('1', tl)
+    for t in range(100):
+        tl.schedule(Event(t, Process(dummy, 'op', [])))
+
+    async def controller(inbox, log):
+        # the controller runs between slices of the simulation
+        while dummy.counter < 100:
+            log.append(dummy.counter)
+            await asyncio.sleep(0)
+        await inbox.put(Process(dummy, 'click', []))
+        await inbox.put(Event(500, Process(dummy, 'op', [])))
+        await asyncio.sleep(0)
+        await inbox.put(None)
+
+    async def main():
+        inbox = asyncio.Queue()
+        log = []
+        results = await asyncio.gather(tl.run_async(inbox, max_events=10, wait=True), controller(inbox, log))
+        return results[0], log
+
+    executed, log = asyncio.run(main())
+    assert executed == 102 and dummy.counter == 101
+    assert dummy.click_time == 99 and tl.now() == 500
+    assert log == list(range(10, 100, 10))
+    assert not tl.is_running
+
+    # without waiting, the simulation returns once events are exhausted
+    tl = Timeline()
+    dummy = Dummy('1', tl)
+    for t in range(100):
+        tl.schedule(Event(t, Process(dummy, 'op', [])))
+    assert asyncio.run(tl.run_async(max_events=7, max_wall_time=inf, until_time=50)) == 50
+    assert asyncio.run(tl.run_async()) == 50 and dummy.counter == 100
+
+
 def test_remove_event():
     tl = Timeline()
     dummy = Dummy('1', tl)
@@ -77,6 +146,60 @@ def test_remove_event():
     assert dummy.counter == 0 and d2.counter == 1
 
 
+def test_cancel_all():
+    for queue_type in ["heap", "calendar", "ladder"]:
+        tl = Timeline(event_queue=queue_type)
+        dummy = Dummy('1', tl)
+        d2 = Dummy('2', tl)
+        for t in range(10):
+            tl.schedule(Event(t, Process(dummy, 'op', [])))
+            tl.schedule(Event(t, Process(d2, 'op', [])))
+        removed = Event(20, Process(dummy, 'op', []))
+        tl.schedule(removed)
+        tl.remove_event(removed)
+
+        tl.stop_time = 5
+        tl.run()
+        assert dummy.counter == 5 and d2.counter == 5
+
+        # only events scheduled before cancellation are dropped
+        tl.cancel_all(dummy)
+        event = Event(7, Process(dummy, 'op', []))
+        tl.schedule(event)
+        assert not event.is_invalid()
+        tl.stop_time = 100
+        tl.run()
+        assert dummy.counter == 6 and d2.counter == 10
+        assert len(tl.events) == 0 and tl.events.invalid_count == 0
+
+        # cancelling an owner without events
+        tl.cancel_all(Dummy('3', tl))
+
+        # recurring events are cancelled as well
+        event = RecurringEvent(tl, PeriodicTimes(110, 10), Process(dummy, 'op', []))
+        tl.schedule(event)
+        tl.stop_time = 145
+        tl.run()
+        assert dummy.counter == 10
+        tl.cancel_all(dummy)
+        tl.stop_time = 200
+        tl.run()
+        assert dummy.counter == 10 and len(tl.events) == 0
+
+
+def test_cancel_all_collected_owner():
+    # epochs of owners that are garbage collected are dropped by the timeline
+    tl = Timeline()
+    dummy = Dummy('1', tl)
+    tl.schedule(Event(10, Process(dummy, 'op', [])))
+    assert len(tl._epochs) == 1
+    tl.run()
+    tl.entities.remove(dummy)
+    del dummy
+    gc.collect()
+    assert len(tl._epochs) == 0
+
+
 def test_update_event_time():
     tl = Timeline()
     d1 = Dummy('1', tl)
@@ -92,3 +215,155 @@ def test_update_event_time():
     tl.run()
 
     assert d1.click_time == 10 and d2.click_time == 20
+
+
+def test_event_queue_types():
+    from numpy import random
+    random.seed(0)
+    times = random.randint(0, 20, 200)
+    priorities = random.randint(0, 20, 200)
+
+    for queue_type in ["heap", "calendar", "ladder"]:
+        tl = Timeline(event_queue=queue_type)
+        dummy = Dummy("dummy", tl)
+        for t, p in zip(times, priorities):
+            tl.schedule(Event(t, Process(dummy, "op", []), p))
+        tl.init()
+        tl.run()
+        assert dummy.counter == 200 and tl.now() == max(times)
+
+
+def test_get_event_stats():
+    tl = Timeline(compaction_ratio=0.5)
+    dummy = Dummy("dummy", tl)
+    events = [Event(t, Process(dummy, "op", [])) for t in range(3000)]
+    for e in events:
+        tl.schedule(e)
+
+    for e in events[:1000]:
+        tl.remove_event(e)
+    stats = tl.get_event_stats()
+    assert stats == {"queue_size": 3000, "live_events": 2000, "invalid_events": 1000, "compactions": 0}
+
+    for e in events[1000:1600]:
+        tl.remove_event(e)
+    stats = tl.get_event_stats()
+    assert stats == {"queue_size": 1500, "live_events": 1400, "invalid_events": 100, "compactions": 1}
+
+    tl.remove_event(events[-1])
+    tl.stop_time = 2000
+    tl.init()
+    tl.run()
+    assert dummy.counter == 400
+    stats = tl.get_event_stats()
+    assert stats["live_events"] == 999 and stats["invalid_events"] == 1
+
+    # rescheduled events leave stale entries in the heap
+    tl.update_event_time(events[2500], 2999)
+    stats = tl.get_event_stats()
+    assert stats["queue_size"] == len(tl.events._heap) == 1001
+    assert stats["live_events"] == 999 and stats["invalid_events"] == 2
+
+
+def test_schedule_binds_process():
+    tl = Timeline()
+    dummy = Dummy("dummy", tl)
+    event = Event(1, Process(dummy, "op", []))
+    assert not hasattr(event, "__dict__") and not hasattr(event.process, "__dict__")
+
+    tl.schedule(event)
+    assert event._func == dummy.op
+    tl.init()
+    tl.run()
+    assert dummy.counter == 1
+
+
+class RandomDummy(Entity):
+    def __init__(self, name, tl):
+        Entity.__init__(self, name, tl)
+        self.scale = 1
+        self.record = []
+
+    def init(self):
+        self.op()
+
+    def op(self):
+        from numpy import random
+        self.record.append(self.timeline.now())
+        next_time = self.timeline.now() + self.scale * random.randint(1, 100)
+        self.timeline.schedule(Event(next_time, Process(self, "op", [])))
+
+
+def test_snapshot_restore(tmp_path):
+    tl = Timeline(5000)
+    tl.seed(0)
+    dummy = RandomDummy("dummy", tl)
+    tl.init()
+    tl.run()
+
+    filename = str(tmp_path / "snapshot.pkl")
+    data = tl.snapshot(filename, extra={"dummy": dummy})
+    tl.stop_time = 10000
+    tl.run()
+    expected = dummy.record
+
+    for snapshot in [data, filename]:
+        tl2, extra = Timeline.restore(snapshot)
+        dummy2 = extra["dummy"]
+        assert tl2.now() == dummy2.record[-1] and dummy2.timeline is tl2 and dummy2 in tl2.entities
+        tl2.stop_time = 10000
+        tl2.run()
+        assert dummy2.record == expected
+
+
+def test_fork():
+    tl = Timeline(5000)
+    tl.seed(0)
+    dummy = RandomDummy("dummy", tl)
+    tl.init()
+    tl.run()
+    warm_up = dummy.record[:]
+
+    def branch(timeline, index):
+        dummy.scale = index + 1
+        timeline.stop_time = 10000
+        timeline.run()
+        return dummy.record
+
+    results = tl.fork(3, branch)
+    assert len(results) == 3
+    for i, record in enumerate(results):
+        assert record[:len(warm_up)] == warm_up
+        assert all(b - a <= 100 * (i + 1) for a, b in zip(record[len(warm_up):], record[len(warm_up) + 1:]))
+    assert len(results[0]) > len(results[1]) > len(results[2])
+
+    # branches do not change the calling process
+    assert dummy.record == warm_up and dummy.scale == 1 and tl.now() < 5000
+
+    def failing_branch(timeline, index):
+        raise ValueError("branch %d" % index)
+
+    try:
+        tl.fork(2, failing_branch)
+        assert False
+    except ValueError as err:
+        assert str(err) == "branch 0"
+
+
+def test_profile():
+    tl = Timeline()
+    assert tl.profiler is None
+
+    tl = Timeline(profile=True)
+    dummy = Dummy("dummy", tl)
+    for t in range(10):
+        tl.schedule(Event(t, Process(dummy, "op", [])))
+    tl.schedule(Event(20, Process(dummy, "click", [])))
+    tl.init()
+    tl.run()
+
+    stats = tl.profiler.stats
+    assert stats.keys() == {("Dummy", "op"), ("Dummy", "click")}
+    assert stats[("Dummy", "op")][0] == 10 and stats[("Dummy", "click")][0] == 1
+    count, total, maximum = stats[("Dummy", "op")]
+    assert 0 <= maximum <= total
@@ -343,3 +343,33 @@ def test_ResourceReservationProtocol_set_es_params():
     for node in routers:
         counter += node.counter
     assert counter > 0
+
+
+def test_ResourceReservationProtocol_rules_pickle():
+    import pickle
+
+    tl = Timeline()
+    routers = [FakeNode("r%d" % i, tl, memo_size=20) for i in range(3)]
+    for i in range(2):
+        mid = BSMNode("mid%d" % i, tl, [routers[i].name, routers[i + 1].name])
+        for router in routers[i:i + 2]:
+            qc = QuantumChannel("qc_%s_%s" % (router.name, mid.name), tl, 0, 100)
+            qc.set_ends(router, mid)
+
+    path = [r.name for r in routers]
+    reservation = Reservation("r0", "r2", 1, 1000000000, 10, 0.9)
+    for node in routers:
+        for card in node.rsvp.timecards:
+            card.add(reservation)
+        rules = node.rsvp.create_rules(path, reservation)
+        copied = pickle.loads(pickle.dumps(rules))
+        assert len(copied) == len(rules)
+        for rule, copied_rule in zip(rules, copied):
+            assert copied_rule.condition.func is rule.condition.func
+            assert copied_rule.condition.keywords.keys() == rule.condition.keywords.keys()
+
+    # swapping actions read parameters from the protocol when executed
+    rsvp = routers[1].rsvp
+    rules = rsvp.create_rules(path, reservation)
+    actions = [rule.action for rule in rules if getattr(rule.action, "func", None) is es_rule_actionA]
+    assert len(actions) == 1 and actions[0].keywords["rsvp"] is rsvp
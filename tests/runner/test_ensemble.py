@@ -0,0 +1,99 @@
+import json
+
+import numpy
+import pytest
+
+from sequence.kernel.entity import Entity
+from sequence.kernel.event import Event
+from sequence.kernel.process import Process
+from sequence.kernel.timeline import Timeline
+from sequence.runner.ensemble import ResultStore, config_hash, make_grid, run_ensemble
+
+
+class Counter(Entity):
+    def __init__(self, name, tl, period):
+        Entity.__init__(self, name, tl)
+        self.period = period
+        self.counter = 0
+
+    def init(self):
+        self.op()
+
+    def op(self):
+        from numpy import random
+        self.counter += 1
+        next_time = self.timeline.now() + self.period + random.randint(10)
+        self.timeline.schedule(Event(next_time, Process(self, "op", [])))
+
+
+def scenario(config):
+    tl = Timeline(10000)
+    tl.seed(config["seed"])
+    counter = Counter("counter", tl, config["period"])
+    tl.init()
+    tl.run()
+    return {"count": counter.counter}
+
+
+def failing_scenario(config):
+    if config["period"] == 20:
+        raise ValueError("failed")
+    return scenario(config)
+
+
+def test_make_grid():
+    grid = make_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(grid) == 6 and grid[0] == {"a": 1, "b": "x"} and grid[-1] == {"a": 2, "b": "z"}
+
+    grid = make_grid({"a": [1, 2]}, seeds=[0, 1, 2])
+    assert grid == [{"a": 1, "seed": 0}, {"a": 1, "seed": 1}, {"a": 1, "seed": 2},
+                    {"a": 2, "seed": 0}, {"a": 2, "seed": 1}, {"a": 2, "seed": 2}]
+
+
+def test_config_hash():
+    assert config_hash({"a": 1, "b": 2}) == config_hash({"b": 2, "a": 1})
+    assert config_hash({"a": 1, "b": 2}) != config_hash({"a": 1, "b": 3})
+    assert config_hash({"a": numpy.int64(1)}) == config_hash({"a": 1})
+    with pytest.raises(TypeError):
+        config_hash({"a": object()})
+
+
+def test_run_ensemble(tmp_path):
+    filename = str(tmp_path / "results.jsonl")
+    configs = make_grid({"period": [10, 20, 50]}, seeds=[0, 1])
+    expected = [scenario(config)["count"] for config in configs]
+
+    df = run_ensemble(scenario, configs, ResultStore(filename), max_workers=2, max_pending=3)
+    assert list(df["count"]) == expected
+    assert list(df["period"]) == [config["period"] for config in configs]
+    assert list(df["seed"]) == [config["seed"] for config in configs]
+    with open(filename) as fh:
+        assert len(fh.readlines()) == len(configs)
+
+    # stored configurations are not run again
+    store = ResultStore(filename)
+    assert len(store) == len(configs)
+    df = run_ensemble(failing_scenario, configs, store, max_workers=2)
+    assert list(df["count"]) == expected
+
+
+def test_resume(tmp_path):
+    filename = str(tmp_path / "results.jsonl")
+    configs = make_grid({"period": [10, 20, 50]}, seeds=[0])
+
+    # first configuration finished, second interrupted while writing
+    with open(filename, "w") as fh:
+        record = {"config_hash": config_hash(configs[0]), "period": 10, "seed": 0, "count": -1}
+        fh.write(json.dumps(record) + "\n")
+        fh.write('{"config_hash": "')
+
+    try:
+        run_ensemble(failing_scenario, configs, ResultStore(filename), max_workers=1)
+        assert False
+    except ValueError:
+        pass
+
+    store = ResultStore(filename)
+    assert config_hash(configs[0]) in store and config_hash(configs[1]) not in store
+    df = run_ensemble(scenario, configs, store, max_workers=1)
+    assert list(df["count"]) == [-1] + [scenario(config)["count"] for config in configs[1:]]
@@ -1,6 +1,10 @@
+import numpy as np
+
 from sequence.components.optical_channel import ClassicalChannel, QuantumChannel
+from sequence.components.photon import PhotonBatch
 from sequence.kernel.timeline import Timeline
-from sequence.topology.node import Node, QuantumRouter, BSMNode
+from sequence.topology.node import Node, QKDNode, QuantumRouter, BSMNode
+from sequence.utils.encoding import polarization
 
 
 def test_Node_assign_cchannel():
@@ -116,3 +120,24 @@ def test_QuantumRouter_init():
     for i in range(2, 50):
         node_name = "node%d" % i
         assert node1.map_to_middle_node[node_name] == "mid%d" % i
+
+
+def test_QKDNode_receive_qubit_batch():
+    tl = Timeline()
+    node = QKDNode("node", tl)
+    for detector in node.qsdetector.detectors:
+        detector.efficiency = 1
+        detector.time_resolution = 1
+    node.qsdetector.set_basis_list([0] * 10, 0, 1e6)
+
+    times = np.arange(10, dtype=np.int64) * int(1e6)
+    states = np.array([polarization["bases"][0][i % 2] for i in range(10)], dtype=complex)
+    batch = PhotonBatch(times, states, np.full(10, 1550.0), np.arange(10), encoding_type=polarization)
+    node.receive_qubit_batch("src", batch)
+    # the batch is measured once the last photon has arrived
+    assert [len(t) for t in node.qsdetector.trigger_times] == [0, 0]
+
+    tl.run()
+    trigger_times = node.qsdetector.get_photon_times()
+    assert np.array_equal(trigger_times[0], times[::2])
+    assert np.array_equal(trigger_times[1], times[1::2])
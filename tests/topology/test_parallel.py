@@ -0,0 +1,210 @@
+from functools import partial
+
+import pytest
+from numpy import random
+
+from sequence.entanglement_management.generation import EntanglementGenerationA
+from sequence.kernel.event import Event
+from sequence.kernel.process import Process
+from sequence.kernel.timeline import Timeline
+from sequence.message import Message
+from sequence.network_management.reservation import Reservation, eg_req_func
+from sequence.resource_management.resource_manager import ResourceManagerMessage, ResourceManagerMsgType
+from sequence.topology.node import Node, QuantumRouter
+from sequence.topology.parallel import RemoteProtocol, _ReferenceTable, run_parallel
+from sequence.topology.topology import Topology
+
+NUM_NODES = 8
+
+
+class PingMessage(Message):
+    def __init__(self, hops: int, payload: int):
+        super().__init__(None, None)
+        self.protocol_type = None
+        self.hops = hops
+        self.payload = payload
+
+
+class PingNode(Node):
+    def __init__(self, name, timeline, index):
+        super().__init__(name, timeline)
+        self.index = index
+        self.rng = random.RandomState(index)
+        self.sent = 0
+        self.received = []
+
+    def init(self):
+        for _ in range(3):
+            self.forward(5, self.rng.randint(1000))
+
+    def forward(self, hops, payload):
+        neighbors = sorted(self.cchannels.keys())
+        dst = neighbors[self.rng.randint(len(neighbors))]
+        self.sent += 1
+        self.send_message(dst, PingMessage(hops, payload), priority=self.index * 10 ** 6 + self.sent)
+
+    def receive_message(self, src, msg):
+        self.received.append((self.timeline.now(), src, msg.hops, msg.payload))
+        if msg.hops > 0:
+            # process message locally before forwarding
+            delay = int(self.rng.randint(1, 10 ** 6))
+            process = Process(self, "forward", [msg.hops - 1, msg.payload + self.index])
+            self.timeline.schedule(Event(self.timeline.now() + delay, process))
+
+
+def build_ring(timeline):
+    topo = Topology("ring", timeline)
+    for i in range(NUM_NODES):
+        topo.add_node(PingNode("node%d" % i, timeline, i))
+    for i in range(NUM_NODES):
+        j = (i + 1) % NUM_NODES
+        topo.add_classical_connection("node%d" % i, "node%d" % j, distance=1e3, delay=(i + 2) * 10 ** 6)
+    topo.add_classical_connection("node0", "node4", distance=1e3, delay=3 * 10 ** 6)
+    return topo
+
+
+def collect_received(node):
+    return node.received
+
+
+def build_routers(timeline):
+    # two pairs of quantum routers, joined by classical channels only
+    topo = Topology("routers", timeline)
+    for i in range(4):
+        topo.add_node(QuantumRouter("r%d" % i, timeline, memo_size=4))
+    for i in range(4):
+        for j in range(i + 1, 4):
+            topo.add_classical_connection("r%d" % i, "r%d" % j, distance=1e3, delay=5e8)
+    for i, j in [(0, 1), (2, 3)]:
+        topo.add_quantum_connection("r%d" % i, "r%d" % j, distance=1e3, attenuation=1e-4)
+    for node in topo.get_nodes_by_type("QuantumRouter"):
+        for dst, next_node in topo.generate_forwarding_table(node.name).items():
+            node.network_manager.protocol_stack[0].add_forwarding_rule(dst, next_node)
+    topo.nodes["r0"].reserve_net_resource("r1", 10 ** 9, 10 ** 12, 4, 0.8)
+    topo.nodes["r2"].reserve_net_resource("r3", 10 ** 9, 10 ** 12, 4, 0.8)
+    return topo
+
+
+def collect_memories(node):
+    if not isinstance(node, QuantumRouter):
+        return None
+    return [(info.memory.name, info.state, info.remote_node, info.remote_memo, info.fidelity, info.entangle_time)
+            for info in node.resource_manager.memory_manager]
+
+
+class FailingNode(Node):
+    def init(self):
+        raise ValueError("failing node")
+
+
+def build_failing(timeline):
+    topo = build_ring(timeline)
+    topo.add_node(FailingNode("failing", timeline))
+    topo.add_classical_connection("failing", "node0", distance=1e3, delay=10 ** 6)
+    return topo
+
+
+def test_partition():
+    tl = Timeline()
+    topo = build_ring(tl)
+    partitions = topo.partition(4)
+    assert len(partitions) == 4
+    assert sorted(name for partition in partitions for name in partition) == sorted(topo.nodes.keys())
+    assert all(len(partition) == 2 for partition in partitions)
+
+    # quantum connections (and middle BSM nodes) are not split
+    tl = Timeline()
+    topo = Topology("topo", tl)
+    topo.load_config("tests/topology/topology.json")
+    partitions = topo.partition(5)
+    assert sorted(map(sorted, partitions)) == [["alice", "bob"], ["e1", "e2", "middle_e1_e2"]]
+
+    # classical connections between quantum routers may be cut
+    tl = Timeline()
+    topo = build_routers(tl)
+    partitions = topo.partition(2)
+    assert sorted(map(sorted, partitions)) == [["middle_r0_r1", "r0", "r1"], ["middle_r2_r3", "r2", "r3"]]
+
+
+def test_run_parallel():
+    stop_time = 5 * 10 ** 7
+
+    tl = Timeline(stop_time)
+    topo = build_ring(tl)
+    tl.init()
+    tl.run()
+    expected = {name: collect_received(node) for name, node in topo.nodes.items()}
+    assert sum(len(received) for received in expected.values()) > 50
+
+    for num_partitions in [1, 3, 4]:
+        results = run_parallel(build_ring, collect_received, stop_time, num_partitions)
+        assert results == expected
+
+
+def test_run_parallel_routers():
+    results = run_parallel(build_routers, collect_memories, 10 ** 11, 2, seed=0)
+    assert sorted(results.keys()) == ["middle_r0_r1", "middle_r2_r3", "r0", "r1", "r2", "r3"]
+    for node1, node2 in [("r0", "r1"), ("r2", "r3")]:
+        for name, state, remote_node, remote_memo, fidelity, entangle_time in results[node1]:
+            assert state == "ENTANGLED" and remote_node == node2
+            assert (remote_memo, "ENTANGLED", node1, name, fidelity, entangle_time) in results[node2]
+
+    # results match a sequential run with the same seed
+    tl = Timeline(10 ** 11)
+    tl.seed(0)
+    topo = build_routers(tl)
+    tl.init()
+    tl.run()
+    assert results == {name: collect_memories(node) for name, node in topo.nodes.items()}
+
+
+def test_run_parallel_error():
+    with pytest.raises(Exception, match="failing node"):
+        run_parallel(build_failing, collect_received, 5 * 10 ** 7, 2)
+
+
+def build_linked(timeline):
+    # quantum routers joined by quantum connections, which are never cut
+    topo = build_routers(timeline)
+    topo.add_quantum_connection("r1", "r2", distance=1e3, attenuation=1e-4)
+    return topo
+
+
+def test_run_parallel_unsplit():
+    with pytest.raises(Exception, match="cannot be split"):
+        run_parallel(build_linked, collect_memories, 10 ** 11, 2, seed=0)
+    results = run_parallel(build_linked, collect_memories, 10 ** 11, 1, seed=0)
+    assert len(results) == 7
+
+
+def test_reference_table():
+    # messages are pickled in one process and loaded in another process with its own copy of the network
+    tl1 = Timeline()
+    topo1 = build_routers(tl1)
+    tl2 = Timeline()
+    topo2 = build_routers(tl2)
+    references1 = _ReferenceTable(tl1)
+    references2 = _ReferenceTable(tl2)
+
+    r0 = topo1.nodes["r0"]
+    memory = r0.memory_array[0]
+    protocol = EntanglementGenerationA(r0, "EGA." + memory.name, "middle_r0_r1", "r1", memory)
+    reservation = Reservation("r0", "r1", 10 ** 9, 10 ** 12, 4, 0.8)
+    req_func = partial(eg_req_func, name="r0", reservation=reservation)
+    msg = ResourceManagerMessage(ResourceManagerMsgType.REQUEST, protocol=protocol, req_condition_func=req_func)
+
+    received = references2.loads(references1.dumps(msg))
+    remote = received.ini_protocol
+    assert isinstance(remote, RemoteProtocol)
+    assert remote.name == protocol.name
+    assert remote.own is topo2.nodes["r0"]
+    assert [m.name for m in remote.memories] == [memory.name]
+    assert remote.memories[0] is not memory
+    assert remote.fidelity == protocol.fidelity
+    assert received.req_condition_func.keywords["reservation"].responder == "r1"
+
+    # later messages refer to the same stand-in, and stand-ins are resolved to the original protocol when sent back
+    assert references2.loads(references1.dumps(msg)).ini_protocol is remote
+    response = ResourceManagerMessage(ResourceManagerMsgType.RESPONSE, protocol=remote, is_approved=False,
+                                      paired_protocol=None)
+    assert references1.loads(references2.dumps(response)).ini_protocol is protocol
@@ -0,0 +1,197 @@
+from math import sqrt
+
+import numpy as np
+from numpy import random
+
+from sequence.utils.density_matrix import *
+from sequence.utils.encoding import polarization
+from sequence.utils.quantum_state import QuantumState
+
+BELL_BASIS = ((sqrt(1 / 2), 0, 0, sqrt(1 / 2)),
+              (sqrt(1 / 2), 0, 0, -sqrt(1 / 2)),
+              (0, sqrt(1 / 2), sqrt(1 / 2), 0),
+              (0, sqrt(1 / 2), -sqrt(1 / 2), 0))
+
+
+def kraus_sum(kraus, rho, index, n):
+    # reference implementation with full size operators
+    total = np.zeros(rho.shape, dtype=complex)
+    for k in kraus:
+        ops = [np.identity(2)] * n
+        ops[index] = k
+        full = ops[0]
+        for op in ops[1:]:
+            full = np.kron(full, op)
+        total += full @ rho @ full.conj().T
+    return total
+
+
+def random_density_matrix(n):
+    a = random.random((2 ** n, 2 ** n)) + 1j * random.random((2 ** n, 2 ** n))
+    rho = a @ a.conj().T
+    return rho / np.trace(rho)
+
+
+def test_channels():
+    random.seed(0)
+    for name, param in [("depolarizing", 0.3), ("dephasing", 0.2), ("amplitude_damping", 0.4)]:
+        kraus = CHANNELS[name](param)
+        # trace preserving
+        assert np.allclose(sum(k.conj().T @ k for k in kraus), np.identity(2))
+
+        for n, index in [(1, 0), (3, 0), (3, 1), (3, 2)]:
+            rho = random_density_matrix(n)
+            states = [DensityState() for _ in range(n)]
+            for s in states[1:]:
+                states[0].entangle(s)
+            states[0].set_state(rho)
+            states[index].apply_channel(name, param)
+            assert np.allclose(states[0].state, kraus_sum(kraus, rho, index, n))
+
+    # closed forms
+    qs = DensityState()
+    qs.set_state((sqrt(1 / 2), sqrt(1 / 2)))
+    qs.apply_channel("depolarizing", 0.4)
+    assert np.allclose(qs.state, [[0.5, 0.3], [0.3, 0.5]])
+    qs.apply_channel("dephasing", 0.5)
+    assert np.allclose(qs.state, np.identity(2) / 2)
+    qs.set_state((0, 1))
+    qs.apply_channel("amplitude_damping", 0.25)
+    assert np.allclose(qs.state, [[0.25, 0], [0, 0.75]])
+
+
+def test_superoperator_cache():
+    s1 = get_superoperator("dephasing", 0.1)
+    s2 = get_superoperator("dephasing", 0.1)
+    assert s1 is s2
+    assert not s1.flags.writeable
+    assert s1.shape == (2, 2, 2, 2)
+
+
+def test_measure():
+    random.seed(0)
+    qs = DensityState()
+    states = [(1, 0), (0, 1), (sqrt(1 / 2), sqrt(1 / 2)), (-sqrt(1 / 2), sqrt(1 / 2))]
+    basis1, basis2 = polarization['bases'][0], polarization['bases'][1]
+
+    for s, b, e in zip(states, [basis1, basis1, basis2, basis2], [0, 100, 0, 100]):
+        counter = 0
+        for _ in range(100):
+            qs.set_state_single(s)
+            counter += qs.measure(b)
+        assert counter == e
+
+    for s, b in zip(states, [basis2, basis2, basis1, basis1]):
+        counter = 0
+        for _ in range(1000):
+            qs.set_state_single(s)
+            counter += qs.measure(b)
+        assert abs(counter - 500) < 60
+
+    # post measurement state
+    qs.set_state_single((sqrt(1 / 2), sqrt(1 / 2)))
+    res = qs.measure(basis1)
+    assert np.allclose(qs.state, np.outer(basis1[res], basis1[res]))
+
+
+def test_measure_entangled():
+    random.seed(1)
+    qs1, qs2 = DensityState(), DensityState()
+    qs1.entangle(qs2)
+    qs1.set_state(BELL_BASIS[0])
+    res = qs1.measure(polarization['bases'][0])
+    # partner collapses to the same state and groups are split
+    assert qs1.entangled_states == [qs1]
+    assert qs2.entangled_states == [qs2]
+    assert np.allclose(qs2.state, qs1.state)
+    assert np.allclose(qs2.state, np.outer(polarization['bases'][0][res], polarization['bases'][0][res]))
+
+
+def test_measure_multiple():
+    random.seed(2)
+    basis_counts = [0] * 4
+    for _ in range(1000):
+        qs1, qs2 = DensityState(), DensityState()
+        qs1.set_state_single((1, 0))
+        qs2.set_state_single((0, 1))
+        qs1.entangle(qs2)
+        res = DensityState.measure_multiple(BELL_BASIS, [qs1, qs2])
+        basis_counts[res] += 1
+        # measured states are projected onto the bell state
+        assert abs(qs1.fidelity(BELL_BASIS[res], [qs1, qs2]) - 1) < 1e-9
+    assert basis_counts[0] == basis_counts[1] == 0
+    assert abs(basis_counts[2] - 500) < 60
+
+    # ket and density results agree
+    qs1, qs2 = DensityState(), DensityState()
+    qs1.entangle(qs2)
+    qs1.set_state(BELL_BASIS[1])
+    assert DensityState.measure_multiple(BELL_BASIS, [qs1, qs2]) == 1
+    ket1, ket2 = QuantumState(), QuantumState()
+    ket1.entangle(ket2)
+    ket1.set_state(BELL_BASIS[1])
+    assert QuantumState.measure_multiple(BELL_BASIS, [ket1, ket2]) == 1
+
+
+def test_measure_multiple_partial():
+    # measure two qubits of a three qubit group
+    random.seed(3)
+    states = [DensityState() for _ in range(3)]
+    for s in states[1:]:
+        states[0].entangle(s)
+    ghz = np.zeros(8)
+    ghz[0] = ghz[7] = sqrt(1 / 2)
+    states[0].set_state(ghz)
+    res = DensityState.measure_multiple(BELL_BASIS, [states[2], states[0]])
+    assert res in (0, 1)
+    assert states[1].entangled_states == [states[1]]
+    # phi+ leaves the remaining qubit in |+>, phi- in |->
+    sign = 1 if res == 0 else -1
+    assert np.allclose(states[1].state, [[0.5, sign * 0.5], [sign * 0.5, 0.5]])
+
+
+def test_set_state_single():
+    qs1, qs2 = DensityState(), DensityState()
+    qs1.entangle(qs2)
+    qs1.set_state(BELL_BASIS[2])
+    qs1.set_state_single((1, 0))
+    assert qs1.entangled_states == [qs1]
+    assert qs2.entangled_states == [qs2]
+    assert np.allclose(qs2.state, np.identity(2) / 2)
+
+
+def test_cnot():
+    qs1, qs2, qs3 = DensityState(), DensityState(), DensityState()
+    qs1.set_state_single((sqrt(1 / 2), sqrt(1 / 2)))
+    qs1.cnot(qs2)
+    assert qs1.entangled_states == [qs1, qs2]
+    assert abs(qs1.fidelity(BELL_BASIS[0], [qs1, qs2]) - 1) < 1e-9
+
+    # control after target in the group
+    qs2.set_state_single((sqrt(1 / 2), sqrt(1 / 2)))
+    qs3.set_state_single((0, 1))
+    qs3.entangle(qs2)
+    qs2.cnot(qs3)
+    assert qs2.entangled_states == [qs3, qs2]
+    assert abs(qs2.fidelity(BELL_BASIS[2], [qs2, qs3]) - 1) < 1e-9
+
+
+def test_fidelity():
+    qs1, qs2 = DensityState(), DensityState()
+    qs1.entangle(qs2)
+    qs1.set_state(BELL_BASIS[2])
+    assert abs(qs1.fidelity(BELL_BASIS[2], [qs1, qs2]) - 1) < 1e-9
+    assert abs(qs1.fidelity(BELL_BASIS[3], [qs1, qs2])) < 1e-9
+    assert abs(qs1.fidelity((1, 0)) - 0.5) < 1e-9
+
+    # depolarizing both qubits of a bell pair
+    p = 0.2
+    qs1.apply_channel("depolarizing", p)
+    qs2.apply_channel("depolarizing", p)
+    expected = 1 - 3 / 4 * (1 - (1 - p) ** 2)
+    assert abs(qs1.fidelity(BELL_BASIS[2], [qs1, qs2]) - expected) < 1e-9
+    # qubit order of the target
+    assert abs(qs1.fidelity(BELL_BASIS[2], [qs2, qs1]) - expected) < 1e-9
+
+    qs1.apply_gate(((0, 1), (1, 0)))
+    assert abs(qs1.fidelity(BELL_BASIS[0], [qs1, qs2]) - expected) < 1e-9
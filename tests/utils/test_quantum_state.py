@@ -1,6 +1,10 @@
-from sequence.utils.quantum_state import QuantumState
+from sequence.utils.quantum_state import QuantumState, _measure_entangled_state, \
+    _measure_multiple
 from sequence.utils.encoding import polarization
 from math import sqrt
+import numpy as np
+import gc
+import weakref
 
 
 def test_measure():
@@ -82,3 +86,129 @@ def test_measure_entangled():
                 counter += 1
         assert abs(0.5 - counter / 1000) < 0.1
 
+
+
+BELL_BASIS = ((complex(sqrt(1 / 2)), complex(0), complex(0), complex(sqrt(1 / 2))),
+              (complex(sqrt(1 / 2)), complex(0), complex(0), -complex(sqrt(1 / 2))),
+              (complex(0), complex(sqrt(1 / 2)), complex(sqrt(1 / 2)), complex(0)),
+              (complex(0), complex(sqrt(1 / 2)), -complex(sqrt(1 / 2)), complex(0)))
+
+
+def test_entanglement_groups():
+    np.random.seed(0)
+    basis = polarization['bases'][0]
+    qs1, qs2, qs3 = QuantumState(), QuantumState(), QuantumState()
+    qs1.entangle(qs2)
+    qs1.entangle(qs3)
+    assert qs1.entangled_states is qs3.entangled_states
+    assert qs1.entangled_states == [qs1, qs2, qs3]
+
+    # measurement splits the measured state from its group
+    qs1.set_state((complex(sqrt(1 / 2)),) + (complex(0),) * 6 + (complex(sqrt(1 / 2)),))
+    res = qs2.measure(basis)
+    assert qs2.entangled_states == [qs2]
+    assert qs1.entangled_states == [qs1, qs3] and qs3.entangled_states is qs1.entangled_states
+    assert qs2.state == basis[res]
+    assert len(qs1.state) == 4
+    assert qs1.measure(basis) == qs3.measure(basis) == res
+    assert len(qs1.state) == len(qs3.state) == 2
+
+    # set_state_single releases the state from its group
+    qs1.entangle(qs2)
+    qs1.set_state_single((complex(0), complex(1)))
+    assert qs1.entangled_states == [qs1]
+    assert qs2.entangled_states == [qs2]
+    assert qs1.state == (complex(0), complex(1))
+    assert len(qs2.state) == 2
+
+
+def test_measure_multiple():
+    np.random.seed(1)
+    for i in range(4):
+        qs1, qs2 = QuantumState(), QuantumState()
+        qs1.entangle(qs2)
+        qs1.set_state(BELL_BASIS[i])
+        assert QuantumState.measure_multiple(BELL_BASIS, [qs1, qs2]) == i
+        assert qs1.entangled_states == [qs1, qs2]
+
+    # measure two states of a three state group
+    states = [QuantumState() for _ in range(3)]
+    for s in states[1:]:
+        states[0].entangle(s)
+    ghz = [complex(0)] * 8
+    ghz[0] = ghz[7] = complex(sqrt(1 / 2))
+    states[0].set_state(tuple(ghz))
+    res = QuantumState.measure_multiple(BELL_BASIS, [states[2], states[0]])
+    assert res in (0, 1)
+    assert states[1].entangled_states == [states[1]]
+    assert states[0].entangled_states == [states[2], states[0]]
+    assert np.allclose(states[0].state, BELL_BASIS[res])
+    # phi+ leaves the remaining state in |+>, phi- in |->
+    sign = 1 if res == 0 else -1
+    assert np.allclose(states[1].state, [sqrt(1 / 2), sign * sqrt(1 / 2)])
+
+
+def test_released_states():
+    # repeated entanglement and reset of one state keeps groups and kets small
+    np.random.seed(2)
+    memory = QuantumState()
+    refs = []
+    for _ in range(100):
+        memory.set_state_single((complex(sqrt(1 / 2)), complex(sqrt(1 / 2))))
+        photon = QuantumState()
+        memory.entangle(photon)
+        memory.set_state(BELL_BASIS[0])
+        refs.append(weakref.ref(photon))
+        memory.set_state_single((complex(1), complex(0)))
+        assert photon.entangled_states == [photon]
+        del photon
+        assert memory.entangled_states == [memory]
+        assert len(memory.state) == 2
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+
+
+def random_state(num_qubits, rng):
+    state = rng.normal(size=2 ** num_qubits) + 1j * rng.normal(size=2 ** num_qubits)
+    return tuple(state / np.linalg.norm(state))
+
+
+def test_measure_entangled_kernel():
+    # compare with full size projectors
+    rng = np.random.default_rng(0)
+    bases = [polarization["bases"][0], polarization["bases"][1],
+             ((complex(sqrt(1 / 2)), complex(sqrt(1 / 2)) * 1j), (complex(sqrt(1 / 2)), -complex(sqrt(1 / 2)) * 1j))]
+    for num_states in range(2, 7):
+        state = random_state(num_states, rng)
+        for basis in bases:
+            for index in range(num_states):
+                state0, state1, prob = _measure_entangled_state(state, basis, index, num_states)
+                for vector, rest in zip(basis, (state0, state1)):
+                    u = np.array(vector)
+                    projector = np.kron(np.kron(np.identity(2 ** index), np.outer(u.conj(), u)),
+                                        np.identity(2 ** (num_states - index - 1)))
+                    projected = projector @ np.array(state)
+                    # kernel returns the state of the other qubits
+                    new_state = np.moveaxis(np.multiply.outer(u.conj(), np.reshape(rest, (2,) * (num_states - 1))),
+                                            0, index).reshape(-1)
+                    assert np.allclose(new_state * np.linalg.norm(projected), projected)
+                expected = np.linalg.norm(np.kron(np.kron(np.identity(2 ** index), np.outer(np.conj(basis[0]), basis[0])),
+                                                  np.identity(2 ** (num_states - index - 1))) @ np.array(state)) ** 2
+                assert abs(prob - expected) < 1e-12
+
+
+def test_measure_multiple_kernel():
+    rng = np.random.default_rng(1)
+    bell = ((complex(sqrt(1 / 2)), complex(0), complex(0), complex(sqrt(1 / 2))),
+            (complex(sqrt(1 / 2)), complex(0), complex(0), -complex(sqrt(1 / 2))),
+            (complex(0), complex(sqrt(1 / 2)), complex(sqrt(1 / 2)), complex(0)),
+            (complex(0), complex(sqrt(1 / 2)), -complex(sqrt(1 / 2)), complex(0)))
+    for length_diff in range(0, 5):
+        state = random_state(2 + length_diff, rng)
+        new_states, probabilities = _measure_multiple(state, bell, length_diff)
+        assert abs(sum(probabilities) - 1) < 1e-12
+        for vector, new_state, prob in zip(bell, new_states, probabilities):
+            projector = np.kron(np.outer(np.conj(vector), vector), np.identity(2 ** length_diff))
+            projected = projector @ np.array(state)
+            assert abs(prob - np.linalg.norm(projected) ** 2) < 1e-12
+            assert np.allclose(np.kron(np.conj(vector), new_state) * sqrt(prob), projected)
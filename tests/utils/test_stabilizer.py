@@ -0,0 +1,191 @@
+from math import sqrt
+
+import numpy as np
+import pytest
+from numpy import random
+
+from sequence.utils.encoding import polarization
+from sequence.utils.stabilizer import StabilizerState
+
+BELL_BASIS = ((sqrt(1 / 2), 0, 0, sqrt(1 / 2)),
+              (sqrt(1 / 2), 0, 0, -sqrt(1 / 2)),
+              (0, sqrt(1 / 2), sqrt(1 / 2), 0),
+              (0, sqrt(1 / 2), -sqrt(1 / 2), 0))
+# corrections mapping each bell state to phi+ (applied to the second qubit)
+CORRECTIONS = ("I", "Z", "X", "Y")
+
+H = np.array([[1, 1], [1, -1]]) * sqrt(1 / 2)
+S = np.array([[1, 0], [0, 1j]])
+CNOT = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
+
+
+def apply_ket(ket, gate, qubits, n):
+    # reference implementation on kets
+    tensor = ket.reshape((2,) * n)
+    k = len(qubits)
+    tensor = np.tensordot(gate.reshape((2,) * (2 * k)), tensor, axes=(list(range(k, 2 * k)), qubits))
+    return np.moveaxis(tensor, list(range(k)), qubits).reshape(-1)
+
+
+def make_pair(index):
+    qs1, qs2 = StabilizerState(), StabilizerState()
+    qs1.entangle(qs2)
+    qs1.set_state(BELL_BASIS[index])
+    return qs1, qs2
+
+
+def test_random_circuits():
+    random.seed(0)
+    n = 4
+    for _ in range(20):
+        states = [StabilizerState() for _ in range(n)]
+        for s in states[1:]:
+            states[0].entangle(s)
+        ket = np.zeros(2 ** n, dtype=complex)
+        ket[0] = 1
+
+        for _ in range(30):
+            gate = random.randint(3)
+            if gate == 0:
+                q = random.randint(n)
+                states[q].apply_gate("H")
+                ket = apply_ket(ket, H, [q], n)
+            elif gate == 1:
+                q = random.randint(n)
+                states[q].apply_gate(S)
+                ket = apply_ket(ket, S, [q], n)
+            else:
+                c, t = random.choice(n, 2, replace=False)
+                states[c].cnot(states[t])
+                ket = apply_ket(ket, CNOT, [c, t], n)
+
+        assert abs(states[0].fidelity(ket, states) - 1) < 1e-9
+        # single qubit reduced states
+        for q in range(n):
+            rho = np.trace(np.outer(ket, ket.conj()).reshape((2,) * (2 * n)).transpose(
+                [q] + [i for i in range(n) if i != q] + [n + q] + [n + i for i in range(n) if i != q]
+            ).reshape(2, 2 ** (n - 1), 2, 2 ** (n - 1)), axis1=1, axis2=3)
+            assert abs(states[q].fidelity((1, 0)) - rho[0, 0].real) < 1e-9
+
+
+def test_clifford_gates():
+    # every single qubit clifford gate, as a product of H and S up to a global phase
+    cliffords = [np.identity(2)]
+    for matrix in cliffords:
+        for gate in (H, S):
+            new_matrix = gate @ matrix * np.exp(0.3j)
+            if not any(np.isclose(abs(np.trace(new_matrix.conj().T @ other)), 2) for other in cliffords):
+                cliffords.append(new_matrix)
+    assert len(cliffords) == 24
+
+    for gate in cliffords:
+        for ket in [(1, 0), (0, 1), (sqrt(1 / 2), sqrt(1 / 2)), (sqrt(1 / 2), 1j * sqrt(1 / 2))]:
+            qs1, qs2 = StabilizerState(), StabilizerState()
+            qs1.entangle(qs2)
+            qs1.set_state(np.kron(ket, (1, 0)))
+            qs1.cnot(qs2)
+            qs1.apply_gate(gate)
+            expected = apply_ket(apply_ket(np.kron(ket, (1, 0)), CNOT, [0, 1], 2), gate, [0], 2)
+            assert abs(qs1.fidelity(expected, [qs1, qs2]) - 1) < 1e-9
+
+
+def test_measure():
+    random.seed(1)
+    qs = StabilizerState()
+    states = [(1, 0), (0, 1), (sqrt(1 / 2), sqrt(1 / 2)), (-sqrt(1 / 2), sqrt(1 / 2))]
+    basis1, basis2 = polarization['bases'][0], polarization['bases'][1]
+
+    for s, b, e in zip(states, [basis1, basis1, basis2, basis2], [0, 100, 0, 100]):
+        counter = 0
+        for _ in range(100):
+            qs.set_state_single(s)
+            counter += qs.measure(b)
+        assert counter == e
+
+    for s, b in zip(states, [basis2, basis2, basis1, basis1]):
+        counter = 0
+        for _ in range(1000):
+            qs.set_state_single(s)
+            counter += qs.measure(b)
+        assert abs(counter - 500) < 60
+
+    with pytest.raises(Exception):
+        qs.set_state_single((sqrt(1 / 3), sqrt(2 / 3)))
+
+
+def test_measure_entangled():
+    random.seed(2)
+    for _ in range(20):
+        qs1, qs2 = make_pair(0)
+        res = qs1.measure(polarization['bases'][0])
+        assert qs1.entangled_states == [qs1]
+        assert qs2.entangled_states == [qs2]
+        assert qs2.measure(polarization['bases'][0]) == res
+
+
+def test_ghz():
+    random.seed(3)
+    n = 50
+    states = [StabilizerState() for _ in range(n)]
+    states[0].apply_gate("H")
+    for s in states[1:]:
+        states[0].cnot(s)
+    assert len(states[0].entangled_states) == n
+
+    res = states[10].measure(polarization['bases'][0])
+    assert len(states[0].entangled_states) == n - 1
+    for s in states:
+        assert s.measure(polarization['bases'][0]) == res
+
+
+def test_measure_multiple():
+    random.seed(4)
+    basis_counts = [0] * 4
+    for _ in range(1000):
+        qs1, qs2 = StabilizerState(), StabilizerState()
+        qs2.set_state_single((0, 1))
+        qs1.entangle(qs2)
+        res = StabilizerState.measure_multiple(BELL_BASIS, [qs1, qs2])
+        basis_counts[res] += 1
+        assert abs(qs1.fidelity(BELL_BASIS[res], [qs1, qs2]) - 1) < 1e-9
+    assert basis_counts[0] == basis_counts[1] == 0
+    assert abs(basis_counts[2] - 500) < 60
+
+    for i in range(4):
+        qs1, qs2 = make_pair(i)
+        assert StabilizerState.measure_multiple(BELL_BASIS, [qs1, qs2]) == i
+
+
+def test_swapping_chain():
+    random.seed(5)
+    n = 20
+    pairs = [make_pair(0) for _ in range(n)]
+    for i in range(n - 1):
+        left, right = pairs[i][1], pairs[i + 1][0]
+        left.entangle(right)
+        res = StabilizerState.measure_multiple(BELL_BASIS, [left, right])
+        pairs[i + 1][1].apply_gate(CORRECTIONS[res])
+        left.set_state_single((1, 0))
+        right.set_state_single((1, 0))
+
+    end0, end1 = pairs[0][0], pairs[-1][1]
+    assert len(end0.entangled_states) == 2
+    assert abs(end0.fidelity(BELL_BASIS[0], [end0, end1]) - 1) < 1e-9
+
+
+def test_fidelity():
+    qs1, qs2 = make_pair(2)
+    assert abs(qs1.fidelity(BELL_BASIS[2], [qs1, qs2]) - 1) < 1e-9
+    assert abs(qs1.fidelity(BELL_BASIS[2], [qs2, qs1]) - 1) < 1e-9
+    assert abs(qs1.fidelity(BELL_BASIS[3], [qs1, qs2])) < 1e-9
+    assert abs(qs1.fidelity((1, 0)) - 0.5) < 1e-9
+
+    qs1.apply_gate(((0, 1), (1, 0)))
+    assert abs(qs1.fidelity(BELL_BASIS[0], [qs1, qs2]) - 1) < 1e-9
+    qs1.apply_channel("dephasing", 1)
+    assert abs(qs1.fidelity(BELL_BASIS[1], [qs1, qs2]) - 1) < 1e-9
+
+    with pytest.raises(Exception):
+        qs1.apply_gate(np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]]))
+    with pytest.raises(Exception):
+        qs1.apply_channel("amplitude_damping", 0.1)
@@ -0,0 +1,115 @@
+import pickle
+from math import sqrt
+
+import pytest
+
+from sequence.utils.encoding import polarization
+from sequence.utils.quantum_state import QuantumState
+from sequence.utils.state_table import StateTable
+
+
+def test_intern():
+    table = StateTable(tolerance=1e-9)
+    plus = (complex(sqrt(1 / 2)), complex(sqrt(1 / 2)))
+    id1 = table.intern(plus)
+    # floating point drift maps to the same state
+    id2 = table.intern((complex(sqrt(1 / 2) + 1e-15), complex(sqrt(1 / 2) - 1e-15)))
+    id3 = table.intern((complex(1), complex(0)))
+    assert id1 == id2 != id3
+    assert table.get_state(id2) == plus
+    assert len(table) == 2
+    assert id1 in table
+
+    # ids are not reused by other tables
+    other = StateTable()
+    assert other.intern(plus) not in (id1, id3)
+    assert id1 not in other
+
+
+def test_basis_id():
+    table = StateTable()
+    basis = polarization["bases"][0]
+    assert table.basis_id(basis) == table.basis_id(basis)
+    assert table.basis_id(tuple(tuple(v) for v in basis)) == table.basis_id(basis)
+    assert table.basis_id(polarization["bases"][1]) != table.basis_id(basis)
+
+    # bases are bounded by the table size, and IDs of evicted bases are not reused
+    table = StateTable(max_size=2)
+    ids = [table.basis_id(((complex(1), complex(0)), (complex(0), complex(i + 1)))) for i in range(3)]
+    assert len(set(ids)) == 3
+    assert len(table._bases) == 2
+    assert table.basis_id(((complex(1), complex(0)), (complex(0), complex(1)))) not in ids
+
+
+def test_lookup():
+    table = StateTable(max_size=2, eviction="lru")
+
+    def get(key, value):
+        outcome = table.lookup(key)
+        return table.store(key, value) if outcome is None else outcome
+
+    assert get(1, "a") == "a"
+    assert get(1, "b") == "a"
+    get(2, "c")
+    get(1, "d")  # 1 is now most recently used
+    get(3, "e")  # evicts 2
+    assert get(1, "f") == "a"
+    assert get(2, "g") == "g"
+
+    stats = table.get_stats()
+    assert stats["hits"] == 3 and stats["misses"] == 4
+    assert stats["outcomes"] == 2 and stats["evictions"] == 2
+    assert abs(stats["hit_rate"] - 3 / 7) < 1e-12
+
+    table = StateTable(max_size=2, eviction="fifo")
+    get(1, "a")
+    get(2, "b")
+    get(1, "c")
+    get(3, "d")  # evicts 1, the oldest entry
+    assert get(1, "e") == "e"
+
+    table.clear()
+    assert table.get_stats()["outcomes"] == 0 and table.hits == 0
+
+    # states are evicted with the same policy
+    table = StateTable(max_size=2)
+    ids = [table.intern((complex(i), complex(0))) for i in range(3)]
+    assert ids[0] not in table and ids[1] in table and ids[2] in table
+    assert table.intern([complex(1), complex(0)]) == ids[1]
+
+    with pytest.raises(Exception):
+        StateTable(eviction="random")
+
+
+def test_quantum_state_table():
+    old_table = QuantumState.table
+    QuantumState.table = StateTable()
+    try:
+        basis = polarization["bases"][0]
+
+        # unentangled states are measured without the table
+        qs = QuantumState()
+        for _ in range(10):
+            qs.set_state_single((complex(sqrt(1 / 2)), complex(sqrt(1 / 2))))
+            qs.measure(basis)
+        stats = QuantumState.table.get_stats()
+        assert stats["misses"] == 0 and stats["hits"] == 0 and stats["states"] == 0
+
+        # entangled states
+        qs1, qs2 = QuantumState(), QuantumState()
+        for _ in range(10):
+            qs1.entangle(qs2)
+            qs1.set_state((complex(sqrt(1 / 2)), complex(0), complex(0), complex(sqrt(1 / 2))))
+            res = qs1.measure(basis)
+            # the rest of the group keeps the ID of its post-measurement state
+            assert qs2._state_id is not None and qs2._state_id in QuantumState.table
+            assert qs2.measure(basis) == res
+        stats = QuantumState.table.get_stats()
+        assert stats["misses"] == 1 and stats["hits"] == 9
+
+        # ids are not kept through pickling
+        assert qs1._state_id is not None
+        qs1 = pickle.loads(pickle.dumps(qs1))
+        assert qs1._state_id is None
+    finally:
+        QuantumState.table = old_table
@@ -0,0 +1,136 @@
+import sys
+import time
+
+from sequence.app.random_request import RandomRequestApp
+from sequence.kernel.event import Event
+from sequence.kernel.eventlist import EventList, make_event_queue
+from sequence.kernel.timeline import Timeline
+from sequence.topology.node import QuantumRouter, BSMNode
+from sequence.topology.topology import Topology
+
+QUEUE_TYPES = ["heap", "calendar", "ladder"]
+
+
+class RecordingEventList(EventList):
+    """Event list that records every queue operation as a trace.
+
+    Trace entries are ("push", id, time, priority), ("pop",), ("update", id, time) or ("remove", id).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.trace = []
+        self.ids = {}
+
+    def _id(self, event):
+        return self.ids.setdefault(id(event), len(self.ids))
+
+    def push(self, event):
+        self.trace.append(("push", self._id(event), event.time, event.priority))
+        super().push(event)
+
+    def pop(self):
+        self.trace.append(("pop",))
+        return super().pop()
+
+    def remove(self, event):
+        self.trace.append(("remove", self._id(event)))
+        super().remove(event)
+
+    def update_event_time(self, event, time):
+        self.trace.append(("update", self._id(event), time))
+        super().update_event_time(event, time)
+
+
+def record_starlight_trace(runtime: float):
+    """Function to record event queue operations of the starlight experiment (see example/starlight_experiments.py)."""
+
+    tl = Timeline(runtime)
+    tl.seed(1)
+    tl.events = RecordingEventList()
+
+    network_topo = Topology("network_topo", tl)
+    network_topo.load_config("example/starlight.json")
+
+    for name, node in network_topo.nodes.items():
+        if isinstance(node, QuantumRouter):
+            node.memory_array.update_memory_params("frequency", 2e3)
+            node.memory_array.update_memory_params("coherence_time", 1.1)
+            node.memory_array.update_memory_params("efficiency", 1)
+            node.memory_array.update_memory_params("raw_fidelity", 0.9349367588934053)
+            node.network_manager.protocol_stack[1].set_swapping_success_rate(0.64)
+            node.network_manager.protocol_stack[1].set_swapping_degradation(0.99)
+        elif isinstance(node, BSMNode):
+            node.bsm.update_detectors_params("efficiency", 0.8)
+            node.bsm.update_detectors_params("count_rate", 5e7)
+            node.bsm.update_detectors_params("time_resolution", 100)
+
+    for qc in network_topo.qchannels:
+        qc.attenuation = 0.0002
+        qc.frequency = 1e11
+
+    nodes_name = [name for name, node in network_topo.nodes.items() if isinstance(node, QuantumRouter)]
+    for i, name in enumerate(nodes_name):
+        others = nodes_name[:]
+        others.remove(name)
+        app = RandomRequestApp(network_topo.nodes[name], others, i)
+        app.start()
+
+    tl.init()
+    tl.run()
+    return tl.events.trace
+
+
+def replay(trace, queue_type: str) -> float:
+    """Function to replay a recorded trace on an event queue.
+
+    Returns:
+        float: execution time (in s) of the replay.
+    """
+
+    events = {}
+    for entry in trace:
+        if entry[0] == "push" and entry[1] not in events:
+            events[entry[1]] = Event(entry[2], None, entry[3])
+
+    queue = make_event_queue(queue_type)
+    start = time.perf_counter()
+    for entry in trace:
+        op = entry[0]
+        if op == "push":
+            event = events[entry[1]]
+            event.time = entry[2]
+            queue.push(event)
+        elif op == "pop":
+            queue.pop()
+        elif op == "update":
+            queue.update_event_time(events[entry[1]], entry[2])
+        else:
+            queue.remove(events[entry[1]])
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    '''
+    Program for comparing event queue backends on a trace of the starlight experiment
+    input: simulation time (in ps) to record, number of replays per backend
+    '''
+
+    try:
+        runtime = float(sys.argv[1])
+    except IndexError:
+        runtime = 2e12
+    try:
+        num_trials = int(sys.argv[2])
+    except IndexError:
+        num_trials = 5
+
+    print("recording starlight trace for {} ps ... ".format(runtime), end='', flush=True)
+    trace = record_starlight_trace(runtime)
+    num_pops = sum(1 for entry in trace if entry[0] == "pop")
+    print("{} operations, {} pops".format(len(trace), num_pops))
+
+    for queue_type in QUEUE_TYPES:
+        runtimes = [replay(trace, queue_type) for _ in range(num_trials)]
+        best = min(runtimes)
+        print("{:>8}: min {:.3f}s, {:.0f} operations/s".format(queue_type, best, len(trace) / best))
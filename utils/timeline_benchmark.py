@@ -0,0 +1,61 @@
+import sys
+import time
+
+from sequence.kernel.entity import Entity
+from sequence.kernel.event import Event
+from sequence.kernel.process import Process
+from sequence.kernel.timeline import Timeline
+
+
+class Repeater(Entity):
+    """Entity that reschedules itself until a number of events have been executed."""
+
+    def __init__(self, name, timeline, num_events):
+        Entity.__init__(self, name, timeline)
+        self.num_events = num_events
+        self.counter = 0
+
+    def init(self):
+        pass
+
+    def op(self):
+        self.counter += 1
+        if self.counter < self.num_events:
+            t = self.timeline.now() + (self.counter * 7919) % 1000 + 1
+            self.timeline.schedule(Event(t, Process(self, "op", []), 0))
+
+
+def run_trial(num_events: int, num_pending: int) -> float:
+    """Function to measure the event throughput of the timeline.
+
+    Returns:
+        float: executed events per second.
+    """
+
+    tl = Timeline()
+    repeater = Repeater("repeater", tl, num_events)
+    for i in range(num_pending):
+        tl.schedule(Event(i % 1000, Process(repeater, "op", []), 0))
+
+    start = time.perf_counter()
+    tl.run()
+    return tl.run_counter / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    '''
+    Program for measuring timeline event throughput
+    input: number of events to execute, number of pending events in the queue
+    '''
+
+    try:
+        num_events = int(sys.argv[1])
+    except IndexError:
+        num_events = 300000
+    try:
+        num_pending = int(sys.argv[2])
+    except IndexError:
+        num_pending = 1000
+
+    best = max(run_trial(num_events, num_pending) for _ in range(3))
+    print("{:.0f} events/s".format(best))